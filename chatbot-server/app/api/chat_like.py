@@ -1,13 +1,13 @@
 # chatbot-server/app/api/chat_like.py - 수정된 버전
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header
+from typing import Optional
 from app.schemas.chat import LikesChatRequest
 from app.services.handle_chat_likes import handle_chat_likes
-from app.db.database import SessionLocal
-from app.db.models import Subscription, Brand
-import json
-import asyncio
+from app.db.catalog import get_catalog
+from app.utils.pacing import get_pacer, use_pacing_mode
+from app.utils.sse_resume import resumable_response
+from app.utils.sse import MESSAGE_START, MESSAGE_END, encode_event, encode_chunks
 import re
 
 router = APIRouter()
@@ -31,101 +31,98 @@ def get_recommended_subscriptions_likes(ai_response: str):
         print(f"[DEBUG] Likes response doesn't contain recommendation keywords")
         return None
 
-    db = SessionLocal()
-    try:
-        ai_text = ai_response.lower().replace(" ", "")
-        recommended_subscriptions = []
-
-        # 1. 전체 구독 서비스에서 title로 포함 여부 확인
-        all_subs = db.query(Subscription).all()
-        main_subscription = next(
-            (s for s in all_subs if s.title and s.title.lower().replace(" ", "") in ai_text),
-            None
-        )
-
-        if main_subscription:
-            recommended_subscriptions.append({
-                "id": main_subscription.id,
-                "title": main_subscription.title,
-                "image_url": main_subscription.image_url,
-                "category": main_subscription.category,
-                "price": main_subscription.price,
-                "type": "main_subscription"
-            })
-
-        # 2. 전체 브랜드에서 name 포함 여부 확인
-        all_brands = db.query(Brand).all()
-        life_brand = next(
-            (b for b in all_brands if b.name and b.name.lower().replace(" ", "") in ai_text),
-            None
-        )
-
-        if life_brand:
-            recommended_subscriptions.append({
-                "id": life_brand.id,
-                "name": life_brand.name,
-                "image_url": life_brand.image_url,
-                "description": life_brand.description,
-                "type": "life_brand"
-            })
-
-        print(f"[DEBUG] Likes combination: main={main_subscription.title if main_subscription else None}, brand={life_brand.name if life_brand else None}")
-
-        return recommended_subscriptions if recommended_subscriptions else None
-
-    finally:
-        db.close()
-
-
-@router.post("/chat/likes", summary="좋아요 기반 추천", description="사용자가 좋아요 표시한 브랜드를 기반으로 구독 서비스 조합을 추천합니다.")
-async def chat_likes(req: LikesChatRequest):
-    async def generate_stream():
-        # 1. handle_chat_likes에서 함수를 받아서 실행
-        ai_stream_fn = await handle_chat_likes(req)
-
-        # 2. AI 응답을 모두 수집해서 분석
-        full_ai_response = ""
-        ai_chunks = []
-
-        async for chunk in ai_stream_fn():
-            full_ai_response += chunk
-            ai_chunks.append(chunk)
-
-        print(f"[DEBUG] Likes full AI response: '{full_ai_response[:200]}...'")
-
-        # 실제 추천이 있을 때만 구독 서비스 카드 전송
-        recommended_subscriptions = get_recommended_subscriptions_likes(full_ai_response)
-
-        if recommended_subscriptions:
-            subscription_data = {
-                "type": "subscription_recommendations",
-                "subscriptions": recommended_subscriptions
-            }
-            print(f"[DEBUG] Sending likes-based subscription recommendations: {len(recommended_subscriptions)} items")
-            # 각 항목의 타입 확인
-            for item in recommended_subscriptions:
-                print(f"[DEBUG] Item: {item.get('title') or item.get('name')} - Type: {item['type']}")
-
-            yield f"data: {json.dumps(subscription_data, ensure_ascii=False)}\n\n"
-            await asyncio.sleep(0.1)
-        else:
-            print(f"[DEBUG] No subscription cards needed (guidance message or no explicit recommendations)")
-
-        # 4. 스트리밍 시작 신호
-        yield f"data: {json.dumps({'type': 'message_start'}, ensure_ascii=False)}\n\n"
-        await asyncio.sleep(0.05)
-
-        # 5. 수집된 AI 응답을 자연스럽게 다시 스트리밍
+    catalog = get_catalog()
+    ai_text = ai_response.lower().replace(" ", "")
+    recommended_subscriptions = []
+
+    # 1. 전체 구독 서비스에서 title로 포함 여부 확인
+    all_subs = catalog.subscriptions
+    main_subscription = next(
+        (s for s in all_subs if s.title and s.title.lower().replace(" ", "") in ai_text),
+        None
+    )
+
+    if main_subscription:
+        recommended_subscriptions.append({
+            "id": main_subscription.id,
+            "title": main_subscription.title,
+            "image_url": main_subscription.image_url,
+            "category": main_subscription.category,
+            "price": main_subscription.price,
+            "type": "main_subscription"
+        })
+
+    # 2. 전체 브랜드에서 name 포함 여부 확인
+    all_brands = catalog.brands
+    life_brand = next(
+        (b for b in all_brands if b.name and b.name.lower().replace(" ", "") in ai_text),
+        None
+    )
+
+    if life_brand:
+        recommended_subscriptions.append({
+            "id": life_brand.id,
+            "name": life_brand.name,
+            "image_url": life_brand.image_url,
+            "description": life_brand.description,
+            "type": "life_brand"
+        })
+
+    print(f"[DEBUG] Likes combination: main={main_subscription.title if main_subscription else None}, brand={life_brand.name if life_brand else None}")
+
+    return recommended_subscriptions if recommended_subscriptions else None
+
+async def likes_event_stream(req: LikesChatRequest):
+    """좋아요 기반 추천 한 턴의 SSE 프레임 스트림 - HTTP(SSE)와 WebSocket이 공유"""
+    use_pacing_mode(req.pacing)
+    # 1. handle_chat_likes에서 함수를 받아서 실행
+    ai_stream_fn = await handle_chat_likes(req)
+
+    # 2. AI 응답을 모두 수집해서 분석
+    full_ai_response = ""
+    ai_chunks = []
+
+    async for chunk in ai_stream_fn():
+        full_ai_response += chunk
+        ai_chunks.append(chunk)
+
+    print(f"[DEBUG] Likes full AI response: '{full_ai_response[:200]}...'")
+
+    # 실제 추천이 있을 때만 구독 서비스 카드 전송
+    recommended_subscriptions = get_recommended_subscriptions_likes(full_ai_response)
+
+    if recommended_subscriptions:
+        subscription_data = {
+            "type": "subscription_recommendations",
+            "subscriptions": recommended_subscriptions
+        }
+        print(f"[DEBUG] Sending likes-based subscription recommendations: {len(recommended_subscriptions)} items")
+        # 각 항목의 타입 확인
+        for item in recommended_subscriptions:
+            print(f"[DEBUG] Item: {item.get('title') or item.get('name')} - Type: {item['type']}")
+
+        yield encode_event(subscription_data)
+    else:
+        print(f"[DEBUG] No subscription cards needed (guidance message or no explicit recommendations)")
+
+    # 4. 스트리밍 시작 신호
+    yield MESSAGE_START
+
+    # 5. 수집된 AI 응답을 자연스럽게 다시 스트리밍
+    async def replay():
+        pacer = get_pacer()
         for chunk in ai_chunks:
             if chunk.strip():
-                chunk_data = {
-                    "type": "message_chunk",
-                    "content": chunk
-                }
-                yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                await asyncio.sleep(0.05)
+                yield chunk
+                await pacer.pace(len(chunk))
 
-        # 6. 스트리밍 완료 신호
-        yield f"data: {json.dumps({'type': 'message_end'}, ensure_ascii=False)}\n\n"
+    async for frame in encode_chunks(replay()):
+        yield frame
 
-    return StreamingResponse(generate_stream(), media_type="text/event-stream")
\ No newline at end of file
+    # 6. 스트리밍 완료 신호
+    yield MESSAGE_END
+
+@router.post("/chat/likes", summary="좋아요 기반 추천", description="사용자가 좋아요 표시한 브랜드를 기반으로 구독 서비스 조합을 추천합니다.")
+async def chat_likes(req: LikesChatRequest, last_event_id: Optional[str] = Header(None),
+                     x_stream_resumable: Optional[str] = Header(None)):
+    return await resumable_response(req.session_id, lambda: likes_event_stream(req), "chat_likes", last_event_id, x_stream_resumable)
\ No newline at end of file
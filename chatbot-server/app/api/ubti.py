@@ -1,18 +1,15 @@
 from typing import AsyncGenerator
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from typing import Union
+from fastapi import APIRouter, HTTPException, Header
+from typing import Optional, Union
 from app.schemas.ubti import UBTIRequest, UBTIQuestion, UBTIComplete, UBTIResult
-from app.utils.redis_client import get_session, save_session, delete_session
+from app.utils.redis_client import aget_session, asave_session, adelete_session, session_scope
 from app.prompts.ubti_prompt import get_ubti_prompt
-from app.db.ubti_types_db import get_all_ubti_types
-from app.db.plan_db import get_all_plans
-from app.db.subscription_db import get_products_from_db
-from app.db.brand_db import get_life_brands_from_db
+from app.db.catalog import get_catalog, CatalogSnapshot
 from app.utils.langchain_client import get_chat_model
 import json
+from app.utils.sse_resume import resumable_response
+from app.utils.sse import QUESTION_START, QUESTION_END, QUESTIONS_COMPLETE, encode_event
 from fastapi.responses import JSONResponse
-import asyncio
 import re
 
 router = APIRouter()
@@ -49,81 +46,80 @@ def extract_json_from_response(response_text: str) -> str:
     return response_text.strip()
 
 @router.post("/ubti/question", summary="UBTI 질문", description="UBTI 성향 분석을 위한 4단계 질문을 스트리밍으로 제공합니다.")
-async def next_question(req: UBTIRequest):
+async def next_question(req: UBTIRequest, last_event_id: Optional[str] = Header(None),
+                        x_stream_resumable: Optional[str] = Header(None)):
     """UBTI 질문을 스트리밍으로 전송"""
     async def generate_question_stream():
         session_id = f"ubti_session:{req.session_id}"
-        session = get_session(session_id)
+        async with session_scope(session_id) as session:
+            # 세션이 없으면 초기화
+            if not session:
+                session = {"step": 0, "answers": []}
+                await asave_session(session_id, session)
 
-        # 세션이 없으면 초기화
-        if not session:
-            session = {"step": 0, "answers": []}
-            save_session(session_id, session)
+                # 첫 번째 질문 스트리밍
+                yield QUESTION_START
 
-            # 첫 번째 질문 스트리밍
-            yield f"data: {json.dumps({'type': 'question_start'}, ensure_ascii=False)}\n\n"
-            await asyncio.sleep(0.05)
+                question_data = {
+                    "type": "question_content",
+                    "question": UBTI_QUESTIONS[0],
+                    "step": 0,
+                    "total_steps": len(UBTI_QUESTIONS)
+                }
+                yield encode_event(question_data)
 
-            question_data = {
-                "type": "question_content",
-                "question": UBTI_QUESTIONS[0],
-                "step": 0,
-                "total_steps": len(UBTI_QUESTIONS)
-            }
-            yield f"data: {json.dumps(question_data, ensure_ascii=False)}\n\n"
-
-            yield f"data: {json.dumps({'type': 'question_end'}, ensure_ascii=False)}\n\n"
-            return
+                yield QUESTION_END
+                return
 
-        # 답변이 왔으면 저장하고 step 증가
-        if req.message is not None:
-            session["answers"].append(req.message)
-            session["step"] += 1
-            session["ubti_step"] = session["step"]
-            save_session(session_id, session)
+            # 답변이 왔으면 저장하고 step 증가
+            if req.message is not None:
+                session["answers"].append(req.message)
+                session["step"] += 1
+                session["ubti_step"] = session["step"]
+                await asave_session(session_id, session)
 
 
-        step = session["step"]
+            step = session["step"]
 
-        # 모든 질문이 끝났으면 완료 신호
-        if step >= len(UBTI_QUESTIONS):
-            yield f"data: {json.dumps({'type': 'questions_complete'}, ensure_ascii=False)}\n\n"
-            return
+            # 모든 질문이 끝났으면 완료 신호
+            if step >= len(UBTI_QUESTIONS):
+                yield QUESTIONS_COMPLETE
+                return
 
-        # 다음 질문 스트리밍
-        yield f"data: {json.dumps({'type': 'question_start'}, ensure_ascii=False)}\n\n"
-        await asyncio.sleep(0.05)
+            # 다음 질문 스트리밍
+            yield QUESTION_START
 
-        question_data = {
-            "type": "question_content",
-            "question": UBTI_QUESTIONS[step],
-            "step": step,
-            "total_steps": len(UBTI_QUESTIONS)
-        }
-        yield f"data: {json.dumps(question_data, ensure_ascii=False)}\n\n"
+            question_data = {
+                "type": "question_content",
+                "question": UBTI_QUESTIONS[step],
+                "step": step,
+                "total_steps": len(UBTI_QUESTIONS)
+            }
+            yield encode_event(question_data)
 
-        yield f"data: {json.dumps({'type': 'question_end'}, ensure_ascii=False)}\n\n"
+            yield QUESTION_END
 
-    return StreamingResponse(generate_question_stream(), media_type="text/event-stream")
+    return await resumable_response(req.session_id, generate_question_stream, "ubti_question", last_event_id, x_stream_resumable)
 
 @router.post("/ubti/result", summary="UBTI 결과", description="4단계 질문 완료 후 사용자 성향에 맞는 UBTI 타입 및 맞춤 추천을 제공합니다.")
 async def final_result(req: UBTIRequest):
     """UBTI 최종 결과를 JSON으로 반환 (스트리밍 X) - ID 포함"""
     session_id = f"ubti_session:{req.session_id}"
-    session = get_session(session_id)
+    session = await aget_session(session_id)
 
     if not session or session["step"] < len(UBTI_QUESTIONS):
         raise HTTPException(status_code=400, detail="아직 모든 질문이 마무리되지 않았습니다.")
 
     # 마지막 답변 추가
     session["answers"].append(req.message)
-    delete_session(session_id)
-
-    # 1. 데이터 로드
-    ubti_types = get_all_ubti_types()
-    plans = get_all_plans()
-    subscriptions = get_products_from_db()
-    brands = get_life_brands_from_db()
+    await adelete_session(session_id)
+
+    # 1. 데이터 로드 (카탈로그 스냅샷)
+    catalog = get_catalog()
+    ubti_types = catalog.ubti_types
+    plans = catalog.plans
+    subscriptions = catalog.subscriptions
+    brands = catalog.brands
     if not brands:
         raise HTTPException(500, detail="브랜드 데이터를 찾을 수 없습니다")
 
@@ -169,7 +165,7 @@ async def final_result(req: UBTIRequest):
         parsed_result = add_missing_image_urls(parsed_result)
 
         # 5. ID 검증
-        validate_ubti_response_ids(parsed_result, plans, subscriptions, brands)
+        validate_ubti_response_ids(parsed_result, catalog)
 
         # 6. UBTIResult 스키마에 맞게 데이터 구성
         result_data = UBTIResult(**parsed_result)
@@ -218,13 +214,12 @@ def add_missing_image_urls(parsed_result: dict) -> dict:
         print(f"[ERROR] Failed to add image_url fields: {e}")
         return parsed_result
 
-def validate_ubti_response_ids(parsed_result: dict, plans: list, subscriptions: list, brands: list):
-    """UBTI 응답의 ID 유효성 검증"""
+def validate_ubti_response_ids(parsed_result: dict, catalog: CatalogSnapshot):
+    """UBTI 응답의 ID 유효성 검증 - 카탈로그 id 인덱스 사용"""
 
-    # 유효한 ID 목록 생성
-    valid_plan_ids = {p.id for p in plans}
-    valid_subscription_ids = {s.id for s in subscriptions}
-    valid_brand_ids = {b.id for b in brands}
+    valid_plan_ids = catalog.plans_by_id
+    valid_subscription_ids = catalog.subscriptions_by_id
+    valid_brand_ids = catalog.brands_by_id
 
     if "recommendation" not in parsed_result:
         raise ValueError("recommendation 필드가 없습니다")
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
 from app.schemas.usage import CurrentUsageRequest
 from app.db.user_usage_db import get_user_current_usage
 from app.db.plan_db import get_all_plans
+from app.db.catalog import get_catalog
 from app.db.database import SessionLocal
-from app.db.models import Plan, User
-import json
-import asyncio
+from app.db.models import User
+from app.utils.pacing import get_pacer, use_pacing_mode
+from app.utils.stream_guard import GuardedStreamingResponse
+from app.utils.sse import MESSAGE_START, MESSAGE_END, encode_event, encode_chunks
 import random
 from typing import Optional
 
@@ -32,23 +33,19 @@ def _get_user_plan_status(user_id: int) -> dict:
         db.close()
 
 def get_plan_by_id(plan_id: int) -> Optional[dict]:
-    """plan_id로 실제 DB에서 요금제 정보 조회"""
-    db = SessionLocal()
-    try:
-        plan = db.query(Plan).filter(Plan.id == plan_id).first()
-        if not plan:
-            return None
+    """plan_id로 카탈로그 스냅샷에서 요금제 정보 조회"""
+    plan = get_catalog().plans_by_id.get(plan_id)
+    if not plan:
+        return None
 
-        return {
-            "id": plan.id,
-            "name": plan.name,
-            "price": int(plan.price) if isinstance(plan.price, str) else plan.price,
-            "data": plan.data,
-            "voice": plan.voice,
-            "sms": plan.sms
-        }
-    finally:
-        db.close()
+    return {
+        "id": plan.id,
+        "name": plan.name,
+        "price": int(plan.price) if isinstance(plan.price, str) else plan.price,
+        "data": plan.data,
+        "voice": plan.voice,
+        "sms": plan.sms
+    }
 
 def parse_plan_limits(plan_data: dict) -> dict:
     """요금제 데이터에서 실제 한도 추출"""
@@ -440,9 +437,11 @@ def _generate_usage_explanation(usage, recommendation_type: str, recommended_pla
 @router.post("/usage/recommend")
 async def usage_based_recommendation(
     user_id: int = Query(..., description="사용자 ID"),
-    tone: str = Query("general", description="응답 톤")
+    tone: str = Query("general", description="응답 톤"),
+    pacing: Optional[str] = Query(None, description="스트리밍 속도 (none | typing)")
 ):
     async def generate_stream():
+        use_pacing_mode(pacing)
         try:
             print(f"[DEBUG] Usage recommendation request - user_id: {user_id}, tone: {tone}")
 
@@ -456,27 +455,20 @@ async def usage_based_recommendation(
                     "type": "error",
                     "message": "사용자 정보를 찾을 수 없습니다." if tone == "general" else "어? 사용자를 못 찾겠어! 😅"
                 }
-                yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+                yield encode_event(error_data)
                 return
 
             if not user_status["has_plan"]:
                 # 요금제 미가입 - 안내 메시지만 스트리밍
                 print(f"[INFO] User {user_id} has no plan, providing guidance")
 
-                yield f"data: {json.dumps({'type': 'message_start'}, ensure_ascii=False)}\n\n"
-                await asyncio.sleep(0.05)
+                yield MESSAGE_START
 
                 guidance_message = _generate_no_plan_message(tone)
-                words = guidance_message.split(' ')
-                for i, word in enumerate(words):
-                    chunk_data = {
-                        "type": "message_chunk",
-                        "content": word + (" " if i < len(words) - 1 else "")
-                    }
-                    yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.05)
+                async for frame in encode_chunks(get_pacer().split_text(guidance_message)):
+                    yield frame
 
-                yield f"data: {json.dumps({'type': 'message_end'}, ensure_ascii=False)}\n\n"
+                yield MESSAGE_END
                 return
 
             # 2. 실제 DB에서 사용량 데이터 조회
@@ -506,28 +498,16 @@ async def usage_based_recommendation(
 
                 if not fake_usage_data:
                     # Plan 이름 조회해서 안내 메시지
-                    db = SessionLocal()
-                    try:
-                        user = db.query(User).filter(User.id == user_id).first()
-                        plan = db.query(Plan).filter(Plan.id == user.plan_id).first()
-                        plan_name = plan.name if plan else "현재 요금제"
-                    finally:
-                        db.close()
+                    plan = get_catalog().plans_by_id.get(user_status['plan_id'])
+                    plan_name = plan.name if plan else "현재 요금제"
 
-                    yield f"data: {json.dumps({'type': 'message_start'}, ensure_ascii=False)}\n\n"
-                    await asyncio.sleep(0.05)
+                    yield MESSAGE_START
 
                     no_data_message = _generate_no_usage_data_message(plan_name, tone)
-                    words = no_data_message.split(' ')
-                    for i, word in enumerate(words):
-                        chunk_data = {
-                            "type": "message_chunk",
-                            "content": word + (" " if i < len(words) - 1 else "")
-                        }
-                        yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                        await asyncio.sleep(0.05)
+                    async for frame in encode_chunks(get_pacer().split_text(no_data_message)):
+                        yield frame
 
-                    yield f"data: {json.dumps({'type': 'message_end'}, ensure_ascii=False)}\n\n"
+                    yield MESSAGE_END
                     return
 
                 # 가짜 데이터 사용
@@ -541,7 +521,7 @@ async def usage_based_recommendation(
                     "type": "error",
                     "message": "요금제 데이터를 불러올 수 없습니다." if tone == "general" else "앗! 요금제 데이터가 없어! 😅"
                 }
-                yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+                yield encode_event(error_data)
                 return
 
             # 사용량 분석 결과 전송
@@ -574,8 +554,7 @@ async def usage_based_recommendation(
                     }
                 }
 
-            yield f"data: {json.dumps(usage_summary, ensure_ascii=False)}\n\n"
-            await asyncio.sleep(0.1)
+            yield encode_event(usage_summary)
 
             # 추천 요금제 카드 데이터 전송
             recommendation_type = _analyze_usage_pattern(user_usage)
@@ -600,24 +579,16 @@ async def usage_based_recommendation(
                     ]
                 }
                 print(f"[DEBUG] Sending plan recommendations: {len(recommended_plans)} plans")
-                yield f"data: {json.dumps(plan_data, ensure_ascii=False)}\n\n"
-                await asyncio.sleep(0.1)
+                yield encode_event(plan_data)
 
             # 맞춤 설명 스트리밍
-            yield f"data: {json.dumps({'type': 'message_start'}, ensure_ascii=False)}\n\n"
-            await asyncio.sleep(0.05)
+            yield MESSAGE_START
 
             explanation = _generate_usage_explanation(user_usage, recommendation_type, recommended_plans, tone)
-            words = explanation.split(' ')
-            for i, word in enumerate(words):
-                chunk_data = {
-                    "type": "message_chunk",
-                    "content": word + (" " if i < len(words) - 1 else "")
-                }
-                yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                await asyncio.sleep(0.05)
+            async for frame in encode_chunks(get_pacer().split_text(explanation)):
+                yield frame
 
-            yield f"data: {json.dumps({'type': 'message_end'}, ensure_ascii=False)}\n\n"
+            yield MESSAGE_END
 
         except Exception as e:
             print(f"[ERROR] Usage recommendation failed: {e}")
@@ -628,9 +599,9 @@ async def usage_based_recommendation(
                 "type": "error",
                 "message": f"추천 생성 실패: {str(e)}" if tone == "general" else f"앗! 뭔가 꼬였어! 😅 다시 시도해봐~"
             }
-            yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+            yield encode_event(error_data)
 
-    return StreamingResponse(generate_stream(), media_type="text/event-stream")
+    return GuardedStreamingResponse(generate_stream(), label="usage_recommend")
 
 @router.get("/usage/{user_id}", summary="사용량 조회", description="특정 사용자의 현재 요금제 사용량 및 상태를 조회합니다.")
 async def get_user_usage(user_id: int):
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import uuid
+from typing import Dict
+
+import orjson
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from app.api.chat import chat_event_stream
+from app.api.chat_like import likes_event_stream
+from app.schemas.chat import ChatRequest, LikesChatRequest
+from app.utils.redis_client import SessionScope, open_session_scope, bind_session_scope
+from app.utils.sse import frame_to_ws
+from app.utils.stream_guard import record_stream
+
+router = APIRouter()
+
+WS_MAX_PENDING_TURNS = int(os.getenv("WS_MAX_PENDING_TURNS", "4"))
+
+class ChatConnection:
+    """WebSocket 연결 하나 = 세션 하나 - 세션은 연결 시 한 번 로드하고 턴이 끝날 때마다 변경분만 저장
+
+    턴은 turn_id로 구분해 동시에 받을 수 있지만, 같은 세션을 바꾸는 채팅 턴은 순서대로 실행한다.
+    """
+
+    def __init__(self, websocket: WebSocket, scope: SessionScope):
+        self.websocket = websocket
+        self.scope = scope
+        self.turns: Dict[str, asyncio.Task] = {}
+        self.closed = False
+        self._session_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+
+    @property
+    def session_id(self) -> str:
+        return self.scope.session_id
+
+    async def send_text(self, text: str):
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    async def send_event(self, data: dict):
+        await self.send_text(orjson.dumps(data).decode("utf-8"))
+
+    def dispatch(self, raw: str):
+        """클라이언트 메시지 처리 - chat/likes는 턴 태스크로 실행, cancel은 해당 턴 중단"""
+        try:
+            message = orjson.loads(raw)
+            if not isinstance(message, dict):
+                raise ValueError("JSON 객체가 아님")
+        except ValueError as e:
+            self._spawn(self.send_event({"type": "error", "message": f"잘못된 메시지: {e}"}))
+            return
+
+        kind = message.get("type", "chat")
+        turn_id = str(message.get("turn_id") or uuid.uuid4().hex[:12])
+
+        if kind == "ping":
+            self._spawn(self.send_event({"type": "pong"}))
+        elif kind == "cancel":
+            task = self.turns.get(turn_id)
+            if task is not None:
+                task.cancel()
+        elif kind in ("chat", "likes"):
+            if turn_id in self.turns:
+                self._spawn(self.send_event({"turn_id": turn_id, "type": "error", "message": "이미 진행 중인 turn_id"}))
+            elif len(self.turns) >= WS_MAX_PENDING_TURNS:
+                self._spawn(self.send_event({"turn_id": turn_id, "type": "error", "message": "동시에 진행할 수 있는 턴 수 초과"}))
+            else:
+                self.turns[turn_id] = asyncio.create_task(self._run_turn(turn_id, kind, message))
+        else:
+            self._spawn(self.send_event({"turn_id": turn_id, "type": "error", "message": f"알 수 없는 type: {kind}"}))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _relay(self, turn_id: str, frames):
+        """SSE 라우트와 같은 프레임을 turn_id를 붙여 소켓으로 전달"""
+        try:
+            async for frame in frames:
+                await self.send_text(frame_to_ws(frame, turn_id))
+        finally:
+            await frames.aclose()
+
+    async def _run_turn(self, turn_id: str, kind: str, message: dict):
+        completed = False
+        try:
+            fields = {k: v for k, v in message.items() if k not in ("type", "turn_id", "session_id")}
+            if kind == "likes":
+                req = LikesChatRequest(session_id=self.session_id, **fields)
+                await self._relay(turn_id, likes_event_stream(req))
+            else:
+                req = ChatRequest(session_id=self.session_id, **fields)
+                async with self._session_lock:
+                    try:
+                        # 연결에 캐시된 세션을 이 턴의 세션 스코프로 사용 (Redis 재조회 없음)
+                        with bind_session_scope(self.scope):
+                            await self._relay(turn_id, chat_event_stream(req))
+                        await self.scope.commit()
+                    except BaseException:
+                        # 중단/실패한 턴의 부분 변경은 버리고 저장된 상태로 복구
+                        if not self.closed:
+                            await self.scope.reload()
+                        raise
+            completed = True
+        except ValidationError as e:
+            await self.send_event({"turn_id": turn_id, "type": "error", "message": f"잘못된 요청: {e.errors()}"})
+        except asyncio.CancelledError:
+            if not self.closed:
+                await self.send_event({"turn_id": turn_id, "type": "cancelled"})
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"[ERROR] WebSocket 턴 처리 실패 ({turn_id}): {e}")
+            if not self.closed:
+                await self.send_event({"turn_id": turn_id, "type": "error", "message": "응답 생성 중 문제가 발생했어요."})
+        finally:
+            self.turns.pop(turn_id, None)
+            record_stream(f"ws_{kind}", completed)
+
+    async def close(self):
+        """연결 종료 - 진행 중인 턴 중단 (업스트림 LLM도 닫힘, 커밋 안 된 변경은 저장 안 함)"""
+        self.closed = True
+        turns = list(self.turns.values())
+        for task in turns:
+            task.cancel()
+        if turns:
+            await asyncio.gather(*turns, return_exceptions=True)
+
+@router.websocket("/ws/chat")
+async def ws_chat(websocket: WebSocket, session_id: str = Query(...)):
+    """WebSocket 채팅 - 연결 하나로 여러 턴을 주고받음 (이벤트 형식은 SSE 라우트와 동일 + turn_id)
+
+    클라이언트 → 서버: {"type": "chat", "turn_id", "message", "tone", "pacing", "explanation_mode"}
+                      {"type": "likes", "turn_id", "tone"} / {"type": "cancel", "turn_id"} / {"type": "ping"}
+    """
+    await websocket.accept()
+    connection = ChatConnection(websocket, await open_session_scope(session_id))
+    print(f"[INFO] WebSocket 연결: {session_id}")
+    await connection.send_event({"type": "connected", "session_id": session_id})
+    try:
+        while True:
+            connection.dispatch(await websocket.receive_text())
+    except WebSocketDisconnect:
+        print(f"[INFO] WebSocket 연결 종료: {session_id}")
+    finally:
+        await connection.close()
@@ -1,17 +1,23 @@
 from typing import Callable, Awaitable
-import asyncio
+import os
 import re
-from app.utils.redis_client import get_session, save_session
+from app.utils.redis_client import get_session, save_session, aget_session, asave_session, aadvance_session_step
 from app.db.plan_db import get_all_plans
 from app.db.subscription_db import get_products_from_db
 from app.db.brand_db import get_life_brands_from_db
+from app.db.ubti_types_db import get_all_ubti_types
 
 from app.utils.langchain_client import get_chat_model
+from app.utils.pacing import get_pacer, paced_text_stream
+from app.utils.stream_guard import relay_llm
 from langchain_core.output_parsers import StrOutputParser
 from app.schemas.chat import ChatRequest
-from app.prompts.plan_prompt import PLAN_PROMPTS
+from app.prompts.plan_prompt import PLAN_PROMPTS, PLAN_TEMPLATE_RESPONSES
 from app.prompts.subscription_prompt import SUBSCRIPTION_PROMPT
 
+# 최종 요금제 추천 설명 방식 - "llm"(기본) 또는 "template"(LLM 호출 없이 즉시 응답)
+PLAN_EXPLANATION_MODE = os.getenv("PLAN_EXPLANATION_MODE", "llm")
+
 # 4단계 플로우 (기존 유지)
 PHONE_PLAN_FLOW = {
     "general": [
@@ -52,15 +58,8 @@ UBTI_FLOW = [
 
 
 def create_simple_stream(text: str):
-    """간단한 텍스트를 스트리밍으로 변환"""
-    async def stream():
-        words = text.split(' ')
-        for i, word in enumerate(words):
-            yield word
-            if i < len(words) - 1:
-                yield ' '
-            await asyncio.sleep(0.05)
-    return stream
+    """간단한 텍스트를 스트리밍으로 변환 - 속도는 pacing 정책을 따름"""
+    return paced_text_stream(text)
 
 def format_price(price):
     """가격을 안전하게 포맷팅"""
@@ -197,6 +196,10 @@ def extract_data_requirement(text: str) -> str:
 
 def smart_plan_recommendation(user_info: dict, plans: list) -> list:
     """개선된 스마트 요금제 추천 - 예산과 요구사항 고려"""
+    return [plan for plan, score, price in score_plans(user_info, plans)["scored"][:2]]
+
+def score_plans(user_info: dict, plans: list) -> dict:
+    """요금제 점수 계산 - 점수순 정렬 결과와 해석한 예산/데이터 요구사항 반환"""
 
     # 1. 예산 범위 추출
     budget_text = user_info.get('budget', '')
@@ -296,19 +299,77 @@ def smart_plan_recommendation(user_info: dict, plans: list) -> list:
     for i, (plan, score, price) in enumerate(scored_plans[:3]):
         print(f"  {i+1}. {plan.name} - Score: {score}, Price: {price:,}원")
 
-    return [plan for plan, score, price in scored_plans[:2]]
+    return {
+        "min_budget": min_budget,
+        "max_budget": max_budget,
+        "data_need": data_need,
+        "scored": scored_plans,
+    }
+
+def _plan_reason(plan, price: int, scoring: dict, user_info: dict, tone: str) -> str:
+    """점수 계산에 쓰인 근거로 추천 이유 한 줄 생성"""
+    phrases = PLAN_TEMPLATE_RESPONSES[tone]["reasons"]
+    min_budget, max_budget = scoring["min_budget"], scoring["max_budget"]
+    reasons = []
+
+    # 예산
+    if min_budget <= price <= max_budget:
+        reasons.append(phrases["budget_fit"])
+    elif price < min_budget:
+        reasons.append(phrases["budget_under"].format(gap=format_price(min_budget - price)))
+    else:
+        reasons.append(phrases["budget_over"].format(gap=format_price(price - max_budget)))
+
+    # 데이터
+    if plan.data:
+        plan_data = plan.data.lower()
+        if scoring["data_need"] == "많이" and any(word in plan_data for word in ['무제한', '20gb', '15gb', '12gb', '10gb']):
+            key = "data_heavy"
+        elif scoring["data_need"] == "적게" and any(word in plan_data for word in ['3gb', '5gb', '8gb']):
+            key = "data_light"
+        else:
+            key = "data_normal"
+        reasons.append(phrases[key].format(data=plan.data))
+
+    # 통화
+    call_text = (user_info.get("call_usage") or "").lower()
+    if plan.voice and "무제한" in plan.voice and "많이" in call_text:
+        reasons.append(phrases["voice_unlimited"])
+
+    return ", ".join(reasons)
+
+def render_plan_explanation(scoring: dict, user_info: dict, tone: str = "general") -> str:
+    """LLM 없이 점수 결과 + 사용자 답변으로 최종 추천 문구 생성"""
+    tone = tone if tone in PLAN_TEMPLATE_RESPONSES else "general"
+    template = PLAN_TEMPLATE_RESPONSES[tone]
+    top = scoring["scored"][:2]
+    if not top:
+        return template["empty"]
+
+    answers = {key: user_info.get(key) or "미설정" for key in ["data_usage", "call_usage", "services", "budget"]}
+    parts = [template["header"].format(**answers)]
+    for rank, (plan, score, price) in enumerate(top, 1):
+        parts.append(template["item"].format(
+            rank=rank,
+            name=plan.name,
+            price=format_price(price),
+            reason=_plan_reason(plan, price, scoring, user_info, tone),
+        ))
+    parts.append(template["footer"].format(name=top[0][0].name))
+    return "\n\n".join(parts)
+
+def resolve_explanation_mode(req) -> str:
+    """요청별 설명 방식 (없거나 잘못된 값이면 서버 설정)"""
+    mode = (getattr(req, "explanation_mode", None) or PLAN_EXPLANATION_MODE).lower()
+    return mode if mode in ("llm", "template") else "llm"
 
 async def natural_streaming(text: str):
     """자연스러운 타이핑 효과를 위한 스트리밍"""
     # 마크다운 파싱을 위한 줄바꿈 처리
     formatted_text = text.replace('\\n', '\n')
 
-    words = formatted_text.split(' ')
-    for i, word in enumerate(words):
-        yield word
-        if i < len(words) - 1:
-            yield ' '
-        await asyncio.sleep(0.04)  # 살짝 빠르게
+    async for piece in get_pacer().split_text(formatted_text):
+        yield piece
 
 def get_chain_by_intent(intent: str, req: ChatRequest, tone: str = "general"):
     """인텐트별 체인 반환 - 기본 응답만"""
@@ -361,7 +422,7 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
     print(f"[DEBUG] Input - intent: '{intent}', tone: '{tone}', message: '{req.message}'")
 
     try:
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
         message = req.message.strip()
 
         # 통일된 세션 키 사용
@@ -423,12 +484,14 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
             key, question = question_flow[0]
             print(f"[DEBUG] First question - key: '{key}', question: '{question}'")
 
-            # 단계 증가: 0 → 1
-            session[step_key] = 1
+            # 단계 증가: 0 → 1 (동시에 들어온 다른 요청이 먼저 시작했으면 그 질문을 다시 안내)
+            advanced, actual_step = await aadvance_session_step(req.session_id, session, step_key, 0, 1)
+            if not advanced:
+                return _flow_conflict_stream(question_flow, actual_step, tone)
             session.setdefault("history", [])
             session["history"].append({"role": "user", "content": message})
             session["history"].append({"role": "assistant", "content": question})
-            save_session(req.session_id, session)
+            await asave_session(req.session_id, session)
 
             print(f"[DEBUG] Updated {step_key} to 1")
 
@@ -438,16 +501,19 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
         elif 1 <= current_step <= len(question_flow):
             print(f"[DEBUG] >>> PROCESSING STEP {current_step} <<<")
 
-            # 현재 답변 저장
-            answer_index = current_step - 1
-            if answer_index < len(question_flow):
-                answer_key = question_flow[answer_index][0]
-                user_info[answer_key] = message
-                session[user_info_key] = user_info
-                session.setdefault("history", [])
-                session["history"].append({"role": "user", "content": message})
+            # 현재 답변 저장 + 단계 증가를 한 번에 (마지막 답변 후에는 len+1 = 최종 추천 대기)
+            answer_key = question_flow[current_step - 1][0]
+            advanced, actual_step = await aadvance_session_step(
+                req.session_id, session, step_key, current_step, current_step + 1,
+                user_info_key, answer_key, message,
+            )
+            if not advanced:
+                return _flow_conflict_stream(question_flow, actual_step, tone)
+            user_info = session.get(user_info_key, {})
+            session.setdefault("history", [])
+            session["history"].append({"role": "user", "content": message})
 
-                print(f"[DEBUG] Saved answer for '{answer_key}': '{message}'")
+            print(f"[DEBUG] Saved answer for '{answer_key}': '{message}'")
 
             # 다음 질문이 있는지 확인
             if current_step < len(question_flow):
@@ -455,10 +521,8 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
                 next_key, next_question = question_flow[current_step]
                 print(f"[DEBUG] Next question - key: '{next_key}', question: '{next_question}'")
 
-                # 단계 증가
-                session[step_key] = current_step + 1
                 session["history"].append({"role": "assistant", "content": next_question})
-                save_session(req.session_id, session)
+                await asave_session(req.session_id, session)
 
                 print(f"[DEBUG] Updated {step_key} to {current_step + 1}")
 
@@ -466,16 +530,7 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
             else:
                 # 모든 질문 완료 → 최종 추천
                 print(f"[DEBUG] >>> ALL QUESTIONS COMPLETED - GENERATING FINAL RECOMMENDATION <<<")
-
-                if intent == "phone_plan_multi":
-                    print(f"[DEBUG] Calling get_final_plan_recommendation")
-                    return await get_final_plan_recommendation(req, user_info, tone)
-                elif intent == "subscription_multi":
-                    print(f"[DEBUG] Calling get_final_subscription_recommendation")
-                    return await get_final_subscription_recommendation(req, user_info, tone)
-                elif intent == "ubti":
-                    print(f"[DEBUG] Calling get_final_ubti_result")
-                    return await get_final_ubti_result(req, user_info, tone)
+                return await _final_recommendation(req, intent, user_info, tone)
 
         # 플로우 완료 후 추가 메시지 처리
         else:
@@ -483,11 +538,11 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
             # 플로우 초기화하고 새로운 대화로 처리
             session.pop(step_key, None)
             session.pop(user_info_key, None)
-            save_session(req.session_id, session)
+            await asave_session(req.session_id, session)
 
             # 새로운 메시지를 다시 인텐트 분류로 보냄
             from app.utils.intent import detect_intent
-            new_intent = await detect_intent(message)
+            new_intent = (await detect_intent(message)).intent
 
             if new_intent in ["telecom_plan", "telecom_plan_direct"]:
                 return await get_multi_turn_chain(req, "phone_plan_multi", tone)
@@ -506,7 +561,7 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
         print(f"[ERROR] Traceback: {traceback.format_exc()}")
 
         # 에러 발생 시 플로우 초기화
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
         session.pop("phone_plan_flow_step", None)
         session.pop("subscription_flow_step", None)
         session.pop("plan_step", None)
@@ -514,22 +569,65 @@ async def get_multi_turn_chain(req: ChatRequest, intent: str, tone: str = "gener
         session.pop("user_info", None)
         session.pop("plan_info", None)
         session.pop("subscription_info", None)
-        save_session(req.session_id, session)
+        await asave_session(req.session_id, session)
 
         error_text = "질문 과정에서 문제가 발생했어요. 처음부터 다시 시작해주세요! 😅" if tone == "general" else "앗! 뭔가 꼬였나봐! 처음부터 다시 해보자~ 😵"
         return create_simple_stream(error_text)
 
+async def _final_recommendation(req: ChatRequest, intent: str, user_info: dict, tone: str):
+    if intent == "subscription_multi":
+        print(f"[DEBUG] Calling get_final_subscription_recommendation")
+        return await get_final_subscription_recommendation(req, user_info, tone)
+    if intent == "ubti":
+        print(f"[DEBUG] Calling get_final_ubti_result")
+        return await get_final_ubti_result(req, user_info, tone)
+    print(f"[DEBUG] Calling get_final_plan_recommendation")
+    return await get_final_plan_recommendation(req, user_info, tone)
+
+def _flow_conflict_stream(question_flow, actual_step: int, tone: str):
+    """같은 단계에 요청이 겹쳐 전환에 실패한 경우 - 답변을 덮어쓰지 않고 현재 질문을 다시 안내"""
+    if 1 <= actual_step <= len(question_flow):
+        return create_simple_stream(question_flow[actual_step - 1][1])
+    if actual_step > len(question_flow):
+        text = "답변을 모두 받았어요! 추천을 준비하고 있어요. 😊" if tone == "general" else "다 받았어! 지금 추천 준비 중이야~ 🐙"
+    else:
+        text = "진행 중이던 질문이 초기화됐어요. 다시 말씀해주세요! 😊" if tone == "general" else "질문이 초기화됐어! 다시 말해줘~ 🤟"
+    return create_simple_stream(text)
+
 async def get_final_plan_recommendation(req: ChatRequest, user_info: dict, tone: str = "general"):
     """최종 요금제 추천 - 프롬프트 템플릿 사용 + 마크다운 줄바꿈 수정"""
     print(f"[DEBUG] get_final_plan_recommendation - tone: {tone}")
     print(f"[DEBUG] user_info: {user_info}")
 
     try:
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
         plans = get_all_plans()
 
         # 스마트 추천 적용
-        recommended_plans = smart_plan_recommendation(user_info, plans)
+        scoring = score_plans(user_info, plans)
+        recommended_plans = [plan for plan, score, price in scoring["scored"][:2]]
+
+        async def finish_flow(generated_response: str):
+            """최종 추천 완료 처리 - 플로우 완전 초기화"""
+            session["history"].append({"role": "assistant", "content": generated_response})
+            session["last_recommendation_type"] = "plan"
+            session.pop("phone_plan_flow_step", None)
+            session.pop("plan_step", None)
+            session.pop("user_info", None)
+            session.pop("plan_info", None)
+            await asave_session(req.session_id, session)
+            print(f"[DEBUG] Plan recommendation completed, flow reset")
+
+        # 템플릿 모드 - LLM 호출 없이 바로 응답
+        if resolve_explanation_mode(req) == "template":
+            text = render_plan_explanation(scoring, user_info, tone)
+
+            async def template_stream():
+                yield text
+                await finish_flow(text)
+
+            print(f"[DEBUG] Plan recommendation rendered from template ({len(text)} chars)")
+            return template_stream
 
         merged_info = {
             "data_usage": "미설정", "call_usage": "미설정",
@@ -555,24 +653,14 @@ async def get_final_plan_recommendation(req: ChatRequest, user_info: dict, tone:
 
         async def stream():
             generated_response = ""
+            pacer = get_pacer()
             try:
-                async for chunk in model.astream(prompt_text):
-                    if chunk and hasattr(chunk, 'content') and chunk.content:
-                        generated_response += chunk.content
-                        yield chunk.content
-                        await asyncio.sleep(0.01)
-
-                # 최종 추천 완료 처리
-                session["history"].append({"role": "assistant", "content": generated_response})
-                session["last_recommendation_type"] = "plan"
-                # 플로우 완전 초기화
-                session.pop("phone_plan_flow_step", None)
-                session.pop("plan_step", None)
-                session.pop("user_info", None)
-                session.pop("plan_info", None)
-                save_session(req.session_id, session)
+                async for text in relay_llm(model, prompt_text, "final_plan"):
+                    generated_response += text
+                    yield text
+                    await pacer.pace(len(text))
 
-                print(f"[DEBUG] Plan recommendation completed, flow reset")
+                await finish_flow(generated_response)
 
             except Exception as e:
                 print(f"[ERROR] Final plan recommendation failed: {e}")
@@ -592,7 +680,7 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
     print(f"[DEBUG] user_info: {user_info}")
 
     try:
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
         main_items = get_products_from_db()
         life_items = get_life_brands_from_db()
 
@@ -619,12 +707,12 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
 
         async def stream():
             generated_response = ""
+            pacer = get_pacer()
             try:
-                async for chunk in model.astream(prompt_text):
-                    if chunk and hasattr(chunk, 'content') and chunk.content:
-                        generated_response += chunk.content
-                        yield chunk.content
-                        await asyncio.sleep(0.01)
+                async for text in relay_llm(model, prompt_text, "final_subscription"):
+                    generated_response += text
+                    yield text
+                    await pacer.pace(len(text))
 
                 # 최종 추천 완료 처리
                 session["history"].append({"role": "assistant", "content": generated_response})
@@ -634,7 +722,7 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
                 session.pop("subscription_step", None)
                 session.pop("user_info", None)
                 session.pop("subscription_info", None)
-                save_session(req.session_id, session)
+                await asave_session(req.session_id, session)
 
                 print(f"[DEBUG] Subscription recommendation completed, flow reset")
 
@@ -655,7 +743,7 @@ async def get_final_ubti_result(req: ChatRequest, user_info: dict, tone: str = "
     print(f"[DEBUG] user_info: {user_info}")
 
     try:
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
 
         # UBTI 프롬프트 준비
         from app.prompts.ubti_prompt import UBTI_PROMPT
@@ -683,19 +771,19 @@ async def get_final_ubti_result(req: ChatRequest, user_info: dict, tone: str = "
 
         async def stream():
             result_text = ""
+            pacer = get_pacer()
             try:
-                async for chunk in model.astream(prompt_text):
-                    if chunk and hasattr(chunk, 'content') and chunk.content:
-                        result_text += chunk.content
-                        yield chunk.content
-                        await asyncio.sleep(0.01)
+                async for text in relay_llm(model, prompt_text, "ubti_result"):
+                    result_text += text
+                    yield text
+                    await pacer.pace(len(text))
 
                 # 세션 정리
                 session["history"].append({"role": "assistant", "content": result_text})
                 session["last_recommendation_type"] = "ubti"
                 session.pop("ubti_step", None)
                 session.pop("ubti_info", None)
-                save_session(req.session_id, session)
+                await asave_session(req.session_id, session)
 
             except Exception as e:
                 print(f"[ERROR] UBTI final recommendation failed: {e}")
@@ -777,7 +865,7 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
     print(f"[DEBUG] user_info: {user_info}")
 
     try:
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
         main_items = get_products_from_db()
         life_items = get_life_brands_from_db()
 
@@ -804,13 +892,13 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
 
         async def stream():
             generated_response = ""
+            pacer = get_pacer()
             try:
                 # AI 응답을 바로 스트리밍
-                async for chunk in model.astream(prompt_text):
-                    if chunk and hasattr(chunk, 'content') and chunk.content:
-                        generated_response += chunk.content
-                        yield chunk.content
-                        await asyncio.sleep(0.01)
+                async for text in relay_llm(model, prompt_text, "final_subscription"):
+                    generated_response += text
+                    yield text
+                    await pacer.pace(len(text))
 
                 # 최종 추천 완료 처리
                 session["history"].append({"role": "assistant", "content": generated_response})
@@ -820,7 +908,7 @@ async def get_final_subscription_recommendation(req: ChatRequest, user_info: dic
                 session.pop("subscription_step", None)
                 session.pop("user_info", None)
                 session.pop("subscription_info", None)
-                save_session(req.session_id, session)
+                await asave_session(req.session_id, session)
 
                 print(f"[DEBUG] Subscription recommendation completed, flow reset")
 
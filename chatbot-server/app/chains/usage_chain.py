@@ -1,6 +1,7 @@
 from typing import Callable, Awaitable
-import asyncio
 from app.utils.langchain_client import get_chat_model
+from app.utils.pacing import get_pacer
+from app.utils.stream_guard import relay_llm
 from app.schemas.usage import CurrentUsageRequest, UserUsageInfo
 from app.db.user_usage_db import get_user_current_usage
 from app.db.plan_db import get_all_plans
@@ -50,10 +51,10 @@ async def get_usage_based_recommendation_chain(req: CurrentUsageRequest) -> Call
     model = get_chat_model()
 
     async def stream():
-        async for chunk in model.astream(prompt_text):
-            if chunk and hasattr(chunk, 'content') and chunk.content:
-                yield chunk.content
-                await asyncio.sleep(0.01)
+        pacer = get_pacer()
+        async for text in relay_llm(model, prompt_text, "usage_recommend"):
+            yield text
+            await pacer.pace(len(text))
 
     return stream
 
@@ -1,9 +1,4 @@
-from app.db.database import SessionLocal
-from app.db.models import Brand
+from app.db.catalog import get_catalog
 
 def get_life_brands_from_db():
-    db = SessionLocal()
-    try:
-        return db.query(Brand).all()
-    finally:
-        db.close()
+    return list(get_catalog().brands)
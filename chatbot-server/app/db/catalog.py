@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from app.db.database import SessionLocal
+from app.db.models import Plan, Subscription, Brand, UBType
+
+# 요금제/구독/브랜드/UBTI 타입은 작고 거의 바뀌지 않으므로 프로세스 내 스냅샷으로 제공
+CATALOG_TTL = int(os.getenv("CATALOG_TTL", "600"))  # 10분
+
+@dataclass(frozen=True, slots=True)
+class PlanRecord:
+    id: int
+    name: str
+    price: int
+    description: str
+    data: Optional[str]
+    speed: Optional[str]
+    share_data: Optional[str]
+    voice: Optional[str]
+    sms: Optional[str]
+
+@dataclass(frozen=True, slots=True)
+class SubscriptionRecord:
+    id: int
+    title: str
+    image_url: str
+    category: str
+    price: int
+
+@dataclass(frozen=True, slots=True)
+class BrandRecord:
+    id: int
+    name: str
+    image_url: Optional[str]
+    description: Optional[str]
+    category: str
+
+@dataclass(frozen=True, slots=True)
+class UBTITypeRecord:
+    id: int
+    code: str
+    name: str
+    emoji: Optional[str]
+    description: str
+    image_url: str
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """DB와 분리된 읽기 전용 카탈로그 - 버전 단위로 통째로 교체됨"""
+    version: int
+    loaded_at: float
+    plans: Tuple[PlanRecord, ...]
+    subscriptions: Tuple[SubscriptionRecord, ...]
+    brands: Tuple[BrandRecord, ...]
+    ubti_types: Tuple[UBTITypeRecord, ...]
+    plans_by_id: Mapping[int, PlanRecord]
+    plans_by_name: Mapping[str, PlanRecord]
+    subscriptions_by_id: Mapping[int, SubscriptionRecord]
+    subscriptions_by_title: Mapping[str, SubscriptionRecord]
+    brands_by_id: Mapping[int, BrandRecord]
+    brands_by_name: Mapping[str, BrandRecord]
+    ubti_types_by_id: Mapping[int, UBTITypeRecord]
+    ubti_types_by_code: Mapping[str, UBTITypeRecord]
+
+    def is_expired(self, ttl: int = CATALOG_TTL) -> bool:
+        return ttl > 0 and time.time() - self.loaded_at > ttl
+
+    def summary(self) -> dict:
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "age_seconds": round(time.time() - self.loaded_at, 1),
+            "ttl_seconds": CATALOG_TTL,
+            "plans": len(self.plans),
+            "subscriptions": len(self.subscriptions),
+            "brands": len(self.brands),
+            "ubti_types": len(self.ubti_types),
+        }
+
+def _index(records, attr: str) -> Mapping:
+    return MappingProxyType({getattr(r, attr): r for r in records})
+
+_snapshot: Optional[CatalogSnapshot] = None
+_lock = threading.Lock()
+
+def _load_snapshot(version: int) -> CatalogSnapshot:
+    db = SessionLocal()
+    try:
+        plans = tuple(
+            PlanRecord(p.id, p.name, p.price, p.description, p.data, p.speed, p.share_data, p.voice, p.sms)
+            for p in db.query(Plan).order_by(Plan.id).all()
+        )
+        subscriptions = tuple(
+            SubscriptionRecord(s.id, s.title, s.image_url, s.category, s.price)
+            for s in db.query(Subscription).order_by(Subscription.id).all()
+        )
+        brands = tuple(
+            BrandRecord(b.id, b.name, b.image_url, b.description, b.category)
+            for b in db.query(Brand).order_by(Brand.id).all()
+        )
+        ubti_types = tuple(
+            UBTITypeRecord(u.id, u.code, u.name, u.emoji, u.description, u.image_url)
+            for u in db.query(UBType).order_by(UBType.id).all()
+        )
+    finally:
+        db.close()
+
+    return CatalogSnapshot(
+        version=version,
+        loaded_at=time.time(),
+        plans=plans,
+        subscriptions=subscriptions,
+        brands=brands,
+        ubti_types=ubti_types,
+        plans_by_id=_index(plans, "id"),
+        plans_by_name=_index(plans, "name"),
+        subscriptions_by_id=_index(subscriptions, "id"),
+        subscriptions_by_title=_index(subscriptions, "title"),
+        brands_by_id=_index(brands, "id"),
+        brands_by_name=_index(brands, "name"),
+        ubti_types_by_id=_index(ubti_types, "id"),
+        ubti_types_by_code=_index(ubti_types, "code"),
+    )
+
+def reload_catalog(force: bool = True) -> CatalogSnapshot:
+    """DB에서 카탈로그를 다시 읽어 새 버전으로 교체 - force=False면 락을 잡은 뒤 아직 만료 전일 때 그대로 반환"""
+    global _snapshot
+    with _lock:
+        if not force and _snapshot is not None and not _snapshot.is_expired():
+            return _snapshot  # 기다리는 동안 다른 호출이 이미 갱신함
+        version = _snapshot.version + 1 if _snapshot else 1
+        _snapshot = _load_snapshot(version)
+        print(f"[INFO] 카탈로그 로드 v{version}: 요금제={len(_snapshot.plans)} / 구독={len(_snapshot.subscriptions)} / "
+              f"브랜드={len(_snapshot.brands)} / UBTI={len(_snapshot.ubti_types)}")
+        return _snapshot
+
+_refreshing = threading.Event()  # 백그라운드 갱신 스레드가 돌고 있는지
+
+def _refresh_in_background(snapshot: CatalogSnapshot):
+    try:
+        reload_catalog(force=False)
+    except Exception as e:
+        print(f"[WARNING] 카탈로그 갱신 실패, 기존 스냅샷 v{snapshot.version} 사용: {e}")
+    finally:
+        _refreshing.clear()
+
+def get_catalog() -> CatalogSnapshot:
+    """현재 카탈로그 스냅샷 - TTL 만료 시 기존 스냅샷을 그대로 주고 갱신은 백그라운드 스레드에서
+
+    호출부가 대부분 async SSE 생성기라 DB 조회를 요청 경로(이벤트 루프)에서 하지 않는다.
+    처음 한 번(스냅샷 없음)만 동기 로드.
+    """
+    snapshot = _snapshot
+    if snapshot is None:
+        return reload_catalog(force=False)
+    if snapshot.is_expired() and not _refreshing.is_set():
+        _refreshing.set()
+        threading.Thread(target=_refresh_in_background, args=(snapshot,), name="catalog-refresh", daemon=True).start()
+    return snapshot
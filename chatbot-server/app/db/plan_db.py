@@ -1,8 +1,4 @@
-from app.db.database import SessionLocal
-from app.db.models import Plan
+from app.db.catalog import get_catalog
 
 def get_all_plans():
-    db = SessionLocal()
-    plans = db.query(Plan).all()
-    db.close()
-    return plans
+    return list(get_catalog().plans)
@@ -1,9 +1,4 @@
-from app.db.database import SessionLocal
-from app.db.models import Subscription
+from app.db.catalog import get_catalog
 
 def get_products_from_db():
-    db = SessionLocal()
-    try:
-        return db.query(Subscription).all()
-    finally:
-        db.close()
+    return list(get_catalog().subscriptions)
@@ -1,9 +1,4 @@
-from app.db.database import SessionLocal
-from app.db.models import UBType
+from app.db.catalog import get_catalog
 
 def get_all_ubti_types():
-    db = SessionLocal()
-    try:
-        return db.query(UBType).all()
-    finally:
-        db.close()
+    return list(get_catalog().ubti_types)
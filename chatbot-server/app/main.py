@@ -1,16 +1,28 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import time
+from typing import Optional
 
 from app.api.chat import router as chat_router
 from app.api.usage import router as usage_router
 from app.api.chat_like import router as chat_like_router
 from app.api.ubti import router as ubti_router
 from app.api.user import router as user_router
+from app.api.ws_chat import router as ws_chat_router
 from app.db.database import engine, Base
-from app.utils.redis_client import get_redis_memory_info, emergency_cleanup,get_user_capacity_info, get_capacity_recommendation
+from app.utils.redis_client import emergency_cleanup, get_async_client, close_async_client, session_store
+from app.utils.session_memory import session_memory_sampler, get_memory_status, get_capacity_status
+from app.utils.session_purge import PurgeConflict, start_purge, get_purge_job, cancel_purge
+from app.schemas.session import SessionPurgeRequest
+from app.utils.langchain_client import warmup_llm_clients, close_llm_clients
+from app.db.catalog import get_catalog, reload_catalog
+from app.utils.intent import get_intent_classifier
+from app.utils.pacing import PacingMiddleware
+from app.utils.stream_guard import get_stream_stats
+from app.utils.sse_resume import get_resume_stats
 
 
 @asynccontextmanager
@@ -18,8 +30,23 @@ async def lifespan(app: FastAPI):
     # 애플리케이션 시작 시 테이블 자동 생성
     Base.metadata.create_all(bind=engine)
     print("데이터베이스 테이블 생성 완료")
+    # 요금제/구독/브랜드/UBTI 카탈로그 스냅샷 로드
+    try:
+        reload_catalog()
+    except Exception as e:
+        print(f"[WARNING] 카탈로그 초기 로드 실패 (첫 요청 시 재시도): {e}")
+    # LLM 클라이언트 및 커넥션 풀 미리 준비
+    await warmup_llm_clients()
+    # 인텐트 분류기 + 로컬 모델 준비
+    get_intent_classifier()
+    # 세션 메모리 실측 샘플러 (용량 엔드포인트는 이 결과를 캐시로 사용)
+    if await get_async_client() and session_store.name == "redis":
+        session_memory_sampler.start()
     yield
     print("애플리케이션 종료 중...")
+    await session_memory_sampler.stop()
+    await close_llm_clients()
+    await close_async_client()
 
 app = FastAPI(
     title="4EVER0-AI 챗봇 API",
@@ -39,12 +66,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 스트리밍 속도 모드 (X-Stream-Pacing 헤더)
+app.add_middleware(PacingMiddleware)
+
 # 라우터 등록
 app.include_router(chat_router, prefix="/api", tags=["채팅"])
 app.include_router(usage_router, prefix="/api/chat", tags=["사용량 기반 추천"])
 app.include_router(chat_like_router, prefix="/api", tags=["좋아요 기반 추천"])
 app.include_router(ubti_router, prefix="/api", tags=["UBTI 분석"])
 app.include_router(user_router, prefix="/api", tags=["사용자 관리"])
+app.include_router(ws_chat_router, tags=["WebSocket 채팅"])
 
 
 
@@ -64,6 +95,7 @@ async def root():
             "UBTI 결과": "/api/ubti/result",
             "사용자 조회": "/api/users/{user_id}",
             "용량 상태": "/capacity/status",  # 추가
+            "카탈로그 상태": "/catalog/status",
         },
     }
 
@@ -88,27 +120,89 @@ async def api_status():
 
 @app.get("/redis/status", tags=["Redis 모니터링"])
 async def redis_status():
-    """Redis 메모리 사용량 및 상태 확인"""
-    return get_redis_memory_info()
+    """Redis 메모리 사용량 및 상태 확인 (백그라운드 샘플 캐시)"""
+    return await get_memory_status()
 
 @app.post("/redis/cleanup", tags=["Redis 관리"])
-async def redis_cleanup():
-    """긴급 Redis 메모리 정리 (모든 세션 삭제)"""
-    success = emergency_cleanup()
-    return {
-        "success": success,
-        "message": "모든 세션이 삭제되었습니다" if success else "정리 실패"
-    }
+async def redis_cleanup(req: Optional[SessionPurgeRequest] = None):
+    """세션 정리 시작 - 네임스페이스/유휴 시간/멀티턴 여부/크기 조건으로 배치 삭제 (진행 상황은 job_id로 조회)
+
+    기본값은 멀티턴 진행 중인 세션을 제외한 전체 세션. 메모리 저장소에서는 모든 세션 삭제.
+    다른 조건의 작업이 실행 중이면 409 (실행 중인 작업 ID/조건 포함) - 끝나거나 중단한 뒤 다시 요청.
+    """
+    if session_store.name != "redis":
+        success = emergency_cleanup()
+        return {
+            "success": success,
+            "message": "모든 세션이 삭제되었습니다" if success else "정리 실패"
+        }
+    try:
+        job = start_purge(req or SessionPurgeRequest())
+    except PurgeConflict as e:
+        raise HTTPException(status_code=409, detail={
+            "message": str(e),
+            "running_job_id": e.job.job_id,
+            "running_filters": e.job.request.model_dump(),
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, **job.to_dict()}
+
+@app.get("/redis/cleanup/{job_id}", tags=["Redis 관리"])
+async def redis_cleanup_status(job_id: str):
+    """세션 정리 진행 상황"""
+    job = get_purge_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="정리 작업 없음")
+    return job.to_dict()
+
+@app.delete("/redis/cleanup/{job_id}", tags=["Redis 관리"])
+async def redis_cleanup_cancel(job_id: str):
+    """진행 중인 세션 정리 중단 (이미 삭제된 세션은 복구 안 됨)"""
+    job = cancel_purge(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="정리 작업 없음")
+    return job.to_dict()
+
+@app.get("/catalog/status", tags=["카탈로그 관리"])
+async def catalog_status():
+    """현재 카탈로그 스냅샷 버전 및 항목 수"""
+    return get_catalog().summary()
+
+@app.post("/catalog/reload", tags=["카탈로그 관리"])
+async def catalog_reload():
+    """DB에서 카탈로그를 즉시 다시 로드"""
+    try:
+        snapshot = await asyncio.to_thread(reload_catalog)
+        return {"success": True, **snapshot.summary()}
+    except Exception as e:
+        print(f"[ERROR] 카탈로그 리로드 실패: {e}")
+        return {"success": False, "message": "카탈로그 리로드 실패"}
+
+@app.get("/intent/stats", tags=["인텐트 모니터링"])
+async def intent_stats():
+    """인텐트가 어느 단계(규칙/로컬 모델/LLM)에서 결정됐는지 통계"""
+    return get_intent_classifier().get_stats()
+
+@app.get("/intent/cache/status", tags=["인텐트 모니터링"])
+async def intent_cache_status():
+    """인텐트 분류 캐시 적중/미스/축출 통계"""
+    return get_intent_classifier().cache.get_stats()
+
+@app.get("/stream/stats", tags=["스트리밍 모니터링"])
+async def stream_stats():
+    """SSE 스트림 완료/중단 횟수, 중단으로 아낀 LLM 토큰(추정), 재연결 재생 통계"""
+    return {**get_stream_stats(), "resume": get_resume_stats()}
 
 @app.get("/capacity/status", tags=["용량 모니터링"])
 async def capacity_status():
-    """실시간 사용자 수용 능력 분석"""
-    return get_user_capacity_info()
+    """실측 세션 크기 기반 사용자 수용 능력 분석 (백그라운드 샘플 캐시)"""
+    return await get_capacity_status()
 
 @app.get("/health/detailed", tags=["헬스체크"])
 async def detailed_health():
     """상세 헬스체크 (Redis 포함)"""
-    redis_info = get_redis_memory_info()
+    redis_info = await get_memory_status()
 
     return {
         "api_status": "healthy",
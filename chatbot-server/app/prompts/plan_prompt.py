@@ -78,4 +78,38 @@ PLAN_PROMPTS = {
 
 네 답변 보니 이런 패턴이야! 🤔\n\n위 요금제 중에서 네 스타일에 찰떡인 거:\n\n**🔥 1순위: [요금제명] ([가격])**\n- [왜 찰떡인지 한 줄]\n\n**🔥 2순위: [요금제명] ([가격])** (있으면)\n- [간단한 이유]\n\n**결론**: 1순위 완전 럭키비키! ✨"""
     }
-}
\ No newline at end of file
+}
+
+# LLM 없이 최종 추천을 만드는 템플릿 (PLAN_EXPLANATION_MODE=template)
+PLAN_TEMPLATE_RESPONSES = {
+    "general": {
+        "header": "4단계 상담 완료! 😊\n\n말씀해주신 내용(데이터: {data_usage} / 통화: {call_usage} / 서비스: {services} / 예산: {budget})을 바탕으로 골라봤어요.",
+        "item": "**{rank}순위: {name} ({price})**\n- {reason}",
+        "footer": "**결론**: 1순위 {name} 추천드립니다!",
+        "empty": "조건에 맞는 요금제를 찾지 못했어요. 😔\n예산이나 사용량을 조금 바꿔서 다시 말씀해주세요!",
+        "reasons": {
+            "budget_fit": "예산 범위에 딱 맞아요",
+            "budget_under": "예산보다 {gap} 저렴해요",
+            "budget_over": "예산보다 {gap} 높지만 혜택이 좋아요",
+            "data_heavy": "데이터 {data}로 넉넉하게 쓰실 수 있어요",
+            "data_light": "데이터 {data}로 가볍게 쓰시기 좋아요",
+            "data_normal": "데이터 {data}로 적당해요",
+            "voice_unlimited": "통화도 무제한이에요",
+        },
+    },
+    "muneoz": {
+        "header": "4단계 답변 다 받았어! 🐙\n\n네가 말한 거(데이터: {data_usage} / 통화: {call_usage} / 서비스: {services} / 예산: {budget}) 보고 찰떡인 거 골라봤어!",
+        "item": "**🔥 {rank}순위: {name} ({price})**\n- {reason}",
+        "footer": "**결론**: 1순위 {name} 완전 럭키비키! ✨",
+        "empty": "앗! 조건에 맞는 요금제가 없어! 😅\n예산이나 사용량 살짝 바꿔서 다시 말해줘~ 💜",
+        "reasons": {
+            "budget_fit": "예산 딱 맞아",
+            "budget_under": "예산보다 {gap}이나 싸",
+            "budget_over": "예산보다 {gap} 비싸지만 혜택 좋아",
+            "data_heavy": "데이터 {data}라 완전 넉넉해",
+            "data_light": "데이터 {data}라 가볍게 쓰기 좋아",
+            "data_normal": "데이터 {data}라 적당해",
+            "voice_unlimited": "통화도 무제한이야",
+        },
+    },
+}
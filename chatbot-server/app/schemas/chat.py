@@ -5,6 +5,8 @@ class ChatRequest(BaseModel):
     session_id: str
     message: str
     tone: Optional[str] = "general"  # 기본값: 일반 말투
+    explanation_mode: Optional[str] = None  # 최종 추천 설명 방식: "llm" | "template" (없으면 서버 설정)
+    pacing: Optional[str] = None  # 스트리밍 속도: "none" | "typing" (없으면 X-Stream-Pacing 헤더 → 서버 설정)
 
 class UBTIRequest(BaseModel):
     session_id: str
@@ -13,4 +15,5 @@ class UBTIRequest(BaseModel):
 
 class LikesChatRequest(BaseModel):
     session_id: str
-    tone: Optional[str] = "general"  # 기본값: 일반 말투
\ No newline at end of file
+    tone: Optional[str] = "general"  # 기본값: 일반 말투
+    pacing: Optional[str] = None  # 스트리밍 속도: "none" | "typing"
\ No newline at end of file
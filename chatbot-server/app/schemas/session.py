@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class SessionPurgeRequest(BaseModel):
+    namespace: Optional[str] = None  # "chat" | "ubti" (없으면 모든 세션)
+    min_idle_seconds: int = 0  # 마지막 턴(저장) 후 이 시간 이상 지난 세션만
+    include_multiturn: bool = False  # 멀티턴 진행 중인 세션도 삭제할지 (기본: 보존)
+    min_bytes: Optional[int] = None  # 세션 크기(MEMORY USAGE 합계)가 이 이상인 것만
+    limit: Optional[int] = None  # 최대 삭제 수 (없으면 조건에 맞는 전부)
+    dry_run: bool = False  # 삭제하지 않고 대상 수만 집계
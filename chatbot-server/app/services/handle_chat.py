@@ -1,8 +1,8 @@
-import asyncio
 from app.schemas.chat import ChatRequest
 from app.utils.intent import detect_intent
 from app.chains.chat_chain import get_multi_turn_chain
-from app.utils.redis_client import get_session, save_session
+from app.utils.redis_client import aget_session
+from app.utils.pacing import paced_text_stream
 
 async def handle_chat(req: ChatRequest):
     """메모리 효율적 채팅 핸들러 - 챗봇 품질 유지"""
@@ -12,7 +12,7 @@ async def handle_chat(req: ChatRequest):
 
     try:
         # 세션 로드 및 상태 확인
-        session = get_session(req.session_id)
+        session = await aget_session(req.session_id)
 
         # 멀티턴 상태 체크
         phone_step = session.get("phone_plan_flow_step", 0)
@@ -45,8 +45,9 @@ async def handle_chat(req: ChatRequest):
                 if key in session and session[key] > 0:
                     minimal_context[key] = session[key]
 
-        intent = await detect_intent(req.message, user_context=minimal_context)
-        print(f"[DEBUG] 감지된 인텐트: {intent}")
+        intent_result = await detect_intent(req.message, user_context=minimal_context)
+        intent = intent_result.intent
+        print(f"[DEBUG] 감지된 인텐트: {intent} (tier={intent_result.tier}, sub={intent_result.sub_intent})")
 
         # 인텐트별 처리
         if intent == "greeting":
@@ -78,13 +79,8 @@ async def handle_chat(req: ChatRequest):
         return create_simple_stream(get_error_response(tone))
 
 def create_simple_stream(text: str):
-    """효율적 텍스트 스트리밍"""
-    async def stream():
-        words = text.split(' ')
-        for i, word in enumerate(words):
-            yield word + (" " if i < len(words) - 1 else "")
-            await asyncio.sleep(0.04)  # 적절한 속도
-    return stream
+    """효율적 텍스트 스트리밍 - 속도는 pacing 정책을 따름"""
+    return paced_text_stream(text)
 
 def get_greeting_response(tone: str) -> str:
     """인사 응답"""
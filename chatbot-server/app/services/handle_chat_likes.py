@@ -6,6 +6,7 @@ from app.db.subscription_db import get_products_from_db
 from app.db.brand_db import get_life_brands_from_db
 from app.prompts.like_prompt import get_like_prompt
 from app.utils.langchain_client import get_chat_model
+from app.utils.stream_guard import relay_llm
 
 async def handle_chat_likes(req: LikesChatRequest):
     # tone 파라미터 추출 및 디버깅
@@ -155,9 +156,8 @@ async def handle_chat_likes(req: LikesChatRequest):
 
     async def streamer():
         try:
-            async for chunk in model.astream(prompt):
-                if chunk and hasattr(chunk, 'content') and chunk.content:
-                    yield chunk.content
+            async for text in relay_llm(model, prompt, "likes_recommend"):
+                yield text
         except Exception as e:
             print(f"[ERROR] AI streaming failed: {e}")
             # 에러 발생 시 기본 메시지
@@ -1,5 +1,4 @@
-from app.db.database import SessionLocal
-from app.db.models import UBType
+from app.db.ubti_types_db import get_all_ubti_types
 from app.db.plan_db import get_all_plans
 from app.prompts.ubti_prompt import get_ubti_prompt
 from app.schemas.ubti import UBTIRequest
@@ -148,9 +147,7 @@ async def handle_ubti_chat(req: UBTIRequest) -> str:
 async def get_ubti_types() -> Optional[str]:
     """UBTI 타입 데이터 조회"""
     try:
-        db = SessionLocal()
-        ubti_types = db.query(UBType).all()
-        db.close()
+        ubti_types = get_all_ubti_types()
 
         if not ubti_types:
             print("[ERROR] No UBTI types found in database")
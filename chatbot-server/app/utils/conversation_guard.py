@@ -1,60 +1,45 @@
-import os
 import random
 from typing import Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from app.utils.redis_client import get_session
+from app.utils.langchain_client import get_llm
+from app.utils.redis_client import aget_session
+from app.utils.intent_classifier import IntentResult
 
 class ConversationGuard:
     """대화 가드레일 시스템"""
 
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = get_llm("gpt-4o-mini", temperature=0.7, streaming=False)
 
-    def _get_user_name(self, session_id: str = None) -> str:
+    async def _get_user_name(self, session_id: str = None) -> str:
         """세션에서 사용자 이름 가져오기 - name 필드 있을 때만"""
         if not session_id:
             return ""
 
         try:
-            session = get_session(session_id)
+            session = await aget_session(session_id)
             user_name = session.get("name") or session.get("user_name")
             return f"{user_name}님, " if user_name else ""
         except Exception as e:
             print(f"[DEBUG] Name retrieval failed: {e}")
             return ""
 
-    async def handle_off_topic(self, message: str, tone: str = "general", session_id: str = None) -> str:
-        """오프토픽 응답 생성 - 개인화"""
+    async def handle_off_topic(self, message: str, tone: str = "general", session_id: str = None, intent_result: Optional[IntentResult] = None) -> str:
+        """오프토픽 응답 생성 - 개인화 (이미 분류된 결과 재사용)"""
 
         # 유저 정보 가져오기
-        name_part = self._get_user_name(session_id)
+        name_part = await self._get_user_name(session_id)
 
-        # 세분화된 인텐트에 따른 처리
-        try:
-            from app.utils.intent_classifier import EnhancedIntentClassifier
-            intent_classifier = EnhancedIntentClassifier()
-            detailed_intent = await intent_classifier.classify_intent(message)
-        except ImportError as e:
-            print(f"[ERROR] Intent classifier import failed: {e}")
-            detailed_intent = "off_topic_unclear"  # 기본값 사용
-
-        print(f"[DEBUG] Off-topic detailed intent: {detailed_intent}")
-
-        if detailed_intent == "nonsense":
-            return await self._handle_nonsense_input(message, tone, name_part)
-        elif detailed_intent == "off_topic_interesting":
-            return await self._handle_interesting_off_topic(message, tone, name_part)
-        elif detailed_intent == "off_topic_unclear":
-            return await self._handle_unclear_question(message, tone, name_part)
-        elif detailed_intent == "off_topic_boring":
-            return await self._handle_boring_off_topic(message, tone, name_part)
+        # 세분화된 인텐트 - detect_intent 결과가 있으면 다시 분류하지 않음
+        if intent_result is not None:
+            detailed_intent = intent_result.intent
         else:
-            # 기본 오프토픽 처리
-            return await self._handle_general_off_topic(message, tone, name_part)
+            try:
+                from app.utils.intent import get_intent_classifier
+                detailed_intent = await get_intent_classifier().classify_intent(message)
+            except ImportError as e:
+                print(f"[ERROR] Intent classifier import failed: {e}")
+                detailed_intent = "off_topic_unclear"  # 기본값 사용
+
         print(f"[DEBUG] Off-topic detailed intent: {detailed_intent}")
 
         if detailed_intent == "nonsense":
@@ -199,7 +184,7 @@ class ConversationGuard:
 
     async def handle_greeting(self, message: str, tone: str = "general", session_id: str = None) -> str:
         """개인화된 인사 응답"""
-        name_part = self._get_user_name(session_id)
+        name_part = await self._get_user_name(session_id)
 
         if tone == "muneoz":
             greetings = [
@@ -1,7 +1,8 @@
 # chatbot-server/app/utils/intent.py - 멀티턴 지원 개선
 
 import os
-from app.utils.intent_classifier import EnhancedIntentClassifier
+from typing import Union
+from app.utils.intent_classifier import EnhancedIntentClassifier, IntentResult, KEYWORD_MATCHER
 from app.utils.conversation_guard import ConversationGuard
 
 # 전역 인스턴스 (싱글톤 패턴)
@@ -22,14 +23,14 @@ def get_conversation_guard():
         conversation_guard = ConversationGuard()
     return conversation_guard
 
-async def detect_intent(message: str, user_context: dict = None) -> str:
-    """강화된 인텐트 감지 - 멀티턴 컨텍스트 지원"""
+async def detect_intent(message: str, user_context: dict = None) -> IntentResult:
+    """강화된 인텐트 감지 - 멀티턴 컨텍스트 지원 (메시지당 한 번만 분류)"""
     classifier = get_intent_classifier()
 
     try:
         # 빈 메시지나 None 체크
         if not message or not message.strip():
-            return "off_topic_unclear"
+            return IntentResult("off_topic_unclear", "empty", "rule")
 
         # 🔥 멀티턴 컨텍스트 우선 확인
         if user_context:
@@ -43,20 +44,20 @@ async def detect_intent(message: str, user_context: dict = None) -> str:
                 if key in user_context and user_context[key]:
                     if key.endswith("_step") and user_context[key] > 0:
                         print(f"[DEBUG] Multiturn context detected: {key}={user_context[key]}")
-                        return "multiturn_answer"
+                        return IntentResult("multiturn_answer", key, "context")
                     elif key == "user_info" and user_context[key]:
                         print(f"[DEBUG] User info context detected, likely multiturn")
-                        return "multiturn_answer"
+                        return IntentResult("multiturn_answer", key, "context")
 
         # AI 기반 인텐트 분류 (컨텍스트 포함)
-        intent = await classifier.classify_intent(message, user_context)
-        print(f"[DEBUG] Final detected intent: {intent} for message: '{message[:50]}...'")
-        return intent
+        result = await classifier.classify(message, user_context)
+        print(f"[DEBUG] Final detected intent: {result.intent} (tier={result.tier}, confidence={result.confidence}) for message: '{message[:50]}...'")
+        return result
 
     except Exception as e:
         print(f"[ERROR] Intent detection failed: {e}")
         # 폴백으로 간단한 키워드 체크
-        return _emergency_intent_fallback(message, user_context)
+        return IntentResult(_emergency_intent_fallback(message, user_context), tier="emergency", confidence=None)
 
 def _emergency_intent_fallback(message: str, context: dict = None) -> str:
     """긴급 폴백 - 시스템 오류 시 사용"""
@@ -94,12 +95,12 @@ def _emergency_intent_fallback(message: str, context: dict = None) -> str:
     else:
         return "off_topic_unclear"
 
-async def handle_off_topic_response(message: str, tone: str = "general", session_id: str = None) -> str:
-    """오프토픽 응답 처리 - session_id 전달"""
+async def handle_off_topic_response(message: str, tone: str = "general", session_id: str = None, intent_result: IntentResult = None) -> str:
+    """오프토픽 응답 처리 - session_id 및 분류 결과 전달"""
     guard = get_conversation_guard()
 
     try:
-        return await guard.handle_off_topic(message, tone, session_id)
+        return await guard.handle_off_topic(message, tone, session_id, intent_result)
     except Exception as e:
         print(f"[ERROR] Off-topic handling failed: {e}")
         # 폴백 응답
@@ -282,8 +283,10 @@ def _emergency_nonsense_response(tone: str) -> str:
         return "입력하신 내용을 이해하지 못했어요. 😔\n명확한 질문을 해주세요!"
 
 # ============= 통합 응답 처리 함수 =============
-async def handle_response_by_intent(intent: str, message: str, tone: str = "general", session_id: str = None, context: dict = None) -> str:
-    """인텐트에 따른 통합 응답 처리 - 멀티턴 지원"""
+async def handle_response_by_intent(intent: Union[IntentResult, str], message: str, tone: str = "general", session_id: str = None, context: dict = None) -> str:
+    """인텐트에 따른 통합 응답 처리 - 멀티턴 지원 (detect_intent 결과를 그대로 받음)"""
+    result = intent if isinstance(intent, IntentResult) else IntentResult(intent, tier="caller", confidence=None)
+    intent = result.intent
     try:
         if intent == "multiturn_answer":
             return await handle_multiturn_response(message, context or {}, tone)
@@ -293,8 +296,8 @@ async def handle_response_by_intent(intent: str, message: str, tone: str = "gene
             return await handle_greeting_response(message, tone, session_id)
         elif intent == "tech_issue":
             return await handle_tech_issue_response(message, tone)
-        elif intent.startswith("off_topic"):
-            return await handle_off_topic_response(message, tone, session_id)
+        elif result.is_off_topic:
+            return await handle_off_topic_response(message, tone, session_id, result)
         else:
             return await handle_unknown_response(message, tone)
 
@@ -341,8 +344,7 @@ def validate_user_input(message: str) -> dict:
     result["has_special"] = any(not c.isalnum() and not c.isspace() for c in cleaned)
 
     # 멀티턴 답변 가능성 확인
-    multiturn_indicators = ["많이", "적게", "보통", "드라마", "영화", "gb", "만원"]
-    result["is_likely_multiturn"] = any(indicator in cleaned.lower() for indicator in multiturn_indicators)
+    result["is_likely_multiturn"] = "multiturn_indicator" in KEYWORD_MATCHER.match(cleaned.lower())
     
     # nonsense 여부 판단
     if result["char_variety"] <= 2 and result["length"] > 3:
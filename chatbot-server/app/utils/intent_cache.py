@@ -0,0 +1,130 @@
+# chatbot-server/app/utils/intent_cache.py - 인텐트 분류 결과 캐시 (프로세스 LRU + Redis 해시)
+
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.redis_client import get_async_client
+
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "2048"))
+INTENT_CACHE_TTL = int(os.getenv("INTENT_CACHE_TTL", "3600"))  # 1시간
+INTENT_CACHE_REDIS_KEY = os.getenv("INTENT_CACHE_REDIS_KEY", "intent_cache")
+INTENT_CACHE_REDIS_MAX = int(os.getenv("INTENT_CACHE_REDIS_MAX", "20000"))
+INTENT_CACHE_MAX_MESSAGE = 100  # 긴 문장은 반복될 일이 거의 없어 캐시하지 않음
+
+_PUNCTUATION = re.compile(r"[^\w]+")
+
+def normalize_message(message: str) -> str:
+    """캐시 키용 정규화 - 유니코드 NFKC, 대소문자, 공백/문장부호 제거
+
+    한국어는 띄어쓰기가 제각각이라("요금제 추천해줘" / "요금제추천해줘") 공백도 지운다.
+    """
+    text = unicodedata.normalize("NFKC", message).casefold()
+    return _PUNCTUATION.sub("", text).replace("_", "")
+
+def context_fingerprint(context_str: str) -> str:
+    """LLM 프롬프트에 들어가는 컨텍스트 문자열 기준 지문"""
+    if not context_str or context_str == "대화 시작":
+        return "0"
+    return hashlib.blake2b(context_str.encode("utf-8"), digest_size=6).hexdigest()
+
+class IntentCache:
+    """2단계 캐시 - 프로세스 내 LRU 먼저, 없으면 Redis 해시 (TTL)"""
+
+    def __init__(self, max_size: int = INTENT_CACHE_SIZE, ttl: int = INTENT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Tuple[float, str, Optional[str]]]" = OrderedDict()
+        self.stats = {
+            "local_hits": 0, "redis_hits": 0, "misses": 0,
+            "stores": 0, "evictions": 0, "expired": 0, "redis_errors": 0,
+        }
+
+    def make_key(self, message: str, context_str: str) -> Optional[str]:
+        normalized = normalize_message(message)
+        if not normalized or len(normalized) > INTENT_CACHE_MAX_MESSAGE:
+            return None
+        return f"{context_fingerprint(context_str)}:{normalized}"
+
+    async def get(self, key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(intent, sub_intent) 반환 - 없으면 None"""
+        now = time.time()
+
+        # 1. 프로세스 내 LRU
+        entry = self._local.get(key)
+        if entry is not None:
+            stored_at, intent, sub_intent = entry
+            if now - stored_at <= self.ttl:
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return intent, sub_intent
+            del self._local[key]
+            self.stats["expired"] += 1
+
+        # 2. Redis 해시 (다른 워커가 분류한 결과 공유)
+        client = await get_async_client()
+        if client is not None:
+            try:
+                raw = await client.hget(INTENT_CACHE_REDIS_KEY, key)
+                if raw:
+                    row = json.loads(raw)
+                    if now - row.get("ts", 0) <= self.ttl:
+                        self._put_local(key, row["ts"], row["intent"], row.get("sub_intent"))
+                        self.stats["redis_hits"] += 1
+                        return row["intent"], row.get("sub_intent")
+                    self.stats["expired"] += 1
+            except Exception as e:
+                self.stats["redis_errors"] += 1
+                print(f"[WARNING] 인텐트 캐시 Redis 조회 실패: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, intent: str, sub_intent: Optional[str] = None):
+        now = time.time()
+        self._put_local(key, now, intent, sub_intent)
+        self.stats["stores"] += 1
+
+        client = await get_async_client()
+        if client is None:
+            return
+        try:
+            row = json.dumps({"intent": intent, "sub_intent": sub_intent, "ts": now}, ensure_ascii=False)
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(INTENT_CACHE_REDIS_KEY, key, row)
+                pipe.expire(INTENT_CACHE_REDIS_KEY, self.ttl)
+                pipe.hlen(INTENT_CACHE_REDIS_KEY)
+                _, _, size = await pipe.execute()
+            # 필드별 TTL이 없으므로 너무 커지면 통째로 비움
+            if size > INTENT_CACHE_REDIS_MAX:
+                await client.unlink(INTENT_CACHE_REDIS_KEY)
+                print(f"[INFO] 인텐트 캐시 Redis 해시 초기화 ({size}개 초과)")
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            print(f"[WARNING] 인텐트 캐시 Redis 저장 실패: {e}")
+
+    def _put_local(self, key: str, stored_at: float, intent: str, sub_intent: Optional[str]):
+        self._local[key] = (stored_at, intent, sub_intent)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear_local(self):
+        self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "local_size": len(self._local),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+        }
@@ -2,18 +2,166 @@
 
 import os
 import re
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
 import asyncio
+from app.utils.langchain_client import get_llm
+from app.utils.keyword_matcher import KeywordMatcher
+from app.utils.intent_cache import IntentCache
+
+# 키워드 폴백 분류용 사전 (로컬 인텐트 모델 학습 시드로도 사용)
+TECH_ISSUE_KEYWORDS = [
+    "오류", "에러", "error", "문제", "안돼", "안되", "작동", "버그", "느려", "끊어져",
+    "접속", "연결", "로딩", "loading", "timeout", "시간초과", "느림"
+]
+
+TELECOM_PLAN_KEYWORDS = [
+    "요금제", "통신비", "데이터", "통화", "5g", "lte", "플랜", "너겟", "라이트",
+    "프리미엄", "요금", "통신", "모바일", "핸드폰", "폰", "휴대폰"
+]
+
+SUBSCRIPTION_KEYWORDS = [
+    "구독", "ott", "넷플릭스", "유튜브", "음악", "지니", "스포티파이",
+    "웨이브", "스타벅스", "브랜드"
+]
+
+CURRENT_USAGE_KEYWORDS = ["남은", "현재", "잔여", "상태", "확인", "체크"]
+
+UBTI_KEYWORDS = ["ubti", "성향", "분석", "테스트", "mbti", "타코", "진단"]
+
+OFF_TOPIC_INTERESTING_KEYWORDS = [
+    "영화", "드라마", "음식", "맛집", "여행", "연예인", "취미",
+    "게임", "스포츠", "책", "카페", "쇼핑", "연애", "친구", "만화"
+]
+
+OFF_TOPIC_BORING_KEYWORDS = [
+    "날씨", "시간", "프로그래밍", "코딩", "파이썬", "자바", "리액트",
+    "공부", "학교", "대학교", "취업", "건강", "운동", "뉴스", "정치"
+]
+
+MULTITURN_SHORT_ANSWERS = [
+    "드라마", "영화", "음악", "스포츠", "예능", "많이", "적게", "보통",
+    "무제한", "저렴", "좋아해", "좋아", "싫어", "가끔", "자주",
+    "예", "아니요", "네", "아니", "맞아", "글쎄", "모르겠어",
+    "3만원", "5만원", "7만원", "10만원", "3gb", "5gb", "10gb",
+    "출퇴근", "저녁", "주말", "밤", "아침", "점심", "낮", "새벽"
+]
+
+EXACT_GREETINGS = ["안녕", "hi", "hello", "헬로", "하이", "안뇽", "반가워", "반갑"]
+
+VALID_INTENTS = [
+    "greeting", "telecom_plan", "subscription", "current_usage", "ubti",
+    "tech_issue", "off_topic_interesting", "off_topic_boring",
+    "off_topic_unclear", "nonsense", "multiturn_answer"
+]
+
+# 로컬 모델 확신도가 이 값 미만일 때만 LLM 호출 - 비워 두면 오프라인 평가로 모델에 저장된 값 사용
+LOCAL_INTENT_THRESHOLD = os.getenv("LOCAL_INTENT_THRESHOLD", "")
+
+NONSENSE_TEST_INPUTS = [
+    "test", "테스트", "ㅁㄷㄱㄹ", "asdf", "qwer", "1234", "0000",
+    "ㅁㄴㅇㄹ", "zxcv", "ㅋㅋㅋㅋㅋ", "ㅎㅎㅎㅎㅎ"
+]
+
+BUDGET_KEYWORDS = ['예산', '돈', '가격', '비용', '통신비', '요금']
+
+# validate_user_input의 멀티턴 답변 추정용
+MULTITURN_INDICATORS = ["많이", "적게", "보통", "드라마", "영화", "gb", "만원"]
+
+# 모든 키워드 사전을 하나의 오토마톤으로 - 메시지당 한 번만 순회
+KEYWORD_MATCHER = KeywordMatcher({
+    "tech_issue": TECH_ISSUE_KEYWORDS,
+    "telecom_plan": TELECOM_PLAN_KEYWORDS,
+    "subscription": SUBSCRIPTION_KEYWORDS,
+    "current_usage": CURRENT_USAGE_KEYWORDS,
+    "ubti": UBTI_KEYWORDS,
+    "off_topic_interesting": OFF_TOPIC_INTERESTING_KEYWORDS,
+    "off_topic_boring": OFF_TOPIC_BORING_KEYWORDS,
+    "multiturn": MULTITURN_SHORT_ANSWERS,
+    "budget": BUDGET_KEYWORDS,
+    "multiturn_indicator": MULTITURN_INDICATORS,
+})
+
+# 키워드 카테고리 → 인텐트 (가격 체크 이후 적용되는 우선순위 순)
+KEYWORD_INTENT_PRIORITY = (
+    "tech_issue", "telecom_plan", "subscription", "current_usage",
+    "ubti", "off_topic_interesting", "off_topic_boring",
+)
+_PRIORITY_BITS = tuple((1 << KEYWORD_MATCHER.categories.index(name), name) for name in KEYWORD_INTENT_PRIORITY)
+_MULTITURN_BIT = 1 << KEYWORD_MATCHER.categories.index("multiturn")
+_BUDGET_BIT = 1 << KEYWORD_MATCHER.categories.index("budget")
+
+# 한국어 숫자 → 아라비아 숫자 (replace 10회 대신 translate 1회)
+KOREAN_DIGITS = str.maketrans({
+    '일': '1', '이': '2', '삼': '3', '사': '4', '오': '5',
+    '육': '6', '칠': '7', '팔': '8', '구': '9', '십': '10'
+})
+
+PRICE_PATTERN = re.compile("|".join([
+    r'\d+만\s*원?',           # "5만원", "5만"
+    r'\d{4,6}\s*원',          # "50000원"
+    r'\d+천\s*원?',           # "3천원"
+    r'\d+만원대',             # "3만원대"
+    r'\d+만원?\s*(?:이하|미만|까지|정도|쯤)',  # "5만원 이하"
+    r'\d+만원?\s*(?:이상|넘|초과)',          # "5만원 이상"
+    r'\d+[\-~]\d+만원?',      # "3-5만원"
+]))
+
+SHORT_UNIT_PATTERN = re.compile(r'\d+gb|\d+만원?|\d+시간?|\d+분')  # "5gb", "3만원", "2시간", "30분"
+
+NONSENSE_PATTERN = re.compile("|".join([
+    r'^[qwertyuiop\[\]\\asdfghjkl;\'zxcvbnm,\./]+$',  # 키보드 순서
+    r'^[ㅁㄴㅇㄹㅎㅗㅓㅏㅣㅡㅜㅠㅋㅌㅊㅍㅎ]+$',  # 한글 자음/모음만
+    r'^\d+$',  # 숫자만 (5자 이상)
+]))
+
+_EXACT_GREETINGS = frozenset(EXACT_GREETINGS)
+_NONSENSE_TEST_INPUTS = frozenset(NONSENSE_TEST_INPUTS)
+_UNCLEAR_INPUTS = frozenset(["뭐", "그거", "저거", "이거", "어떻게", "왜", "?", "??", "???", "ㅁ?", "어?"])
+_LAUGH_CHARS = frozenset("ㅋㅎㅠㅜ하호")
+
+@dataclass(frozen=True, slots=True)
+class IntentResult:
+    """메시지당 한 번 분류한 결과 - 응답 핸들러까지 그대로 전달"""
+    intent: str
+    sub_intent: Optional[str] = None   # 오프토픽 세부 유형, 가격 언급, 멀티턴 플로우 키 등
+    tier: str = "rule"                 # context / rule / price / local_model / llm / llm_fallback / error ...
+    confidence: Optional[float] = 1.0  # LLM 분류는 확신도 없음(None)
+
+    @property
+    def is_off_topic(self) -> bool:
+        return self.intent.startswith("off_topic")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"intent": self.intent, "sub_intent": self.sub_intent, "tier": self.tier, "confidence": self.confidence}
+
+def _off_topic_detail(intent: str) -> Optional[str]:
+    """off_topic_interesting → interesting"""
+    return intent[len("off_topic_"):] if intent.startswith("off_topic_") else None
 
 class EnhancedIntentClassifier:
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = get_llm("gpt-4o-mini", temperature=0.1, streaming=False)
+
+        # 로컬 학습 모델 (없으면 LLM으로만 분류)
+        from app.utils.intent_model import DEFAULT_LOCAL_THRESHOLD, load_local_model
+        self.local_model = load_local_model()
+        if LOCAL_INTENT_THRESHOLD:
+            self.local_threshold = float(LOCAL_INTENT_THRESHOLD)
+        elif self.local_model is not None and self.local_model.threshold is not None:
+            self.local_threshold = self.local_model.threshold
+        else:
+            self.local_threshold = DEFAULT_LOCAL_THRESHOLD
+
+        # LLM 분류 결과 캐시 (정규화된 메시지 + 컨텍스트 지문)
+        self.cache = IntentCache()
+
+        # 어느 단계에서 인텐트가 결정됐는지 통계
+        self.tier_stats = {
+            "context": 0, "rule": 0, "price": 0,
+            "local_model": 0, "cache": 0, "llm": 0, "llm_fallback": 0,
+        }
 
         self.intent_prompt = ChatPromptTemplate.from_template("""
 당신은 LG유플러스 챗봇의 인텐트 분류 전문가입니다.
@@ -59,37 +207,66 @@ class EnhancedIntentClassifier:
 """)
 
     async def classify_intent(self, message: str, context: Dict[str, Any] = None) -> str:
+        """인텐트 이름만 필요한 기존 호출부용"""
+        return (await self.classify(message, context)).intent
+
+    def _decide(self, tier: str, intent: str, confidence: Optional[float] = 1.0, sub_intent: Optional[str] = None) -> IntentResult:
+        """결정 단계 통계 기록 후 결과 생성"""
+        if tier in self.tier_stats:
+            self.tier_stats[tier] += 1
+        return IntentResult(intent, sub_intent or _off_topic_detail(intent), tier, confidence)
+
+    async def classify(self, message: str, context: Dict[str, Any] = None) -> IntentResult:
         """AI 기반 정확한 인텐트 분류 - 멀티턴 우선 처리"""
         try:
             # 입력 검증
             if not message or len(message.strip()) == 0:
-                return "off_topic_unclear"
+                return IntentResult("off_topic_unclear", "empty", "rule")
 
             # 🔥 멀티턴 컨텍스트 우선 확인
             if context and self._is_multiturn_context(context):
                 print(f"[DEBUG] Multiturn context detected: {list(context.keys())}")
-                return "multiturn_answer"
+                return self._decide("context", "multiturn_answer")
+
+            # 키워드 매칭은 메시지당 한 번만
+            mask = KEYWORD_MATCHER.match_mask(message.lower().strip())
 
             # 폴백 로직으로 확실한 케이스 체크
-            fallback_intent = self._enhanced_fallback_classification(message, context)
+            fallback_intent = self._enhanced_fallback_classification(message, context, mask)
 
             # 확실한 케이스는 AI 호출 없이 바로 반환
             if fallback_intent in ["greeting", "nonsense", "tech_issue", "multiturn_answer"]:
                 print(f"[DEBUG] Fallback classified intent: {fallback_intent}")
-                return fallback_intent
+                return self._decide("rule", fallback_intent)
 
             # 가격 관련은 확실히 요금제로 분류
-            if self._has_price_mention(message):
-                # 🔥 단, 멀티턴 중이면 multiturn_answer
-                if context and self._is_multiturn_context(context):
-                    return "multiturn_answer"
+            if self._has_price_mention(message, mask):
                 print(f"[DEBUG] Price mention detected, classifying as telecom_plan")
-                return "telecom_plan"
+                return self._decide("price", "telecom_plan", sub_intent="price_mention")
+
+            # 로컬 모델 분류 - 확신도가 충분하면 LLM 생략
+            if self.local_model is not None:
+                try:
+                    local_intent, confidence = self.local_model.predict(message)
+                    # 멀티턴 진행 중이면 위에서 이미 결정됨 - 여기서 나온 multiturn_answer는 오분류라 LLM에 넘김
+                    if local_intent != "multiturn_answer" and confidence >= self.local_threshold:
+                        print(f"[DEBUG] Local model classified intent: {local_intent} ({confidence:.2f})")
+                        return self._decide("local_model", local_intent, round(confidence, 3))
+                    print(f"[DEBUG] Local model low confidence: {local_intent} ({confidence:.2f}), asking LLM")
+                except Exception as model_error:
+                    print(f"[WARNING] Local model prediction failed: {model_error}")
+
+            # 같은 메시지를 이미 LLM이 분류했으면 재사용
+            context_str = self._format_context(context) if context else "대화 시작"
+            cache_key = self.cache.make_key(message, context_str)
+            if cache_key:
+                cached = await self.cache.get(cache_key)
+                if cached:
+                    print(f"[DEBUG] Intent cache hit: {cached[0]}")
+                    return self._decide("cache", cached[0], None, cached[1])
 
             # AI 분류 시도 (애매한 케이스만)
             try:
-                context_str = self._format_context(context) if context else "대화 시작"
-
                 chain = self.intent_prompt | self.llm
                 response = await asyncio.wait_for(
                     chain.ainvoke({"message": message, "context": context_str}),
@@ -98,29 +275,41 @@ class EnhancedIntentClassifier:
                 intent = response.content.strip().lower()
 
                 # 유효한 인텐트인지 검증
-                valid_intents = [
-                    "greeting", "telecom_plan", "subscription", "current_usage", "ubti",
-                    "tech_issue", "off_topic_interesting", "off_topic_boring",
-                    "off_topic_unclear", "nonsense", "multiturn_answer"
-                ]
-
-                if intent in valid_intents:
+                if intent in VALID_INTENTS:
                     print(f"[DEBUG] AI classified intent: {intent}")
-                    return intent
+                    # 다음 로컬 모델 학습용 라벨 기록
+                    from app.utils.intent_model import alog_intent_label
+                    await alog_intent_label(message, intent)
+                    result = self._decide("llm", intent, None)
+                    if cache_key:
+                        await self.cache.set(cache_key, result.intent, result.sub_intent)
+                    return result
                 else:
                     print(f"[DEBUG] AI returned invalid intent: {intent}, using fallback")
-                    return fallback_intent
+                    return self._decide("llm_fallback", fallback_intent, None)
 
             except asyncio.TimeoutError:
                 print(f"[WARNING] AI classification timeout, using fallback")
-                return fallback_intent
+                return self._decide("llm_fallback", fallback_intent, None)
             except Exception as ai_error:
                 print(f"[WARNING] AI classification error: {ai_error}, using fallback")
-                return fallback_intent
+                return self._decide("llm_fallback", fallback_intent, None)
 
         except Exception as e:
             print(f"[ERROR] Intent classification failed: {e}")
-            return self._enhanced_fallback_classification(message, context)
+            return IntentResult(self._enhanced_fallback_classification(message, context), tier="error", confidence=None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """단계별 인텐트 결정 횟수 및 비율"""
+        total = sum(self.tier_stats.values())
+        return {
+            "total": total,
+            "local_model_enabled": self.local_model is not None,
+            "local_threshold": self.local_threshold,
+            "cache": self.cache.get_stats(),
+            "tiers": dict(self.tier_stats),
+            "ratios": {tier: round(count / total, 3) if total else 0.0 for tier, count in self.tier_stats.items()},
+        }
 
     def _is_multiturn_context(self, context: Dict[str, Any]) -> bool:
         """멀티턴 대화 컨텍스트 감지"""
@@ -178,43 +367,24 @@ class EnhancedIntentClassifier:
 
         return ", ".join(info_parts) if info_parts else "대화 시작"
 
-    def _has_price_mention(self, message: str) -> bool:
+    def _has_price_mention(self, message: str, mask: int = None) -> bool:
         """가격 언급 감지 - 강화된 한국어 처리"""
-        text_lower = message.lower().strip()
-
-        # 한국어 숫자 변환
-        korean_numbers = {
-            '일': '1', '이': '2', '삼': '3', '사': '4', '오': '5',
-            '육': '6', '칠': '7', '팔': '8', '구': '9', '십': '10'
-        }
-
-        for kr, num in korean_numbers.items():
-            text_lower = text_lower.replace(kr, num)
-
-        # 가격 관련 패턴들
-        price_patterns = [
-            r'\d+만\s*원?',           # "5만원", "5만"
-            r'\d{4,6}\s*원',          # "50000원"
-            r'\d+천\s*원?',           # "3천원"
-            r'\d+만원대',             # "3만원대"
-            r'\d+만원?\s*(이하|미만|까지|정도|쯤)',  # "5만원 이하"
-            r'\d+만원?\s*(이상|넘|초과)',          # "5만원 이상"
-            r'\d+[\-~]\d+만원?',      # "3-5만원"
-        ]
-
-        for pattern in price_patterns:
-            if re.search(pattern, text_lower):
-                print(f"[DEBUG] Price pattern detected: {pattern} in '{message}'")
-                return True
-
-        # 예산 관련 키워드
-        budget_keywords = ['예산', '돈', '가격', '비용', '통신비', '요금']
-        if any(keyword in text_lower for keyword in budget_keywords):
+        lowered = message.lower().strip()
+        if mask is None:
+            mask = KEYWORD_MATCHER.match_mask(lowered)
+        if self._match_price(lowered, mask):
+            print(f"[DEBUG] Price mention detected in '{message}'")
             return True
-
         return False
 
-    def _enhanced_fallback_classification(self, message: str, context: Dict[str, Any] = None) -> str:
+    @staticmethod
+    def _match_price(lowered: str, mask: int) -> bool:
+        """가격 패턴(한국어 숫자 변환 후) 또는 예산 키워드"""
+        if mask & _BUDGET_BIT:
+            return True
+        return PRICE_PATTERN.search(lowered.translate(KOREAN_DIGITS)) is not None
+
+    def _enhanced_fallback_classification(self, message: str, context: Dict[str, Any] = None, mask: int = None) -> str:
         """강화된 키워드 기반 폴백 - 멀티턴 우선 처리"""
         lowered = message.lower().strip()
         original = message.strip()
@@ -232,65 +402,9 @@ class EnhancedIntentClassifier:
         if self._is_greeting_input(lowered):
             return "greeting"
 
-        # 입력이 너무 짧은 경우 → 멀티턴 답변일 가능성
-        if len(lowered) <= 10 and self._is_likely_multiturn_answer(lowered):
-            return "multiturn_answer"
-
-        # 가격 언급 확인 (높은 우선순위)
-        if self._has_price_mention(message):
-            return "telecom_plan"
-
-        # 기술 문제 관련
-        tech_keywords = [
-            "오류", "에러", "error", "문제", "안돼", "안되", "작동", "버그", "느려", "끊어져",
-            "접속", "연결", "로딩", "loading", "timeout", "시간초과", "느림"
-        ]
-        if any(k in lowered for k in tech_keywords):
-            return "tech_issue"
-
-        # 요금제 관련 - 핵심 키워드만
-        plan_keywords = [
-            "요금제", "통신비", "데이터", "통화", "5g", "lte", "플랜", "너겟", "라이트",
-            "프리미엄", "요금", "통신", "모바일", "핸드폰", "폰", "휴대폰"
-        ]
-
-        if any(k in lowered for k in plan_keywords):
-            return "telecom_plan"
-
-        # 구독 서비스 관련 - 핵심 키워드만
-        subscription_keywords = [
-            "구독", "ott", "넷플릭스", "유튜브", "음악", "지니", "스포티파이",
-            "웨이브", "스타벅스", "브랜드"
-        ]
-
-        if any(k in lowered for k in subscription_keywords):
-            return "subscription"
-
-        # 현재 사용량 관련
-        current_usage_keywords = ["남은", "현재", "잔여", "상태", "확인", "체크"]
-        if any(k in lowered for k in current_usage_keywords):
-            return "current_usage"
-
-        # UBTI 관련
-        ubti_keywords = ["ubti", "성향", "분석", "테스트", "mbti", "타코", "진단"]
-        if any(k in lowered for k in ubti_keywords):
-            return "ubti"
-
-        # 재미있는 오프토픽
-        interesting_keywords = [
-            "영화", "드라마", "음식", "맛집", "여행", "연예인", "취미",
-            "게임", "스포츠", "책", "카페", "쇼핑", "연애", "친구", "만화"
-        ]
-        if any(k in lowered for k in interesting_keywords):
-            return "off_topic_interesting"
-
-        # 일반 오프토픽
-        boring_keywords = [
-            "날씨", "시간", "프로그래밍", "코딩", "파이썬", "자바", "리액트",
-            "공부", "학교", "대학교", "취업", "건강", "운동", "뉴스", "정치"
-        ]
-        if any(k in lowered for k in boring_keywords):
-            return "off_topic_boring"
+        intent = self._keyword_fallback(lowered, mask)
+        if intent:
+            return intent
 
         # 애매한 질문 감지
         if self._is_unclear_question(lowered):
@@ -300,53 +414,45 @@ class EnhancedIntentClassifier:
         print(f"[DEBUG] No clear classification, defaulting to off_topic_unclear")
         return "off_topic_unclear"
 
-    def _is_likely_multiturn_answer(self, lowered: str) -> bool:
+    def _keyword_fallback(self, lowered: str, mask: int = None) -> str:
+        """한 번의 매칭 결과에 기존 우선순위 적용 (매칭 없으면 None)"""
+        if mask is None:
+            mask = KEYWORD_MATCHER.match_mask(lowered)
+
+        # 입력이 너무 짧은 경우 → 멀티턴 답변일 가능성
+        if len(lowered) <= 10 and self._is_likely_multiturn_answer(lowered, mask):
+            return "multiturn_answer"
+
+        # 가격 언급 확인 (높은 우선순위)
+        if self._match_price(lowered, mask):
+            return "telecom_plan"
+
+        # 기술 문제 → 요금제 → 구독 → 사용량 → UBTI → 오프토픽 순
+        for bit, intent in _PRIORITY_BITS:
+            if mask & bit:
+                return intent
+        return None
+
+    def _is_likely_multiturn_answer(self, lowered: str, mask: int = None) -> bool:
         """멀티턴 대화에서의 답변일 가능성 확인"""
-        # 10자 이하 짧은 답변들
-        short_answers = [
-            "드라마", "영화", "음악", "스포츠", "예능", "많이", "적게", "보통",
-            "무제한", "저렴", "좋아해", "좋아", "싫어", "가끔", "자주",
-            "예", "아니요", "네", "아니", "맞아", "글쎄", "모르겠어",
-            "3만원", "5만원", "7만원", "10만원", "3gb", "5gb", "10gb",
-            "출퇴근", "저녁", "주말", "밤", "아침", "점심", "낮", "새벽"
-        ]
+        if mask is None:
+            mask = KEYWORD_MATCHER.match_mask(lowered)
 
-        # 키워드 완전 포함 체크
-        for answer in short_answers:
-            if answer in lowered:
-                return True
+        # 짧은 답변 키워드 포함
+        if mask & _MULTITURN_BIT:
+            return True
 
         # 숫자+단위 패턴 (5자 이하)
-        if len(lowered) <= 5:
-            patterns = [
-                r'\d+gb',      # "5gb"
-                r'\d+만원?',   # "3만원"
-                r'\d+시간?',   # "2시간"
-                r'\d+분',      # "30분"
-            ]
-            for pattern in patterns:
-                if re.search(pattern, lowered):
-                    return True
-
-        return False
+        return len(lowered) <= 5 and SHORT_UNIT_PATTERN.search(lowered) is not None
 
     def _is_greeting_input(self, lowered: str) -> bool:
         """인사 입력 감지 - 정확도 향상"""
-        # 정확한 인사말들
-        exact_greetings = ["안녕", "hi", "hello", "헬로", "하이", "안뇽", "반가워", "반갑"]
-
         # 완전 일치 체크
-        if lowered in exact_greetings:
+        if lowered in _EXACT_GREETINGS:
             return True
 
         # 시작 패턴 체크 (3글자 이상일 때만)
-        if len(lowered) >= 3:
-            start_patterns = ["안녕", "hello", "헬로"]
-            for pattern in start_patterns:
-                if lowered.startswith(pattern):
-                    return True
-
-        return False
+        return len(lowered) >= 3 and lowered.startswith(("안녕", "hello", "헬로"))
 
     def _is_nonsense_input(self, original: str, lowered: str) -> bool:
         """의미없는 입력 감지 - 더 정확하게"""
@@ -356,45 +462,18 @@ class EnhancedIntentClassifier:
             return True
 
         # 2. 단순 반복 문자 (웃음 표현 제외)
-        if len(set(original)) <= 2 and len(original) > 3:
-            if not any(laugh in original for laugh in ['ㅋ', 'ㅎ', 'ㅠ', 'ㅜ', '하', '호']):
+        if len(original) > 3:
+            chars = set(original)
+            if len(chars) <= 2 and not chars & _LAUGH_CHARS:
                 return True
 
         # 3. 테스트성 입력
-        test_inputs = [
-            "test", "테스트", "ㅁㄷㄱㄹ", "asdf", "qwer", "1234", "0000",
-            "ㅁㄴㅇㄹ", "zxcv", "ㅋㅋㅋㅋㅋ", "ㅎㅎㅎㅎㅎ"
-        ]
-
-        if lowered in test_inputs:
+        if lowered in _NONSENSE_TEST_INPUTS:
             return True
 
         # 4. 랜덤 키보드 입력 (5자 이상)
-        if len(original) >= 5:
-            nonsense_patterns = [
-                r'^[qwertyuiop\[\]\\asdfghjkl;\'zxcvbnm,\./]+$',  # 키보드 순서
-                r'^[ㅁㄴㅇㄹㅎㅗㅓㅏㅣㅡㅜㅠㅋㅌㅊㅍㅎ]+$',  # 한글 자음/모음만
-                r'^\d+$',  # 숫자만 (5자 이상)
-            ]
-
-            for pattern in nonsense_patterns:
-                if re.match(pattern, lowered):
-                    return True
-
-        return False
+        return len(original) >= 5 and NONSENSE_PATTERN.match(lowered) is not None
 
     def _is_unclear_question(self, lowered: str) -> bool:
-        """애매하고 불분명한 질문 감지"""
-
-        # 너무 애매한 표현들 (단독 사용시만)
-        unclear_words = ["뭐", "그거", "저거", "이거", "어떻게", "왜"]
-
-        # 3글자 이하이고 애매한 단어만 있는 경우
-        if len(lowered) <= 3 and any(word == lowered for word in unclear_words):
-            return True
-
-        # 질문표만 있는 경우
-        if lowered in ["?", "??", "???", "ㅁ?", "어?"]:
-            return True
-
-        return False
\ No newline at end of file
+        """애매하고 불분명한 질문 감지 - 단독 사용된 애매한 표현이나 물음표만"""
+        return lowered in _UNCLEAR_INPUTS
@@ -0,0 +1,273 @@
+# chatbot-server/app/utils/intent_model.py - 로컬 인텐트 분류 모델 (문자 n-gram TF-IDF + 선형 모델)
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.utils.intent_classifier import (
+    TECH_ISSUE_KEYWORDS, TELECOM_PLAN_KEYWORDS, SUBSCRIPTION_KEYWORDS,
+    CURRENT_USAGE_KEYWORDS, UBTI_KEYWORDS, OFF_TOPIC_INTERESTING_KEYWORDS,
+    OFF_TOPIC_BORING_KEYWORDS, MULTITURN_SHORT_ANSWERS, EXACT_GREETINGS,
+    NONSENSE_TEST_INPUTS, VALID_INTENTS,
+)
+
+_BASE_DIR = Path(__file__).resolve().parent.parent.parent
+# 모델은 오프라인 학습(python -m app.utils.intent_model train, Docker 빌드 시 실행)으로만 만들고 서버는 로드만 한다
+INTENT_MODEL_PATH = Path(os.getenv("INTENT_MODEL_PATH", str(_BASE_DIR / "models" / "intent_model.joblib")))
+INTENT_LABEL_LOG = Path(os.getenv("INTENT_LABEL_LOG", str(_BASE_DIR / "models" / "intent_labels.jsonl")))
+# 사용자 원문이 파일에 남으므로 기본은 끔 (켜면 파일이 MAX_BYTES를 넘을 때 .1로 교체해 두 개까지만 유지)
+INTENT_LABEL_LOG_ENABLED = os.getenv("INTENT_LABEL_LOG_ENABLED", "false").lower() == "true"
+INTENT_LABEL_LOG_MAX_BYTES = int(os.getenv("INTENT_LABEL_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+
+_label_log_lock = threading.Lock()
+
+# 키워드 사전을 문장으로 확장하는 템플릿
+_TEMPLATES = {
+    "telecom_plan": ["{kw} 추천해줘", "{kw} 추천해주세요", "{kw} 바꾸고 싶어", "{kw} 뭐가 좋아?", "괜찮은 {kw} 알려줘", "{kw} 비교해줘"],
+    "subscription": ["{kw} 추천해줘", "{kw} 구독하고 싶어", "{kw} 어때?", "{kw} 같은 거 추천해주세요", "{kw} 볼만한 거 있어?"],
+    "current_usage": ["{kw} 데이터 얼마야", "{kw} 사용량 알려줘", "내 요금제 {kw}", "{kw} 통화량 보여줘"],
+    "ubti": ["{kw} 해보고 싶어", "나 {kw} 해줘", "{kw} 결과 알려줘", "{kw} 검사할래"],
+    "tech_issue": ["{kw} 났어요", "앱이 {kw}", "자꾸 {kw} 떠요", "{kw} 때문에 안 돼요"],
+    "off_topic_interesting": ["{kw} 좋아해", "{kw} 얘기하자", "요즘 {kw} 뭐가 재밌어?", "{kw} 추천 좀"],
+    "off_topic_boring": ["{kw} 알려줘", "오늘 {kw} 어때", "{kw} 어떻게 해?", "{kw} 관련 질문이 있어"],
+}
+
+_KEYWORDS = {
+    "telecom_plan": TELECOM_PLAN_KEYWORDS + ["3만원대 요금제", "5만원 이하", "7만원 정도", "데이터 무제한"],
+    "subscription": SUBSCRIPTION_KEYWORDS + ["디즈니+", "티빙", "왓챠", "리디"],
+    "current_usage": CURRENT_USAGE_KEYWORDS,
+    "ubti": UBTI_KEYWORDS,
+    "tech_issue": TECH_ISSUE_KEYWORDS,
+    "off_topic_interesting": OFF_TOPIC_INTERESTING_KEYWORDS,
+    "off_topic_boring": OFF_TOPIC_BORING_KEYWORDS,
+}
+
+# 임계값 평가용 실제 문장 (시드 템플릿에 없는 표현) - None은 모델이 확신하지 말고 LLM에 넘겨야 하는 문장
+_PROBES = [
+    ("ㅋㅋ 뭐해", None), ("오늘 뭐 먹지", None), ("점심 추천", None), ("심심해", None),
+    ("아이폰 살까 갤럭시 살까", None), ("너 누구야", None), ("비트코인 살까", None), ("내일 비 와?", None),
+    ("주식 어떻게 생각해", "off_topic_boring"), ("코딩 알려줘", "off_topic_boring"),
+    ("연애 상담 해줘", "off_topic_interesting"), ("잘 지냈어?", "greeting"),
+    ("요금제 좀 바꿔볼까", "telecom_plan"), ("넷플릭스 볼만한 거 있어?", "subscription"),
+    ("데이터 얼마나 남았어", "current_usage"), ("와이파이가 자꾸 끊겨요", "tech_issue"),
+]
+# 임계값 후보 - 허용 정밀도를 만족하는 가장 낮은 값을 고른다
+_THRESHOLD_GRID = [round(0.5 + 0.05 * i, 2) for i in range(10)]
+INTENT_MODEL_TARGET_PRECISION = float(os.getenv("INTENT_MODEL_TARGET_PRECISION", "0.97"))
+DEFAULT_LOCAL_THRESHOLD = 0.9  # 저장된 모델에 평가 임계값이 없을 때
+
+_EXTRA_SEEDS = {
+    "greeting": EXACT_GREETINGS + ["안녕하세요", "하이하이", "hello there", "반갑습니다", "처음 왔어요", "안녕 무너야"],
+    "multiturn_answer": MULTITURN_SHORT_ANSWERS + ["5GB 정도", "많이 써요", "거의 안해요", "1시간 정도", "유튜브 많이 봐", "스마트폰으로 봐요", "출퇴근 시간에"],
+    "nonsense": NONSENSE_TEST_INPUTS + ["ㅁㄴㅇㄹㅁㄴㅇㄹ", "qwerasdf", "zzzzzz", "ㅇㅇㅇㅇㅇ", "asdfasdf", "98765432", "ㅂㅈㄷㄱ"],
+    "off_topic_unclear": ["뭐", "그거", "저거", "이거", "어떻게", "왜", "?", "??", "???", "어?", "음..", "그냥요"],
+}
+
+def build_seed_dataset() -> List[Tuple[str, str]]:
+    """키워드 사전 + 템플릿 + 로깅된 라벨로 학습 데이터 구성"""
+    samples: List[Tuple[str, str]] = []
+
+    for intent, keywords in _KEYWORDS.items():
+        for kw in keywords:
+            samples.append((kw, intent))
+            for template in _TEMPLATES[intent]:
+                samples.append((template.format(kw=kw), intent))
+
+    for intent, texts in _EXTRA_SEEDS.items():
+        samples.extend((text, intent) for text in texts)
+
+    samples.extend(load_logged_labels())
+    return samples
+
+def _rotated_label_log() -> Path:
+    return INTENT_LABEL_LOG.with_name(INTENT_LABEL_LOG.name + ".1")
+
+def load_logged_labels() -> List[Tuple[str, str]]:
+    """LLM이 분류한 결과 로그(JSONL, 교체된 .1 포함)를 학습 데이터로 읽기"""
+    labels = []
+    for path in (_rotated_label_log(), INTENT_LABEL_LOG):
+        if not path.exists():
+            continue
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if row.get("intent") in VALID_INTENTS and row.get("message"):
+                    labels.append((row["message"], row["intent"]))
+    return labels
+
+def log_intent_label(message: str, intent: str, source: str = "llm"):
+    """LLM 분류 결과를 다음 학습용으로 기록 (동기 파일 쓰기 - 요청 경로에서는 alog_intent_label 사용)"""
+    line = json.dumps({"message": message, "intent": intent, "source": source}, ensure_ascii=False) + "\n"
+    try:
+        with _label_log_lock:
+            INTENT_LABEL_LOG.parent.mkdir(parents=True, exist_ok=True)
+            if INTENT_LABEL_LOG.exists() and INTENT_LABEL_LOG.stat().st_size >= INTENT_LABEL_LOG_MAX_BYTES:
+                os.replace(INTENT_LABEL_LOG, _rotated_label_log())
+            with INTENT_LABEL_LOG.open("a", encoding="utf-8") as f:
+                f.write(line)
+    except Exception as e:
+        print(f"[WARNING] 인텐트 라벨 기록 실패: {e}")
+
+async def alog_intent_label(message: str, intent: str, source: str = "llm"):
+    """INTENT_LABEL_LOG_ENABLED일 때만 기록 - 파일 쓰기는 스레드에서"""
+    if INTENT_LABEL_LOG_ENABLED:
+        await asyncio.to_thread(log_intent_label, message, intent, source)
+
+class LocalIntentModel:
+    """문자 n-gram TF-IDF + 로지스틱 회귀 인텐트 분류기"""
+
+    def __init__(self, pipeline, threshold: Optional[float] = None):
+        self.pipeline = pipeline
+        self.threshold = threshold  # 오프라인 평가로 고른 확신도 임계값
+
+        # 단건 추론은 sklearn 입력 검증 비용이 대부분이라 가중치를 꺼내 직접 계산
+        import numpy as np
+        tfidf = pipeline.named_steps["tfidf"]
+        clf = pipeline.named_steps["clf"]
+        self._np = np
+        self._analyze = tfidf.build_analyzer()
+        self._vocab = tfidf.vocabulary_
+        self._idf = tfidf.idf_
+        self._sublinear = tfidf.sublinear_tf
+        self._coef = np.ascontiguousarray(clf.coef_.T)  # (n_features, n_classes)
+        self._intercept = clf.intercept_
+        self._classes = clf.classes_
+
+    @classmethod
+    def train(cls, samples: Optional[List[Tuple[str, str]]] = None) -> "LocalIntentModel":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+
+        samples = samples or build_seed_dataset()
+        texts = [text.lower().strip() for text, _ in samples]
+        labels = [intent for _, intent in samples]
+
+        pipeline = Pipeline([
+            ("tfidf", TfidfVectorizer(analyzer="char_wb", ngram_range=(1, 4), sublinear_tf=True, min_df=1)),
+            ("clf", LogisticRegression(max_iter=2000, C=10.0, class_weight="balanced")),
+        ])
+        pipeline.fit(texts, labels)
+        return cls(pipeline)
+
+    @classmethod
+    def load(cls, path: Path = INTENT_MODEL_PATH) -> "LocalIntentModel":
+        import joblib
+        artifact = joblib.load(path)
+        if isinstance(artifact, dict):
+            return cls(artifact["pipeline"], artifact.get("threshold"))
+        return cls(artifact)  # 임계값 없이 파이프라인만 저장된 이전 형식
+
+    def save(self, path: Path = INTENT_MODEL_PATH):
+        import joblib
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"pipeline": self.pipeline, "threshold": self.threshold}, path)
+
+    def predict(self, message: str) -> Tuple[str, float]:
+        """(인텐트, 확신도) 반환 - pipeline.predict_proba와 같은 결과"""
+        np = self._np
+        counts = {}
+        for gram in self._analyze(message.lower().strip()):
+            idx = self._vocab.get(gram)
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+
+        if counts:
+            idxs = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self._sublinear:
+                tf = 1.0 + np.log(tf)
+            weights = tf * self._idf[idxs]
+            weights /= np.sqrt(weights @ weights)
+            scores = weights @ self._coef[idxs] + self._intercept
+        else:
+            scores = self._intercept.copy()
+
+        if len(self._classes) == 2:
+            # 이진 분류는 단일 결정값 → 시그모이드
+            p1 = 1.0 / (1.0 + np.exp(-scores[0]))
+            proba = np.array([1.0 - p1, p1])
+        else:
+            scores = scores - scores.max()
+            proba = np.exp(scores)
+            proba /= proba.sum()
+        best = int(proba.argmax())
+        return self._classes[best], float(proba[best])
+
+def load_local_model() -> Optional[LocalIntentModel]:
+    """저장된 모델 로드 - 없으면 학습하지 않고 LLM 분류만 사용 (서버 시작을 막지 않도록)"""
+    if not INTENT_MODEL_PATH.exists():
+        print(f"[INFO] 로컬 인텐트 모델 없음 ({INTENT_MODEL_PATH}) - LLM 분류만 사용 "
+              f"(python -m app.utils.intent_model train 으로 생성)")
+        return None
+    try:
+        model = LocalIntentModel.load()
+        print(f"[INFO] 로컬 인텐트 모델 로드: {INTENT_MODEL_PATH} (임계값={model.threshold})")
+        return model
+    except Exception as e:
+        print(f"[WARNING] 로컬 인텐트 모델 로드 실패 - LLM 분류만 사용: {e}")
+        return None
+
+def evaluate_thresholds(model: LocalIntentModel, labeled: List[Tuple[str, Optional[str]]]) -> List[dict]:
+    """임계값별 (수용 수, 정밀도, 수용률) - multiturn_answer는 서버에서 받아들이지 않으므로 항상 미수용"""
+    predictions = [(label, *model.predict(text)) for text, label in labeled]
+    rows = []
+    for threshold in _THRESHOLD_GRID:
+        accepted = [(label, intent) for label, intent, confidence in predictions
+                    if confidence >= threshold and intent != "multiturn_answer"]
+        correct = sum(1 for label, intent in accepted if label == intent)
+        rows.append({
+            "threshold": threshold,
+            "accepted": len(accepted),
+            "precision": correct / len(accepted) if accepted else 1.0,
+            "coverage": len(accepted) / len(predictions) if predictions else 0.0,
+        })
+    return rows
+
+def choose_threshold(rows: List[dict], target: float = INTENT_MODEL_TARGET_PRECISION) -> float:
+    """정밀도가 target 이상인 가장 낮은 임계값 (없으면 가장 높은 후보)"""
+    for row in rows:
+        if row["precision"] >= target:
+            return row["threshold"]
+    return _THRESHOLD_GRID[-1]
+
+def _main(argv: List[str]):
+    """오프라인 학습: python -m app.utils.intent_model train
+
+    시드의 10%와 실제 문장 프로브로 임계값을 고르고, 그 값을 모델과 함께 저장한다.
+    """
+    if not argv or argv[0] != "train":
+        print("usage: python -m app.utils.intent_model train")
+        return
+
+    samples = build_seed_dataset()
+    random.Random(42).shuffle(samples)
+    split = int(len(samples) * 0.9)
+    model = LocalIntentModel.train(samples[:split])
+    rows = evaluate_thresholds(model, samples[split:] + _PROBES)
+    for row in rows:
+        print(f"[INFO] 임계값 {row['threshold']:.2f}: 정밀도={row['precision']:.3f} / 수용률={row['coverage']:.3f}")
+    threshold = choose_threshold(rows)
+    print(f"[INFO] 선택 임계값: {threshold} (목표 정밀도 {INTENT_MODEL_TARGET_PRECISION})")
+
+    model = LocalIntentModel.train(samples)
+    model.threshold = threshold
+    model.save()
+
+    started = time.perf_counter()
+    for text, _ in samples[:500]:
+        model.predict(text)
+    per_call_us = (time.perf_counter() - started) / min(len(samples), 500) * 1e6
+    print(f"[INFO] 학습 샘플={len(samples)} / 저장={INTENT_MODEL_PATH} / 추론 평균={per_call_us:.0f}µs")
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,145 @@
+# chatbot-server/app/utils/keyword_matcher.py - 다중 키워드 매처 (Aho-Corasick)
+
+import sys
+import time
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+class KeywordMatcher:
+    """카테고리별 키워드를 한 번에 찾는 Aho-Corasick 오토마톤 - 메시지를 한 번만 순회"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        self.categories = tuple(categories)
+        if len(self.categories) > 62:
+            raise ValueError("카테고리는 62개까지 지원합니다")
+
+        # 1. 트라이 구성 - 각 상태의 출력은 카테고리 비트마스크
+        goto: List[Dict[str, int]] = [{}]
+        out: List[int] = [0]
+        for bit, name in enumerate(self.categories):
+            for keyword in categories[name]:
+                state = 0
+                for ch in keyword.lower():
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        out.append(0)
+                    state = nxt
+                out[state] |= 1 << bit
+
+        # 2. 실패 링크 (BFS) + 실패 경로를 미리 펼친 전이 테이블
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+                queue.append(nxt)
+
+        self._delta = delta
+        self._out = out
+        self._names: Dict[int, FrozenSet[str]] = {0: frozenset()}
+
+    def match_mask(self, text: str) -> int:
+        """매칭된 카테고리 비트마스크 (text는 소문자로 넘길 것)"""
+        delta = self._delta
+        out = self._out
+        state = 0
+        mask = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            mask |= out[state]
+        return mask
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """매칭된 카테고리 이름 집합"""
+        mask = self.match_mask(text)
+        names = self._names.get(mask)
+        if names is None:
+            names = frozenset(name for bit, name in enumerate(self.categories) if mask >> bit & 1)
+            self._names[mask] = names
+        return names
+
+    @property
+    def state_count(self) -> int:
+        return len(self._delta)
+
+def _legacy_fallback_scan(message: str) -> str:
+    """벤치마크 기준선 - 매처 도입 전 순차 any()/replace/re.search 방식"""
+    import re
+    from app.utils import intent_classifier as ic
+
+    lowered = message.lower().strip()
+    if len(lowered) <= 10:
+        if any(answer in lowered for answer in ic.MULTITURN_SHORT_ANSWERS):
+            return "multiturn_answer"
+        if len(lowered) <= 5:
+            for pattern in [r'\d+gb', r'\d+만원?', r'\d+시간?', r'\d+분']:
+                if re.search(pattern, lowered):
+                    return "multiturn_answer"
+
+    text = lowered
+    for kr, num in {'일': '1', '이': '2', '삼': '3', '사': '4', '오': '5',
+                    '육': '6', '칠': '7', '팔': '8', '구': '9', '십': '10'}.items():
+        text = text.replace(kr, num)
+    for pattern in [r'\d+만\s*원?', r'\d{4,6}\s*원', r'\d+천\s*원?', r'\d+만원대',
+                    r'\d+만원?\s*(이하|미만|까지|정도|쯤)', r'\d+만원?\s*(이상|넘|초과)', r'\d+[\-~]\d+만원?']:
+        if re.search(pattern, text):
+            return "telecom_plan"
+    if any(k in text for k in ['예산', '돈', '가격', '비용', '통신비', '요금']):
+        return "telecom_plan"
+
+    for keywords, intent in [
+        (ic.TECH_ISSUE_KEYWORDS, "tech_issue"), (ic.TELECOM_PLAN_KEYWORDS, "telecom_plan"),
+        (ic.SUBSCRIPTION_KEYWORDS, "subscription"), (ic.CURRENT_USAGE_KEYWORDS, "current_usage"),
+        (ic.UBTI_KEYWORDS, "ubti"), (ic.OFF_TOPIC_INTERESTING_KEYWORDS, "off_topic_interesting"),
+        (ic.OFF_TOPIC_BORING_KEYWORDS, "off_topic_boring"),
+    ]:
+        if any(k in lowered for k in keywords):
+            return intent
+    return "off_topic_unclear"
+
+def _main(argv: List[str]):
+    """메시지당 분류 비용 비교: python -m app.utils.keyword_matcher bench"""
+    if not argv or argv[0] != "bench":
+        print("usage: python -m app.utils.keyword_matcher bench")
+        return
+
+    from app.utils.intent_classifier import EnhancedIntentClassifier, KEYWORD_MATCHER
+
+    messages = [
+        "요금제 추천해줘", "넷플릭스 같은 OTT 구독하고 싶어", "오만원 이하로 데이터 무제한 되는 거 있어?",
+        "앱이 자꾸 로딩 오류가 나요", "요즘 볼만한 영화 뭐 있어", "내일 날씨 어때", "5gb", "많이",
+        "ubti 테스트 해보고 싶어", "남은 데이터 확인하고 싶어요", "그냥 심심해서 말 걸어봤어",
+        "출퇴근할 때 유튜브 많이 보는데 3만원대로 괜찮은 거 있을까요",
+    ]
+    # 분류기 LLM/모델 초기화 없이 규칙 메서드만 사용
+    classifier = EnhancedIntentClassifier.__new__(EnhancedIntentClassifier)
+    rounds = 2000
+
+    def run(label, fn):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for message in messages:
+                fn(message)
+        per_message_us = (time.perf_counter() - started) / (rounds * len(messages)) * 1e6
+        print(f"[BENCH] {label}: {per_message_us:.2f}µs/message")
+        return per_message_us
+
+    def compiled(message):
+        return classifier._keyword_fallback(message.lower().strip()) or "off_topic_unclear"
+
+    mismatches = [m for m in messages if _legacy_fallback_scan(m) != compiled(m)]
+    before = run("before (순차 스캔)", _legacy_fallback_scan)
+    after = run("after (컴파일된 매처)", compiled)
+    scan = run("matcher.match_mask 단독", lambda m: KEYWORD_MATCHER.match_mask(m.lower()))
+    print(f"[BENCH] 상태 수={KEYWORD_MATCHER.state_count} / 속도 {before / after:.1f}x / "
+          f"순회 비용={scan:.2f}µs / 결과 불일치={len(mismatches)} {mismatches}")
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -1,10 +1,79 @@
 from langchain_openai import ChatOpenAI
+from typing import Dict, Optional, Tuple
+import httpx
 import os
+import time
+
+# 프로세스 전역 LLM 클라이언트 레지스트리 - (model, temperature, streaming) 키로 공유
+DEFAULT_MODEL = "gpt-4o-mini"
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+_http_async_client: Optional[httpx.AsyncClient] = None
+_models: Dict[Tuple[str, float, bool], ChatOpenAI] = {}
+
+def get_http_async_client() -> httpx.AsyncClient:
+    """keep-alive 커넥션 풀을 유지하는 공유 비동기 HTTP 클라이언트"""
+    global _http_async_client
+    if _http_async_client is None or _http_async_client.is_closed:
+        _http_async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+        )
+    return _http_async_client
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0.7, streaming: bool = True) -> ChatOpenAI:
+    """공유 LLM 클라이언트 반환 - 키별로 한 번만 생성"""
+    key = (model, float(temperature), bool(streaming))
+    llm = _models.get(key)
+    if llm is None:
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            streaming=streaming,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_async_client=get_http_async_client(),
+        )
+        _models[key] = llm
+        print(f"[INFO] LLM 클라이언트 생성: model={model}, temperature={temperature}, streaming={streaming}")
+    return llm
 
 def get_chat_model():
-    return ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.7,
-        streaming=True,
-        api_key=os.getenv("OPENAI_API_KEY")
-    )
+    """응답 생성용 스트리밍 모델 (기존 호출부 호환)"""
+    return get_llm(DEFAULT_MODEL, temperature=0.7, streaming=True)
+
+async def warmup_llm_clients():
+    """앱 시작 시 자주 쓰는 클라이언트를 미리 생성하고 공유 풀에 연결을 열어 둠
+
+    객체 생성만으로는 연결이 없으므로 가벼운 인증 요청(GET /models)으로 DNS/TCP/TLS를 미리 끝낸다.
+    """
+    get_chat_model()                          # 추천/UBTI/사용량 응답
+    get_llm(DEFAULT_MODEL, 0.1, False)        # 인텐트 분류
+    get_llm(DEFAULT_MODEL, 0.7, False)        # 대화 가드
+    try:
+        started = time.perf_counter()
+        response = await get_http_async_client().get(
+            f"{OPENAI_BASE_URL.rstrip('/')}/models",
+            headers={"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}"},
+            timeout=5.0,
+        )
+        print(f"[INFO] LLM 연결 워밍업: HTTP {response.status_code} ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    except httpx.HTTPError as e:
+        print(f"[WARNING] LLM 연결 워밍업 실패 (첫 요청 때 연결): {e}")
+    print(f"[INFO] LLM 클라이언트 워밍업 완료: {len(_models)}개")
+
+async def close_llm_clients():
+    """앱 종료 시 HTTP 커넥션 풀 정리"""
+    global _http_async_client
+    _models.clear()
+    if _http_async_client is not None and not _http_async_client.is_closed:
+        await _http_async_client.aclose()
+    _http_async_client = None
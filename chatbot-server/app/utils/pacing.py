@@ -0,0 +1,94 @@
+# chatbot-server/app/utils/pacing.py - SSE 스트리밍 속도 정책
+
+import asyncio
+import contextvars
+import os
+import time
+from typing import AsyncIterator, Optional
+
+# none: 지연 없이 바로 전송 (API/벤치마크 클라이언트)
+# typing: 토큰 버킷으로 초당 글자 수를 맞춰 타이핑 효과
+PACING_MODES = ("none", "typing")
+SSE_PACING_MODE = os.getenv("SSE_PACING_MODE", "typing")
+SSE_TYPING_CPS = float(os.getenv("SSE_TYPING_CPS", "120"))     # 초당 글자 수
+SSE_TYPING_BURST = float(os.getenv("SSE_TYPING_BURST", "40"))  # 대기 없이 보낼 수 있는 글자 수
+PACING_HEADER = "x-stream-pacing"
+
+_pacing_mode: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("pacing_mode", default=None)
+
+def normalize_pacing_mode(mode: Optional[str]) -> Optional[str]:
+    if not mode:
+        return None
+    mode = mode.strip().lower()
+    return mode if mode in PACING_MODES else None
+
+def use_pacing_mode(mode: Optional[str]):
+    """현재 요청(컨텍스트)의 속도 모드 지정 - 잘못된 값은 무시"""
+    mode = normalize_pacing_mode(mode)
+    if mode:
+        _pacing_mode.set(mode)
+
+def current_pacing_mode() -> str:
+    return _pacing_mode.get() or normalize_pacing_mode(SSE_PACING_MODE) or "typing"
+
+class StreamPacer:
+    """스트림 하나당 하나 - 보낸 글자 수만큼 토큰을 쓰고 부족하면 기다림"""
+
+    def __init__(self, mode: str = None, cps: float = SSE_TYPING_CPS, burst: float = SSE_TYPING_BURST):
+        self.mode = mode or current_pacing_mode()
+        self.cps = max(cps, 1.0)
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode == "typing"
+
+    async def pace(self, chars: int):
+        """chars 글자를 보낸 뒤 호출 - typing 모드에서만 대기"""
+        if not self.enabled or chars <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.cps)
+        self._last = now
+        self._tokens -= chars
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.cps)
+
+    async def split_text(self, text: str) -> AsyncIterator[str]:
+        """고정 문구 스트리밍 - none 모드는 통째로, typing 모드는 단어 단위"""
+        if not self.enabled:
+            if text:
+                yield text
+            return
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            piece = word + (" " if i < len(words) - 1 else "")
+            yield piece
+            await self.pace(len(piece))
+
+def get_pacer() -> StreamPacer:
+    """현재 요청의 속도 모드로 새 페이서 생성"""
+    return StreamPacer()
+
+def paced_text_stream(text: str):
+    """고정 문구를 스트림 함수로 변환 (기존 create_simple_stream 대체)"""
+    async def stream():
+        async for piece in get_pacer().split_text(text):
+            yield piece
+    return stream
+
+class PacingMiddleware:
+    """X-Stream-Pacing 헤더로 클라이언트별 속도 모드 선택"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            for name, value in scope.get("headers", []):
+                if name.decode("latin-1") == PACING_HEADER:
+                    use_pacing_mode(value.decode("latin-1"))
+                    break
+        await self.app(scope, receive, send)
@@ -1,7 +1,22 @@
 import redis
-import json
+import redis.asyncio as aioredis
+import contextvars
 import os
-from typing import Dict
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+import orjson
+from redis.client import NEVER_DECODE
+
+from app.utils.session_cache import SESSION_NEAR_CACHE, session_near_cache
+from app.utils.session_fields import FieldSnapshot, hash_key, list_key, queue_write, unflatten
+from app.utils.session_codec import decode_payload, encode_payload, get_codec, session_size_stats
+from app.utils.session_model import Session
+from app.utils.session_ttl import SESSION_TTL, session_ttl_policy
+from app.utils.session_store import (
+    SESSION_NAMESPACES, FailoverSessionStore, MemorySessionStore, SessionStore, session_namespace,
+)
 
 # 안전한 최적화 설정 (기존 로직 유지)
 redis_host = os.getenv("REDIS_HOST", "redis-ai")
@@ -9,8 +24,23 @@ redis_port = int(os.getenv("REDIS_PORT", "6379"))
 
 # 8GB 환경에 맞게 설정값만 변경
 MEMORY_LIMIT_MB = int(os.getenv("REDIS_MEMORY_LIMIT_MB", "2048"))  # 2GB
-SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))  # 300초 → 1800초 (30분)
 MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "3000"))  # 80개 → 3000개
+# blob: 세션 전체를 한 값으로 SET / fields: 해시(HSET) + 히스토리 리스트(RPUSH+LTRIM)로 바뀐 부분만 저장
+SESSION_LAYOUT = os.getenv("SESSION_LAYOUT", "blob")
+# 세션 인덱스 (sorted set, 점수 = 만료 예정 시각) - 정확한 세션 수 + 오래된 세션부터 축출
+SESSION_INDEX_KEY = os.getenv("SESSION_INDEX_KEY", "session_index")
+# 마지막 턴(저장) 시각 / 멀티턴 진행 중인 세션 - 정리·TTL 단축 패스가 세션 키를 읽지 않고 판단하도록
+# (allkeys-lru에서는 값을 읽는 순간 OBJECT IDLETIME이 0으로 돌아간다)
+SESSION_TURN_INDEX_KEY = f"{SESSION_INDEX_KEY}:last_turn"
+SESSION_FLOW_INDEX_KEY = f"{SESSION_INDEX_KEY}:mid_flow"
+# redis: Redis 저장소 (연결 실패 시 자동으로 memory) / memory: 프로세스 내 저장소
+SESSION_STORE = os.getenv("SESSION_STORE", "redis")
+# SSE 재연결 스트림(XREAD BLOCK) 전용 풀 - 차면 예외 대신 STREAM_POOL_TIMEOUT 동안 빈 연결을 기다림
+REDIS_STREAM_POOL_SIZE = int(os.getenv("REDIS_STREAM_POOL_SIZE", "200"))
+REDIS_STREAM_POOL_TIMEOUT = float(os.getenv("REDIS_STREAM_POOL_TIMEOUT", "5"))
+
+# 이 오류가 나면 세션 저장소가 메모리로 전환 (나머지 오류는 기존처럼 로그 후 무시)
+SESSION_CONNECTION_ERRORS = (ConnectionError, redis.ConnectionError, redis.TimeoutError)
 
 print(f"[INFO] Redis 최적화: 메모리={MEMORY_LIMIT_MB}MB / TTL={SESSION_TTL}s / 최대={MAX_SESSIONS}개")
 
@@ -46,136 +76,766 @@ def create_redis_client():
 
 client = create_redis_client()
 
-def safe_clean_session_data(data: dict) -> dict:
-    """안전한 세션 정리 - 멀티턴 데이터 보존"""
-
-    # 기존 로직 완전 보존하면서 최적화만 적용
-    essential_keys = {
-        # 기존 멀티턴 키들 모두 보존
-        'phone_plan_flow_step', 'subscription_flow_step', 'ubti_step',
-        'plan_step', 'subscription_step',  # 기존 키 호환성
-        'user_info', 'plan_info', 'subscription_info', 'ubti_info',
-        'history', 'last_recommendation_type',
-        'step', 'answers'  # UBTI용
-    }
-
-    cleaned = {}
-    for k, v in data.items():
-        if k in essential_keys:
-            if k == 'history' and isinstance(v, list):
-                # 8GB 환경에서는 히스토리 더 많이 보존: 6개 → 15개
-                cleaned[k] = v[-15:] if len(v) > 15 else v
-            elif k in ['user_info', 'plan_info', 'subscription_info', 'ubti_info'] and isinstance(v, dict):
-                # 사용자 정보는 길이만 제한
-                compressed_info = {}
-                for uk, uv in v.items():
-                    if uv:
-                        # 8GB 환경에서는 텍스트 길이 제한 완화: 100자 → 300자
-                        if isinstance(uv, str) and len(uv) > 300:
-                            compressed_info[uk] = uv[:300]
-                        else:
-                            compressed_info[uk] = uv
-                cleaned[k] = compressed_info
-            else:
-                # 나머지는 그대로 유지
-                cleaned[k] = v
+def _decode_session(raw) -> Session:
+    """저장된 값(JSON 또는 헤더 붙은 바이너리)을 세션 객체로 복원 (검증/정리 한 번)"""
+    if not raw:
+        return Session()
+    return Session(decode_payload(raw))
+
+def _encode_session(session_id: str, data) -> tuple:
+    """세션을 (저장 바이트, TTL, 크기KB)로 변환 - 동기/비동기 저장 공통 로직"""
+    session = data if isinstance(data, Session) else Session(data)
+    codec = get_codec()
+    payload = session.to_payload()
+    encoded = encode_payload(payload, codec)
+
+    # 크기 모니터링
+    size_kb = len(encoded) / 1024
+
+    if not session.is_multiturn and size_kb > 10.0:
+        print(f"[WARNING] 세션 크기 과대 ({size_kb:.1f}KB) - {session_id}")
+        if session.history and len(session.history) > 10:
+            payload = session.to_payload(history_limit=8)  # 3개 → 8개로 완화
+            encoded = encode_payload(payload, codec)
+            size_kb = len(encoded) / 1024
+            print(f"[INFO] 히스토리 압축 후: {size_kb:.1f}KB")
+
+    # 멀티턴 진행 중이면 TTL 2배, 나머지는 메모리 압박/크기에 따라 단축
+    ttl = _session_ttl(session, len(encoded))
+
+    session_size_stats.record(codec.name, len(encoded), payload)
+    return encoded, ttl, size_kb
+
+def _session_ttl(session: Session, size_bytes: Optional[int] = None) -> int:
+    """TTL 정책 - 멀티턴 진행 중이면 2배 (보호), 끝난/일반 대화는 메모리 압박에 따라 단축"""
+    return session_ttl_policy.decide(session, size_bytes)
+
+# ============= 세션 인덱스 / 축출 =============
+
+def _namespace_index_key(namespace: str) -> str:
+    return f"{SESSION_INDEX_KEY}:{namespace}"
+
+def _session_keys(session_id: str) -> tuple:
+    """세션 하나가 쓰는 모든 키 (블롭 + 필드 레이아웃)"""
+    return session_id, hash_key(session_id), list_key(session_id)
+
+def _queue_index(pipe, session_id: str, ttl: int, mid_flow: bool):
+    """저장 파이프라인에 인덱스 갱신 추가 - 마지막 결과가 전체 세션 수
+
+    점수는 만료 예정 시각(마지막 접근 + TTL)이라 이미 만료된 항목은 범위 삭제로 정확히 걷어낼 수 있다.
+    마지막 턴 인덱스는 저장 시각, 진행 중 인덱스는 멀티턴 세션만 만료 예정 시각으로 함께 갱신.
+    """
+    now = time.time()
+    ns_key = _namespace_index_key(session_namespace(session_id))
+    pipe.zadd(SESSION_INDEX_KEY, {session_id: now + ttl})
+    pipe.zadd(ns_key, {session_id: now + ttl})
+    pipe.zadd(SESSION_TURN_INDEX_KEY, {session_id: now})
+    if mid_flow:
+        pipe.zadd(SESSION_FLOW_INDEX_KEY, {session_id: now + ttl})
+    else:
+        pipe.zrem(SESSION_FLOW_INDEX_KEY, session_id)
+    pipe.zremrangebyscore(SESSION_INDEX_KEY, "-inf", now)
+    pipe.zremrangebyscore(ns_key, "-inf", now)
+    pipe.zremrangebyscore(SESSION_TURN_INDEX_KEY, "-inf", now - session_ttl_policy.ttl_for("mid_flow"))
+    pipe.zremrangebyscore(SESSION_FLOW_INDEX_KEY, "-inf", now)
+    pipe.zcard(SESSION_INDEX_KEY)
+
+def _queue_unindex(pipe, session_ids, global_index: bool = True):
+    """세션 인덱스 전부에서 제거 (ZPOPMIN으로 이미 꺼낸 경우 global_index=False)"""
+    session_ids = list(session_ids)
+    if not session_ids:
+        return
+    if global_index:
+        pipe.zrem(SESSION_INDEX_KEY, *session_ids)
+    pipe.zrem(SESSION_TURN_INDEX_KEY, *session_ids)
+    pipe.zrem(SESSION_FLOW_INDEX_KEY, *session_ids)
+    for session_id in session_ids:
+        pipe.zrem(_namespace_index_key(session_namespace(session_id)), session_id)
+
+def _queue_counts(pipe):
+    now = time.time()
+    namespaces = sorted(set(SESSION_NAMESPACES.values()) | {"chat"})
+    for namespace in namespaces:
+        pipe.zremrangebyscore(_namespace_index_key(namespace), "-inf", now)
+        pipe.zcard(_namespace_index_key(namespace))
+    return namespaces
+
+def _counts_result(namespaces, results) -> Dict[str, int]:
+    counts = {namespace: results[i * 2 + 1] for i, namespace in enumerate(namespaces)}
+    counts["total"] = sum(counts.values())
+    return counts
+
+def _queue_eviction(pipe, popped):
+    """ZPOPMIN으로 꺼낸 세션들의 키 UNLINK + 네임스페이스 인덱스 정리"""
+    session_ids = [session_id for session_id, _ in popped]
+    pipe.unlink(*[key for session_id in session_ids for key in _session_keys(session_id)])
+    _queue_unindex(pipe, session_ids, global_index=False)
+    return session_ids
+
+def evict_sessions(total: int) -> int:
+    """MAX_SESSIONS 초과분만큼 가장 오래된 세션 축출 (ZPOPMIN, O(log n))"""
+    overflow = total - MAX_SESSIONS
+    if overflow <= 0 or not client:
+        return 0
+    try:
+        popped = client.zpopmin(SESSION_INDEX_KEY, overflow)
+        if not popped:
+            return 0
+        with client.pipeline(transaction=False) as pipe:
+            session_ids = _queue_eviction(pipe, popped)
+            pipe.execute()
+        print(f"[INFO] 세션 {len(session_ids)}개 축출 (최대 {MAX_SESSIONS}개 초과)")
+        return len(session_ids)
+    except Exception as e:
+        print(f"[ERROR] 세션 축출 실패: {e}")
+        return 0
 
-    return cleaned
+def _redis_session_counts() -> Dict[str, int]:
+    """네임스페이스별 정확한 세션 수 (만료 항목 정리 후 ZCARD)"""
+    if not client:
+        return {}
+    with client.pipeline(transaction=False) as pipe:
+        namespaces = _queue_counts(pipe)
+        return _counts_result(namespaces, pipe.execute())
 
-def get_session(session_id: str) -> dict:
-    """기존 함수 그대로 유지"""
+def _redis_get_session(session_id: str) -> Session:
     if not session_id or not client:
-        return {}
+        return Session()
+    cached = session_near_cache.get(session_id)
+    if cached is not None:
+        return cached[0]
     try:
-        raw = client.get(session_id)
-        if not raw:
-            return {}
-        session_data = json.loads(raw)
-        return safe_clean_session_data(session_data)
+        if SESSION_LAYOUT == "fields":
+            with client.pipeline(transaction=False) as pipe:
+                _queue_read(pipe, session_id)
+                return _load_result(*pipe.execute())[0]
+        # 바이너리 코덱 값도 읽을 수 있도록 디코딩 없이 조회
+        return _decode_session(client.execute_command("GET", session_id, **{NEVER_DECODE: True}))
+    except SESSION_CONNECTION_ERRORS:
+        raise  # 저장소 래퍼가 메모리 저장소로 전환
     except Exception as e:
         print(f"[ERROR] 세션 조회 실패: {e}")
-        return {}
+        return Session()
 
-def save_session(session_id: str, data: dict):
-    """기존 로직 유지하면서 크기만 최적화"""
+def _redis_save_session(session_id: str, data: dict):
     if not client:
         return
+    session_near_cache.discard(session_id)
     try:
-        cleaned = safe_clean_session_data(data)
-        json_data = json.dumps(cleaned, ensure_ascii=False, separators=(',', ':'))
-
-        # 크기 모니터링
-        size_kb = len(json_data) / 1024
-
-        # 멀티턴 진행 중이면 TTL 2배 연장
-        multiturn_keys = ['phone_plan_flow_step', 'subscription_flow_step', 'ubti_step']
-        is_multiturn = any(key in cleaned and cleaned[key] > 0 for key in multiturn_keys)
-
-        if is_multiturn:
-            ttl = SESSION_TTL * 2
-            print(f"[DEBUG] 멀티턴 진행 중 - TTL 연장: {ttl}초")
-        elif size_kb > 10.0:
-            print(f"[WARNING] 세션 크기 과대 ({size_kb:.1f}KB) - {session_id}")
-            if 'history' in cleaned and isinstance(cleaned['history'], list) and len(cleaned['history']) > 10:
-                cleaned['history'] = cleaned['history'][-8:]  # 3개 → 8개로 완화
-                json_data = json.dumps(cleaned, ensure_ascii=False, separators=(',', ':'))
-                size_kb = len(json_data) / 1024
-                print(f"[INFO] 히스토리 압축 후: {size_kb:.1f}KB")
-            ttl = SESSION_TTL
-        else:
-            ttl = SESSION_TTL
+        if SESSION_LAYOUT == "fields":
+            session = data if isinstance(data, Session) else Session(data)
+            ttl = _session_ttl(session)
+            with client.pipeline(transaction=True) as pipe:
+                commands, written = queue_write(pipe, session_id, session, ttl)
+                _queue_index(pipe, session_id, ttl, session.is_multiturn)
+                total = pipe.execute()[-1]
+            session_size_stats.record("fields", written)
+            evict_sessions(total)
+            print(f"[DEBUG] 세션 필드 저장: {session_id} (명령 {commands}개, {written}B)")
+            return
+
+        session = data if isinstance(data, Session) else Session(data)
+        encoded, ttl, size_kb = _encode_session(session_id, session)
+        with client.pipeline(transaction=False) as pipe:
+            pipe.set(session_id, encoded, ex=ttl)
+            _queue_index(pipe, session_id, ttl, session.is_multiturn)
+            total = pipe.execute()[-1]
+        evict_sessions(total)
+
+        print(f"[DEBUG] 세션 저장: {session_id} ({size_kb:.1f}KB, TTL={ttl}s)")
+
+    except SESSION_CONNECTION_ERRORS:
+        raise  # 저장소 래퍼가 메모리 저장소로 전환
+    except Exception as e:
+        print(f"[ERROR] 세션 저장 실패: {e}")
+
+def _redis_cleanup():
+    """인덱스 기준 정리 - 만료 항목 제거 후 MAX_SESSIONS 초과분 축출"""
+    counts = _redis_session_counts()
+    return evict_sessions(counts.get("total", 0))
+
+def _redis_delete_session(session_id: str):
+    session_near_cache.discard(session_id)
+    if client:
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                pipe.delete(*_session_keys(session_id))
+                _queue_unindex(pipe, [session_id])
+                pipe.execute()
+            print(f"[DEBUG] 세션 삭제: {session_id}")
+        except SESSION_CONNECTION_ERRORS:
+            raise  # 저장소 래퍼가 메모리 저장소로 전환
+        except Exception as e:
+            print(f"[ERROR] 세션 삭제 실패: {e}")
+
+# ============= 비동기 세션 API (redis.asyncio) =============
+
+_async_client = None
+_async_client_failed = False
+_stream_client = None
 
-        client.set(session_id, json_data, ex=ttl)
+async def get_async_client():
+    """비동기 Redis 클라이언트 - 이벤트 루프를 막지 않는 커넥션 풀"""
+    global _async_client, _async_client_failed
+    if _async_client is not None:
+        return _async_client
+    if _async_client_failed:
+        return None
 
-        # 8GB 환경에서는 정리 빈도 감소: 15번에 1번 → 30번에 1번
-        if hash(session_id) % 30 == 0:
-            cleanup_old_sessions()
+    for host in [redis_host, "localhost"]:
+        candidate = aioredis.Redis(
+            host=host,
+            port=redis_port,
+            decode_responses=True,
+            socket_connect_timeout=3,
+            socket_timeout=3,
+            max_connections=50,
+        )
+        try:
+            await candidate.ping()
+            _async_client = candidate
+            print(f"[SUCCESS] 비동기 Redis 연결: {host}:{redis_port}")
+            if SESSION_NEAR_CACHE:
+                await session_near_cache.start(host, redis_port)
+            return _async_client
+        except Exception as e:
+            print(f"[ERROR] 비동기 Redis 연결 실패 ({host}): {e}")
+            await candidate.aclose()
+
+    _async_client_failed = True
+    return None
+
+async def get_async_stream_client():
+    """SSE 재연결 스트림 구독용 클라이언트 - 응답마다 XREAD BLOCK으로 연결을 잡고 있으므로
+    세션/생성 명령이 쓰는 기본 풀과 분리 (동시 스트림이 늘어도 기본 풀이 고갈되지 않음)"""
+    global _stream_client
+    if _stream_client is not None:
+        return _stream_client
+    aclient = await get_async_client()
+    if aclient is None:
+        return None
+    _stream_client = aioredis.Redis.from_pool(aioredis.BlockingConnectionPool(
+        **aclient.connection_pool.connection_kwargs,
+        max_connections=REDIS_STREAM_POOL_SIZE,
+        timeout=REDIS_STREAM_POOL_TIMEOUT,
+    ))
+    return _stream_client
+
+async def close_async_client():
+    """앱 종료 시 비동기 커넥션 풀 정리"""
+    global _async_client, _stream_client
+    await session_store.aclose()
+    await session_near_cache.stop()
+    if _stream_client is not None:
+        await _stream_client.aclose()
+        _stream_client = None
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+# ============= 필드 단위 레이아웃 (SESSION_LAYOUT=fields) =============
+
+def _queue_read(pipe, session_id: str):
+    """해시 + 히스토리 + (이전 안 된) 기존 블롭을 한 번에 조회"""
+    pipe.hgetall(hash_key(session_id))
+    pipe.lrange(list_key(session_id), 0, -1)
+    pipe.execute_command("GET", session_id, **{NEVER_DECODE: True})
+
+def _load_result(fields, items, blob):
+    """(세션, 필드 레이아웃에서 읽었는지)"""
+    if fields or items:
+        return unflatten(fields, items), True
+    return _decode_session(blob), False
+
+async def _redis_aload_session(session_id: str):
+    """조회 실패는 예외로 전달 - 빈 세션을 돌려주면 스코프 커밋이 기존 세션을 덮어쓴다"""
+    aclient = await get_async_client()
+    if not aclient:
+        raise ConnectionError("Redis 연결 없음 - 세션 조회 불가")
+    cached = session_near_cache.get(session_id)
+    if cached is not None:
+        return cached
+    # 근접 캐시가 켜져 있으면 추적 연결로 읽어야 이후 변경 알림을 받는다
+    read_client = session_near_cache.read_client if session_near_cache.active else None
+    token = session_near_cache.begin(session_id) if read_client is not None else None
+    try:
+        if read_client is None:
+            result = await _aread_from(aclient, session_id)
+        else:
+            try:
+                result = await _aread_from(read_client, session_id)
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                # 추적 풀이 가득 찼거나 추적 연결 실패 → 캐시하지 않고 기본 연결로 조회
+                print(f"[WARNING] 추적 연결 조회 실패 - 기본 연결로 조회: {e}")
+                session_near_cache.discard(session_id)
+                session_near_cache.stats["fallbacks"] += 1
+                token = None
+                result = await _aread_from(aclient, session_id)
+    except Exception as e:
+        session_near_cache.discard(session_id)
+        print(f"[ERROR] 세션 조회 실패: {e}")
+        raise
+    if token is not None:
+        session_near_cache.put(session_id, token, *result)
+    return result
+
+async def _aread_from(aclient, session_id: str):
+    if SESSION_LAYOUT == "fields":
+        async with aclient.pipeline(transaction=False) as pipe:
+            _queue_read(pipe, session_id)
+            return _load_result(*await pipe.execute())
+    return _decode_session(await aclient.execute_command("GET", session_id, **{NEVER_DECODE: True})), False
+
+async def _aread_session(session_id: str) -> Session:
+    return (await _aload_session(session_id))[0]
+
+async def _awrite_session_fields(aclient, session_id: str, data, baseline: Optional[FieldSnapshot]) -> int:
+    """필드 저장 + 인덱스 갱신 (MULTI 한 번) → 전체 세션 수"""
+    session = data if isinstance(data, Session) else Session(data)
+    ttl = _session_ttl(session)
+    async with aclient.pipeline(transaction=True) as pipe:
+        commands, written = queue_write(pipe, session_id, session, ttl, baseline)
+        _queue_index(pipe, session_id, ttl, session.is_multiturn)
+        total = (await pipe.execute())[-1]
+    session_size_stats.record("fields", written)
+    print(f"[DEBUG] 세션 필드 저장: {session_id} (명령 {commands}개, {written}B{', 전체' if baseline is None else ''})")
+    return total
+
+async def _redis_awrite_session(session_id: str, data: dict, baseline: Optional[FieldSnapshot] = None) -> bool:
+    aclient = await get_async_client()
+    if not aclient:
+        return False
+    session_near_cache.discard(session_id)
+    try:
+        if SESSION_LAYOUT == "fields":
+            total = await _awrite_session_fields(aclient, session_id, data, baseline)
+            await aevict_sessions(total)
+            return True
+
+        session = data if isinstance(data, Session) else Session(data)
+        encoded, ttl, size_kb = _encode_session(session_id, session)
+        async with aclient.pipeline(transaction=False) as pipe:
+            pipe.set(session_id, encoded, ex=ttl)
+            _queue_index(pipe, session_id, ttl, session.is_multiturn)
+            total = (await pipe.execute())[-1]
+        await aevict_sessions(total)
 
         print(f"[DEBUG] 세션 저장: {session_id} ({size_kb:.1f}KB, TTL={ttl}s)")
+        return True
 
+    except SESSION_CONNECTION_ERRORS:
+        raise  # 저장소 래퍼가 메모리 저장소로 전환
     except Exception as e:
         print(f"[ERROR] 세션 저장 실패: {e}")
+        return False
 
-def cleanup_old_sessions():
-    """안전한 세션 정리 - 8GB 환경에서는 더 보수적"""
-    if not client:
-        return
-    try:
-        total_sessions = client.dbsize()
+async def _redis_aremove_session(session_id: str):
+    session_near_cache.discard(session_id)
+    aclient = await get_async_client()
+    if aclient:
+        try:
+            async with aclient.pipeline(transaction=False) as pipe:
+                pipe.delete(*_session_keys(session_id))
+                _queue_unindex(pipe, [session_id])
+                await pipe.execute()
+            print(f"[DEBUG] 세션 삭제: {session_id}")
+        except SESSION_CONNECTION_ERRORS:
+            raise  # 저장소 래퍼가 메모리 저장소로 전환
+        except Exception as e:
+            print(f"[ERROR] 세션 삭제 실패: {e}")
 
-        # 8GB 환경에서는 1500개 초과시만 정리
-        if total_sessions > 1500:
-            print(f"[INFO] 세션 정리 시작 (현재: {total_sessions}개)")
+# ============= 세션 저장소 선택 (SESSION_STORE) =============
 
-            keys_to_delete = []
-            for key in client.scan_iter(count=50):  # 스캔 범위 확대
-                ttl = client.ttl(key)
-                # TTL이 60초 미만이거나 이미 만료된 키만 삭제 (30초 → 60초로 완화)
-                if ttl < 60 or ttl == -1:
-                    keys_to_delete.append(key)
-                    if len(keys_to_delete) >= 30:  # 한 번에 30개까지 (15개 → 30개)
-                        break
+class RedisSessionStore(SessionStore):
+    """Redis 저장소 - 블롭/필드 레이아웃, 세션 인덱스, 근접 캐시는 위 함수들이 처리"""
 
-            if keys_to_delete:
-                client.delete(*keys_to_delete)
-                print(f"[INFO] 만료된 세션 정리: {len(keys_to_delete)}개")
+    name = "redis"
 
-    except Exception as e:
-        print(f"[ERROR] 세션 정리 실패: {e}")
+    def load(self, session_id: str) -> Session:
+        return _redis_get_session(session_id)
+
+    def save(self, session_id: str, data):
+        _redis_save_session(session_id, data)
+
+    def delete(self, session_id: str):
+        _redis_delete_session(session_id)
+
+    async def aload(self, session_id: str):
+        return await _redis_aload_session(session_id)
+
+    async def asave(self, session_id: str, data, baseline=None) -> bool:
+        return await _redis_awrite_session(session_id, data, baseline)
+
+    async def adelete(self, session_id: str):
+        await _redis_aremove_session(session_id)
+
+    def counts(self) -> Dict[str, int]:
+        return _redis_session_counts()
+
+    def cleanup(self) -> int:
+        return _redis_cleanup()
+
+    def clear(self) -> bool:
+        return _redis_clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "layout": SESSION_LAYOUT}
+
+def _create_session_store() -> SessionStore:
+    if SESSION_STORE == "memory":
+        print("[INFO] 메모리 세션 저장소 사용 (SESSION_STORE=memory)")
+        return MemorySessionStore(_session_ttl, MAX_SESSIONS)
+    if client is None:
+        # 저장이 조용히 무시되면 멀티턴 흐름이 깨지므로 이 프로세스 안에서라도 상태 유지
+        print("[WARNING] Redis 연결 없음 - 메모리 세션 저장소로 대체 (워커 간 공유 안 됨)")
+        return MemorySessionStore(_session_ttl, MAX_SESSIONS)
+    # 실행 중 연결이 끊기면 메모리 저장소로 넘어갔다가 SESSION_FAILOVER_RETRY 후 PING으로 복구 확인
+    return FailoverSessionStore(
+        RedisSessionStore(), MemorySessionStore(_session_ttl, MAX_SESSIONS),
+        errors=SESSION_CONNECTION_ERRORS, probe=_aping_redis,
+    )
+
+async def _aping_redis() -> bool:
+    aclient = await get_async_client()
+    return bool(aclient and await aclient.ping())
+
+session_store = _create_session_store()
+
+def get_session(session_id: str) -> Session:
+    """기존 함수 그대로 유지"""
+    if not session_id:
+        return Session()
+    return session_store.load(session_id)
+
+def save_session(session_id: str, data: dict):
+    """기존 로직 유지하면서 크기만 최적화"""
+    session_store.save(session_id, data)
 
 def delete_session(session_id: str):
     """기존 함수 그대로"""
-    if client:
+    session_store.delete(session_id)
+
+def get_session_counts() -> Dict[str, int]:
+    """네임스페이스별 정확한 세션 수"""
+    return session_store.counts()
+
+def cleanup_old_sessions():
+    return session_store.cleanup()
+
+async def _aload_session(session_id: str):
+    """(세션, 필드 레이아웃에서 읽었는지) - 스코프가 증분 저장 기준으로 사용"""
+    if not session_id:
+        return Session(), False
+    return await session_store.aload(session_id)
+
+async def _awrite_session(session_id: str, data: dict, baseline: Optional[FieldSnapshot] = None) -> bool:
+    """저장 성공 여부 반환 - baseline은 필드 레이아웃에서 증분 저장 기준"""
+    return await session_store.asave(session_id, data, baseline)
+
+async def _aremove_session(session_id: str):
+    await session_store.adelete(session_id)
+
+async def aget_session(session_id: str) -> Session:
+    """get_session의 비동기 버전 - 요청 스코프 안에서는 이미 로드된 객체 반환"""
+    scope = _current_scope(session_id)
+    if scope is not None:
+        return scope.data
+    return await _aread_session(session_id)
+
+async def asave_session(session_id: str, data: dict):
+    """save_session의 비동기 버전 - 요청 스코프 안에서는 종료 시 한 번만 저장"""
+    scope = _current_scope(session_id)
+    if scope is not None:
+        scope.stage(data)
+        return
+    await _awrite_session(session_id, data)
+
+async def adelete_session(session_id: str):
+    """delete_session의 비동기 버전"""
+    scope = _current_scope(session_id)
+    if scope is not None:
+        scope.stage_delete()
+        return
+    await _aremove_session(session_id)
+
+# ============= 요청 단위 세션 스코프 (Unit of Work) =============
+
+def _fingerprint(data) -> bytes:
+    return data.to_json() if isinstance(data, Session) else Session(data).to_json()
+
+class SessionScope:
+    """요청 하나 동안 공유되는 세션 - 한 번 로드하고 변경됐을 때만 한 번 저장"""
+
+    def __init__(self, session_id: str, data: Session, from_fields: bool = False):
+        self.session_id = session_id
+        self.data = data
+        self.deleted = False
+        self._loaded = _fingerprint(data)
+        # 필드 레이아웃에서 읽은 경우에만 증분 저장 (블롭에서 읽었으면 첫 저장은 전체 기록)
+        self._baseline = FieldSnapshot(data) if from_fields else None
+
+    def stage(self, data: dict):
+        """저장 요청을 스코프 객체에 반영 (다른 dict가 넘어오면 내용 교체)"""
+        if data is not self.data:
+            self.data.clear()
+            self.data.update(data)
+        self.deleted = False
+
+    def stage_delete(self):
+        self.data.clear()
+        self.deleted = True
+
+    @property
+    def dirty(self) -> bool:
+        return self.deleted or _fingerprint(self.data) != self._loaded
+
+    async def commit(self):
+        if self.deleted and not self.data:
+            await _aremove_session(self.session_id)
+        elif self.dirty:
+            if not await _awrite_session(self.session_id, self.data, self._baseline):
+                # 저장 실패 - 다음 저장은 전체 기록
+                self._loaded = b""
+                self._baseline = None
+                return
+        else:
+            print(f"[DEBUG] 세션 변경 없음 - 저장 생략: {self.session_id}")
+        self._mark_clean(SESSION_LAYOUT == "fields")
+
+    async def reload(self):
+        """중단된 턴의 반영 안 된 변경을 버리고 저장된 상태로 되돌림"""
+        data, from_fields = await _aload_session(self.session_id)
+        self.data.clear()
+        self.data.update(data)
+        self._mark_clean(from_fields)
+
+    def mark_persisted(self, fields: Dict[str, str]):
+        """스크립트로 이미 저장된 해시 필드는 커밋 때 다시 보내지 않음"""
+        if self._baseline is not None:
+            self._baseline.fields.update(fields)
+
+    def _mark_clean(self, from_fields: bool):
+        self.deleted = False
+        self._loaded = _fingerprint(self.data)
+        self._baseline = FieldSnapshot(self.data) if from_fields else None
+
+_session_scope: contextvars.ContextVar = contextvars.ContextVar("session_scope", default=None)
+
+def _current_scope(session_id: str):
+    scope = _session_scope.get()
+    if scope is not None and scope.session_id == session_id:
+        return scope
+    return None
+
+async def open_session_scope(session_id: str) -> SessionScope:
+    """연결 단위 세션 (WebSocket) - 한 번 로드해 두고 턴마다 bind_session_scope + commit"""
+    return SessionScope(session_id, *await _aload_session(session_id))
+
+@contextmanager
+def bind_session_scope(scope: SessionScope):
+    """이미 로드된 스코프를 현재 컨텍스트에 연결 - 블록 안의 session_scope/aget/asave가 공유"""
+    previous = _session_scope.get()
+    _session_scope.set(scope)
+    try:
+        yield scope.data
+    finally:
+        _session_scope.set(previous)
+
+@asynccontextmanager
+async def session_scope(session_id: str):
+    """요청 단위 세션 컨텍스트 - 블록 안의 aget/asave가 같은 객체를 공유하고, 정상 종료 시 변경분만 한 번 저장"""
+    existing = _current_scope(session_id)
+    if existing is not None:
+        # 중첩 스코프는 바깥 스코프를 그대로 사용
+        yield existing.data
+        return
+
+    scope = SessionScope(session_id, *await _aload_session(session_id))
+    previous = _session_scope.get()
+    _session_scope.set(scope)
+    try:
+        yield scope.data
+    finally:
+        _session_scope.set(previous)
+    await scope.commit()
+
+# ============= 원자적 멀티턴 단계 전환 (Lua) =============
+
+# 현재 단계가 expected일 때만 다음 단계로 바꾸고 답변 저장 - 한 번의 왕복, 동시 요청에도 안전
+# KEYS[1]=세션 해시, KEYS[2]=히스토리 리스트 / ARGV: 단계 필드, expected, next, TTL, 답변 필드('' 이면 없음), 답변(JSON)
+_ADVANCE_STEP_LUA = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if current ~= tonumber(ARGV[2]) then
+    return {0, current}
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+if ARGV[5] ~= '' then
+    redis.call('HSET', KEYS[1], ARGV[5], ARGV[6])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return {1, tonumber(ARGV[3])}
+"""
+
+# 블롭 레이아웃 WATCH/MULTI 재시도 횟수 (그 사이 다른 저장이 끼어들면 다시 읽고 비교)
+SESSION_STEP_WATCH_RETRIES = int(os.getenv("SESSION_STEP_WATCH_RETRIES", "3"))
+
+_advance_step_script = None
+_step_stats = {"advanced": 0, "conflicts": 0, "retries": 0, "local": 0}
+
+async def _get_advance_step_script():
+    """등록된 스크립트 (EVALSHA, 서버에 없으면 자동으로 다시 로드)"""
+    global _advance_step_script
+    if _advance_step_script is None:
+        aclient = await get_async_client()
+        if aclient is None:
+            return None
+        _advance_step_script = aclient.register_script(_ADVANCE_STEP_LUA)
+    return _advance_step_script
+
+async def _aadvance_blob_step(aclient, session_id: str, step_key: str, expected: int, next_step: int,
+                              info_key: Optional[str], answer_key: Optional[str], answer: Optional[str]):
+    """블롭 레이아웃 비교-전진 - WATCH로 읽고 MULTI로 저장 (바이너리 코덱이라 Lua 대신 여기서 디코딩/인코딩)
+
+    반환: (성공 여부, 현재 단계) / 재시도를 다 써도 계속 끼어들면 충돌로 본다
+    """
+    current = expected
+    for _ in range(SESSION_STEP_WATCH_RETRIES):
+        async with aclient.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(session_id)
+                stored = _decode_session(await pipe.execute_command("GET", session_id, **{NEVER_DECODE: True}))
+                current = stored.get(step_key, 0)
+                if current != expected:
+                    return False, current
+                _apply_step(stored, step_key, next_step, info_key, answer_key, answer)
+                encoded, ttl, _ = _encode_session(session_id, stored)
+                pipe.multi()
+                pipe.set(session_id, encoded, ex=ttl)
+                _queue_index(pipe, session_id, ttl, stored.is_multiturn)
+                await pipe.execute()
+                return True, next_step
+            except redis.WatchError:
+                _step_stats["retries"] += 1
+    return False, current
+
+async def aadvance_session_step(session_id: str, session: Session, step_key: str, expected: int, next_step: int,
+                                info_key: Optional[str] = None, answer_key: Optional[str] = None,
+                                answer: Optional[str] = None):
+    """멀티턴 단계 비교-전진 + 답변 저장 → (성공 여부, 현재 단계)
+
+    Redis 저장소면 레이아웃과 상관없이 원자적으로 처리하고, 실패하면 다른 요청이 먼저 전진시킨 것.
+    필드 레이아웃은 Lua 스크립트 한 번, 블롭 레이아웃은 WATCH/MULTI로 저장된 블롭을 비교 후 교체한다.
+    필드 레이아웃인데 아직 이전 안 된 세션이거나 스코프 밖이면 세션 객체만 바꾸고 커밋 때 저장한다.
+    """
+    scope = _current_scope(session_id)
+    redis_scope = scope is not None and session_store.name == "redis"
+    if redis_scope and SESSION_LAYOUT != "fields":
+        aclient = await get_async_client()
+        if aclient is not None:
+            session_near_cache.discard(session_id)
+            try:
+                ok, current = await _aadvance_blob_step(
+                    aclient, session_id, step_key, expected, next_step, info_key, answer_key, answer)
+            except Exception as e:
+                print(f"[ERROR] 단계 전환 트랜잭션 실패 - 세션 객체로 처리: {e}")
+            else:
+                if not ok:
+                    _step_stats["conflicts"] += 1
+                    print(f"[INFO] 단계 전환 충돌: {session_id} {step_key} 기대={expected} 실제={current}")
+                    return False, int(current)
+                _step_stats["advanced"] += 1
+                _apply_step(session, step_key, next_step, info_key, answer_key, answer)
+                return True, next_step
+
+    atomic = (
+        SESSION_LAYOUT == "fields" and redis_scope
+        and (scope._baseline is not None or expected == 0)
+    )
+    answer_field = f"{info_key}.{answer_key}" if answer_key else ""
+    script = await _get_advance_step_script() if atomic else None
+
+    if script is not None:
+        session_near_cache.discard(session_id)
+        answer_json = orjson.dumps(answer).decode("utf-8") if answer_key else ""
         try:
-            client.delete(session_id)
-            print(f"[DEBUG] 세션 삭제: {session_id}")
+            ok, current = await script(
+                keys=[hash_key(session_id), list_key(session_id)],
+                args=[step_key, expected, next_step, session_ttl_policy.ttl_for("mid_flow"), answer_field, answer_json],
+            )
         except Exception as e:
-            print(f"[ERROR] 세션 삭제 실패: {e}")
+            print(f"[ERROR] 단계 전환 스크립트 실패 - 세션 객체로 처리: {e}")
+        else:
+            if not ok:
+                _step_stats["conflicts"] += 1
+                print(f"[INFO] 단계 전환 충돌: {session_id} {step_key} 기대={expected} 실제={current}")
+                return False, int(current)
+            _step_stats["advanced"] += 1
+            persisted = {step_key: str(next_step)}
+            if answer_key:
+                persisted[answer_field] = answer_json
+            _apply_step(session, step_key, next_step, info_key, answer_key, answer)
+            scope.mark_persisted(persisted)
+            return True, next_step
+
+    _step_stats["local"] += 1
+    _apply_step(session, step_key, next_step, info_key, answer_key, answer)
+    return True, next_step
+
+def _apply_step(session: Session, step_key: str, next_step: int, info_key: Optional[str],
+                answer_key: Optional[str], answer: Optional[str]):
+    session[step_key] = next_step
+    if answer_key:
+        info = session.get(info_key, {})
+        info[answer_key] = answer
+        session[info_key] = info
+
+def get_step_transition_stats() -> Dict[str, int]:
+    return dict(_step_stats)
+
+async def aevict_sessions(total: int) -> int:
+    """evict_sessions의 비동기 버전"""
+    overflow = total - MAX_SESSIONS
+    if overflow <= 0:
+        return 0
+    aclient = await get_async_client()
+    if not aclient:
+        return 0
+    try:
+        popped = await aclient.zpopmin(SESSION_INDEX_KEY, overflow)
+        if not popped:
+            return 0
+        async with aclient.pipeline(transaction=False) as pipe:
+            session_ids = _queue_eviction(pipe, popped)
+            await pipe.execute()
+        print(f"[INFO] 세션 {len(session_ids)}개 축출 (최대 {MAX_SESSIONS}개 초과)")
+        return len(session_ids)
+    except Exception as e:
+        print(f"[ERROR] 세션 축출 실패: {e}")
+        return 0
+
+async def aget_session_counts() -> Dict[str, int]:
+    """get_session_counts의 비동기 버전"""
+    if session_store.name != "redis":
+        return session_store.counts()
+    aclient = await get_async_client()
+    if not aclient:
+        return {}
+    async with aclient.pipeline(transaction=False) as pipe:
+        namespaces = _queue_counts(pipe)
+        return _counts_result(namespaces, await pipe.execute())
+
+async def acleanup_old_sessions():
+    """cleanup_old_sessions의 비동기 버전"""
+    if session_store.name != "redis":
+        return session_store.cleanup()
+    counts = await aget_session_counts()
+    return await aevict_sessions(counts.get("total", 0))
 
 def get_redis_memory_info():
     """Redis 메모리 정보"""
     if not client:
-        return {"error": "Redis 연결 없음"}
+        return {"error": "Redis 연결 없음", "session_store": session_store.stats()}
 
     try:
         info = client.info('memory')
@@ -187,7 +847,13 @@ def get_redis_memory_info():
             "maxmemory_human": f"{MEMORY_LIMIT_MB}MB",
             "usage_percent": f"{(used_mb/MEMORY_LIMIT_MB)*100:.1f}%",
             "total_keys": client.dbsize(),
-            "status": "healthy" if used_mb < MEMORY_LIMIT_MB * 0.8 else "warning"
+            "sessions": get_session_counts(),
+            "status": "healthy" if used_mb < MEMORY_LIMIT_MB * 0.8 else "warning",
+            "session_sizes": session_size_stats.snapshot(),
+            "step_transitions": get_step_transition_stats(),
+            "near_cache": session_near_cache.snapshot(),
+            "session_store": session_store.stats(),
+            "ttl_policy": session_ttl_policy.get_stats(),
         }
     except Exception as e:
         return {"error": str(e)}
@@ -201,7 +867,9 @@ def get_user_capacity_info():
 
     # 현재 사용량 파싱
     used_mb = float(redis_info.get("used_memory_mb", "0").replace("MB", ""))
-    total_sessions = redis_info.get("total_keys", 0)
+    # dbsize는 인텐트 캐시/SSE 스트림 등 다른 키도 포함하므로 세션 인덱스 기준으로 계산
+    session_counts = get_session_counts()
+    total_sessions = session_counts.get("total", 0)
 
     # 1세션당 평균 메모리 계산
     if total_sessions > 0:
@@ -221,6 +889,8 @@ def get_user_capacity_info():
 
     return {
         "current_sessions": total_sessions,
+        "sessions_by_namespace": {k: v for k, v in session_counts.items() if k != "total"},
+        "max_sessions": MAX_SESSIONS,
         "used_memory": f"{used_mb:.1f}MB",
         "avg_memory_per_session": f"{avg_memory_per_session:.2f}MB",
         "max_additional_users": max_additional_users,
@@ -242,13 +912,29 @@ def get_capacity_recommendation(current: int, safe_capacity: int) -> str:
 
 def emergency_cleanup():
     """긴급 정리 - 기존 함수 유지"""
+    return session_store.clear()
+
+def _redis_clear():
+    """인덱스에 있는 세션만 배치 단위 UNLINK (FLUSHDB처럼 다른 키를 지우거나 Redis를 오래 막지 않음)"""
     if not client:
         return False
 
     try:
-        client.flushdb()
-        print("[EMERGENCY] 모든 세션 삭제됨")
+        purged = 0
+        cursor = 0
+        while True:
+            cursor, members = client.zscan(SESSION_INDEX_KEY, cursor, count=200)
+            if members:
+                with client.pipeline(transaction=False) as pipe:
+                    session_ids = _queue_eviction(pipe, members)
+                    pipe.zrem(SESSION_INDEX_KEY, *session_ids)
+                    pipe.execute()
+                purged += len(session_ids)
+            if cursor == 0:
+                break
+        session_near_cache.flush()
+        print(f"[EMERGENCY] 세션 {purged}개 삭제됨")
         return True
     except Exception as e:
         print(f"[ERROR] 긴급 정리 실패: {e}")
-        return False
\ No newline at end of file
+        return False
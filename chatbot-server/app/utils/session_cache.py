@@ -0,0 +1,185 @@
+# chatbot-server/app/utils/session_cache.py - 세션 근접 캐시 (프로세스 내 LRU + Redis 서버 지원 무효화)
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import redis.asyncio as aioredis
+from redis.asyncio.connection import Connection
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from app.utils.session_model import Session
+
+SESSION_NEAR_CACHE = os.getenv("SESSION_NEAR_CACHE", "false").lower() == "true"
+SESSION_NEAR_CACHE_SIZE = int(os.getenv("SESSION_NEAR_CACHE_SIZE", "1000"))
+# 추적 연결 풀 - 기본 풀과 같은 크기, 비면 잠깐만 기다리고 안 되면 추적 없는 기본 연결로 조회
+SESSION_NEAR_CACHE_POOL_SIZE = int(os.getenv("SESSION_NEAR_CACHE_POOL_SIZE", "50"))
+SESSION_NEAR_CACHE_POOL_TIMEOUT = float(os.getenv("SESSION_NEAR_CACHE_POOL_TIMEOUT", "0.1"))
+
+# 추적 연결이 읽은 키가 바뀌면 Redis가 이 채널로 키 이름을 보내준다 (CLIENT TRACKING ... REDIRECT)
+_INVALIDATE_CHANNEL = "__redis__:invalidate"
+_RETRY_DELAY_MAX = 30.0
+_KEY_SUFFIXES = (":h", ":l")  # 필드 레이아웃 키 → 세션 ID
+
+class _TrackingConnection(Connection):
+    """연결될 때마다 무효화 구독 연결로 리다이렉트하는 추적을 켜는 연결"""
+
+    async def on_connect(self) -> None:
+        await super().on_connect()
+        await self.send_command("CLIENT", "TRACKING", "ON", "REDIRECT", session_near_cache.redirect_id)
+        response = await self.read_response()
+        if response not in ("OK", b"OK"):
+            raise ConnectionError(f"CLIENT TRACKING 실패: {response}")
+
+class SessionNearCache:
+    """디코딩된 세션 LRU - 추적 연결로 읽은 세션만 보관하고 Redis 무효화 메시지로 제거
+
+    다른 워커가 세션을 바꾸거나 TTL로 만료되면 Redis가 알려주므로 워커 간에도 오래된 값을 주지 않는다.
+    무효화 구독이 끊기면 받지 못한 알림이 있을 수 있으므로 전부 비우고 다시 연결될 때까지 비활성화.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.active = False
+        self.redirect_id: Optional[int] = None
+        self.read_client = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending: Dict[str, object] = {}  # 조회 중인 세션 → 토큰 (조회 도중 무효화되면 캐시하지 않음)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "flushes": 0, "evictions": 0, "fallbacks": 0}
+
+    # ---- 캐시 ----
+
+    def get(self, session_id: str):
+        """(세션 복사본, 필드 레이아웃 여부) 또는 None"""
+        if not self.active:
+            return None
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(session_id)
+        self.stats["hits"] += 1
+        session, from_fields = entry
+        return session.copy(), from_fields
+
+    def begin(self, session_id: str) -> object:
+        token = object()
+        self._pending[session_id] = token
+        return token
+
+    def put(self, session_id: str, token: object, session: Session, from_fields: bool):
+        """begin 이후 무효화가 없었을 때만 보관"""
+        if self._pending.get(session_id) is not token:
+            return
+        del self._pending[session_id]
+        if not self.active:
+            return
+        self._entries[session_id] = (session.copy(), from_fields)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def discard(self, session_id: str):
+        """이 워커가 쓰거나 지운 세션 - 무효화 메시지를 기다리지 않고 바로 제거"""
+        self._entries.pop(session_id, None)
+        self._pending.pop(session_id, None)
+
+    def invalidate(self, keys):
+        """무효화 메시지 처리 - keys가 None이면 FLUSHDB/FLUSHALL"""
+        if keys is None:
+            self.flush()
+            return
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode("utf-8")
+            session_id = key[:-2] if key.endswith(_KEY_SUFFIXES) else key
+            self.discard(key)
+            self.discard(session_id)
+            self.stats["invalidations"] += 1
+
+    def flush(self):
+        self._entries.clear()
+        self._pending.clear()
+        self.stats["flushes"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": SESSION_NEAR_CACHE,
+            "active": self.active,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            **self.stats,
+        }
+
+    # ---- 무효화 구독 ----
+
+    async def start(self, host: str, port: int):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(host, port))
+
+    async def stop(self):
+        self._deactivate()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _deactivate(self):
+        self.active = False
+        self.flush()
+
+    async def _run(self, host: str, port: int):
+        """구독 연결 유지 - 끊기면 캐시를 비우고 새 클라이언트 ID로 추적을 다시 시작"""
+        delay = 1.0
+        while True:
+            try:
+                await self._listen(host, port)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARNING] 세션 근접 캐시 비활성화 ({e}) - {delay:.0f}초 후 재연결")
+            self._deactivate()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RETRY_DELAY_MAX)
+
+    async def _listen(self, host: str, port: int):
+        # 재시도 없음 - 구독 연결이 조용히 다시 붙으면 클라이언트 ID가 바뀌어 리다이렉트가 끊긴다
+        listener = aioredis.Redis(host=host, port=port, decode_responses=True,
+                                  socket_connect_timeout=3, retry=Retry(NoBackoff(), 0))
+        pubsub = listener.pubsub()
+        read_client = None
+        try:
+            await pubsub.connect()
+            await pubsub.connection.send_command("CLIENT", "ID")
+            self.redirect_id = await pubsub.connection.read_response()
+            await pubsub.subscribe(_INVALIDATE_CHANNEL)
+
+            read_client = aioredis.Redis.from_pool(aioredis.BlockingConnectionPool(
+                connection_class=_TrackingConnection, host=host, port=port, decode_responses=True,
+                socket_connect_timeout=3, socket_timeout=3,
+                max_connections=SESSION_NEAR_CACHE_POOL_SIZE, timeout=SESSION_NEAR_CACHE_POOL_TIMEOUT,
+            ))
+            await read_client.ping()  # 추적 설정 확인 (Redis 6 미만이면 여기서 실패)
+            self.read_client = read_client
+            self.active = True
+            print(f"[SUCCESS] 세션 근접 캐시 활성화 (추적 리다이렉트 → 클라이언트 {self.redirect_id})")
+
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.invalidate(message["data"])
+            raise ConnectionError("무효화 구독 종료")
+        finally:
+            self.active = False
+            self.read_client = None
+            if read_client is not None:
+                await read_client.aclose()
+            await pubsub.aclose()
+            await listener.aclose()
+
+session_near_cache = SessionNearCache(SESSION_NEAR_CACHE_SIZE)
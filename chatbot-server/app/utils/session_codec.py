@@ -0,0 +1,149 @@
+# chatbot-server/app/utils/session_codec.py - 세션 저장 포맷 (JSON / msgpack / msgpack+zlib)
+
+import bisect
+import os
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 환경에서는 JSON만 사용
+    msgpack = None
+
+# JSON은 헤더 없이 저장 (기존 포맷 그대로 - 롤아웃 중 구버전 서버도 읽을 수 있음)
+# 바이너리 포맷은 [MAGIC][버전][코덱 ID] 3바이트 헤더 뒤에 본문
+SESSION_CODEC = os.getenv("SESSION_CODEC", "json")
+SESSION_HISTORY_ZLIB_LEVEL = int(os.getenv("SESSION_HISTORY_ZLIB_LEVEL", "6"))
+SESSION_SIZE_SAMPLE_EVERY = int(os.getenv("SESSION_SIZE_SAMPLE_EVERY", "20"))  # N번에 한 번 JSON 크기와 비교
+
+HEADER_MAGIC = b"\xc1"  # JSON('{')과 msgpack 어느 쪽으로도 시작할 수 없는 바이트
+HEADER_VERSION = 1
+
+class JsonCodec:
+    name = "json"
+    codec_id = 0
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return orjson.dumps(payload)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return orjson.loads(body)
+
+class MsgpackCodec:
+    name = "msgpack"
+    codec_id = 1
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        return msgpack.packb(payload, use_bin_type=True)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(body, raw=False)
+
+class MsgpackZlibCodec(MsgpackCodec):
+    """msgpack + 히스토리 필드만 zlib 압축 (대화 텍스트가 세션 크기의 대부분)"""
+
+    name = "msgpack_zlib"
+    codec_id = 2
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        history = payload.get("history")
+        if history:
+            packed = msgpack.packb(history, use_bin_type=True)
+            compressed = zlib.compress(packed, SESSION_HISTORY_ZLIB_LEVEL)
+            if len(compressed) < len(packed):
+                payload = {**payload, "history": compressed}
+        return super().encode(payload)
+
+    def decode(self, body: bytes) -> Dict[str, Any]:
+        payload = super().decode(body)
+        history = payload.get("history")
+        if isinstance(history, bytes):
+            payload["history"] = msgpack.unpackb(zlib.decompress(history), raw=False)
+        return payload
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), MsgpackCodec(), MsgpackZlibCodec())}
+_CODECS_BY_ID = {codec.codec_id: codec for codec in CODECS.values()}
+
+@lru_cache(maxsize=None)
+def get_codec(name: Optional[str] = None):
+    """설정된 쓰기 코덱 - msgpack이 없거나 이름이 잘못되면 JSON"""
+    name = name or SESSION_CODEC
+    codec = CODECS.get(name)
+    if codec is None:
+        print(f"[WARNING] 알 수 없는 세션 코덱 '{name}' - json 사용")
+        return CODECS["json"]
+    if codec.name != "json" and msgpack is None:
+        print(f"[WARNING] msgpack 미설치 - 세션 코덱 '{name}' 대신 json 사용")
+        return CODECS["json"]
+    return codec
+
+def encode_payload(payload: Dict[str, Any], codec=None) -> bytes:
+    codec = codec or get_codec()
+    body = codec.encode(payload)
+    if codec.codec_id == JsonCodec.codec_id:
+        return body
+    return HEADER_MAGIC + bytes((HEADER_VERSION, codec.codec_id)) + body
+
+def decode_payload(raw) -> Dict[str, Any]:
+    """헤더를 보고 코덱 선택 - 헤더 없으면 기존 JSON (포맷이 섞여 있어도 읽힘)"""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    if not raw.startswith(HEADER_MAGIC):
+        return CODECS["json"].decode(raw)
+    version, codec_id = raw[1], raw[2]
+    if version != HEADER_VERSION:
+        raise ValueError(f"지원하지 않는 세션 포맷 버전: {version}")
+    codec = _CODECS_BY_ID.get(codec_id)
+    if codec is None:
+        raise ValueError(f"알 수 없는 세션 코덱 ID: {codec_id}")
+    if msgpack is None:
+        raise ValueError("msgpack 미설치 - 바이너리 세션을 읽을 수 없음")
+    return codec.decode(raw[3:])
+
+# ============= 세션 크기 히스토그램 =============
+
+_SIZE_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384)
+_BUCKET_LABELS = tuple(f"<={b}B" for b in _SIZE_BUCKETS) + (f">{_SIZE_BUCKETS[-1]}B",)
+
+class SessionSizeStats:
+    """저장된 세션 바이트 수 분포 (코덱별) + 샘플링한 JSON 대비 절감률"""
+
+    def __init__(self):
+        self.histograms: Dict[str, list] = {}
+        self.totals: Dict[str, list] = {}  # 코덱 → [저장 횟수, 바이트 합]
+        self.sampled_encoded = 0
+        self.sampled_json = 0
+        self._writes = 0
+
+    def record(self, codec_name: str, size: int, payload: Optional[Dict[str, Any]] = None):
+        histogram = self.histograms.setdefault(codec_name, [0] * len(_BUCKET_LABELS))
+        histogram[bisect.bisect_left(_SIZE_BUCKETS, size)] += 1
+        totals = self.totals.setdefault(codec_name, [0, 0])
+        totals[0] += 1
+        totals[1] += size
+
+        self._writes += 1
+        if payload is not None and SESSION_SIZE_SAMPLE_EVERY > 0 and self._writes % SESSION_SIZE_SAMPLE_EVERY == 0:
+            self.sampled_encoded += size
+            self.sampled_json += len(orjson.dumps(payload))
+
+    def snapshot(self) -> Dict[str, Any]:
+        codecs = {}
+        for name, histogram in self.histograms.items():
+            count, total = self.totals[name]
+            codecs[name] = {
+                "writes": count,
+                "avg_bytes": round(total / count, 1) if count else 0.0,
+                "histogram": dict(zip(_BUCKET_LABELS, histogram)),
+            }
+        return {
+            "write_codec": get_codec().name,
+            "msgpack_available": msgpack is not None,
+            "codecs": codecs,
+            "sampled_bytes_vs_json": round(self.sampled_encoded / self.sampled_json, 3) if self.sampled_json else None,
+        }
+
+session_size_stats = SessionSizeStats()
@@ -0,0 +1,109 @@
+# chatbot-server/app/utils/session_fields.py - 필드 단위 세션 저장 (Redis 해시 + 제한 리스트)
+
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from app.utils.session_model import HISTORY_LIMIT, INFO_FIELDS, Session
+
+# 레이아웃
+#   {session_id}:h  해시 - 스칼라 필드(step, last_recommendation_type, answers)와
+#                   info 필드를 "user_info.budget" 처럼 펼쳐서 저장 (값은 JSON)
+#   {session_id}:l  리스트 - 히스토리 [role, text] 한 항목씩, RPUSH + LTRIM으로 HISTORY_LIMIT 유지
+
+def hash_key(session_id: str) -> str:
+    return f"{session_id}:h"
+
+def list_key(session_id: str) -> str:
+    return f"{session_id}:l"
+
+def flatten(session: Session) -> Dict[str, str]:
+    """히스토리를 뺀 필드 → 해시 필드 (info dict는 한 단계 펼침)"""
+    fields = {}
+    for name, value in session.to_payload().items():
+        if name == 'history':
+            continue
+        if name in INFO_FIELDS:
+            for key, item in value.items():
+                fields[f"{name}.{key}"] = orjson.dumps(item).decode("utf-8")
+            if not value:
+                fields[name] = "{}"
+        else:
+            fields[name] = orjson.dumps(value).decode("utf-8")
+    return fields
+
+def unflatten(fields: Dict[str, str], history_items) -> Session:
+    """HGETALL + LRANGE 결과 → Session"""
+    payload: Dict[str, object] = {}
+    for field, raw in fields.items():
+        name, _, key = field.partition(".")
+        value = orjson.loads(raw)
+        if name in INFO_FIELDS:
+            info = payload.setdefault(name, {})
+            if key:
+                info[key] = value
+        else:
+            payload[name] = value
+    if history_items:
+        payload['history'] = [orjson.loads(item) for item in history_items]
+    return Session(payload)
+
+class FieldSnapshot:
+    """마지막으로 로드/저장한 시점의 필드 상태 - 다음 저장에서 바뀐 부분만 보내기 위한 기준"""
+
+    __slots__ = ("fields", "history")
+
+    def __init__(self, session: Session):
+        self.fields = flatten(session)
+        self.history = session.history  # 같은 객체에 append만 했으면 증분 저장 가능
+        if self.history is not None:
+            self.history.appended = 0
+
+def queue_write(pipe, session_id: str, session: Session, ttl: int,
+                baseline: Optional[FieldSnapshot] = None) -> Tuple[int, int]:
+    """파이프라인에 저장 명령 추가 - baseline이 있으면 바뀐 필드/추가된 히스토리만
+
+    반환: (명령 수, 보낸 값 바이트 수)
+    """
+    h_key, l_key = hash_key(session_id), list_key(session_id)
+    fields = flatten(session)
+    history = session.history or ()
+    commands = 0
+
+    if baseline is None:
+        # 전체 기록 (첫 저장 / 기존 JSON 블롭에서 이전)
+        pipe.delete(session_id, h_key, l_key)
+        changed, removed = fields, []
+        pushed = [orjson.dumps(entry).decode("utf-8") for entry in history]
+        commands += 1
+    else:
+        old = baseline.fields
+        changed = {k: v for k, v in fields.items() if old.get(k) != v}
+        removed = [k for k in old if k not in fields]
+        if session.history is not None and session.history is baseline.history:
+            new_entries = history[-session.history.appended:] if session.history.appended else []
+        else:
+            # 히스토리 객체가 통째로 바뀌었으면 리스트 재작성
+            pipe.delete(l_key)
+            commands += 1
+            new_entries = history
+        pushed = [orjson.dumps(entry).decode("utf-8") for entry in new_entries]
+
+    if changed:
+        pipe.hset(h_key, mapping=changed)
+        commands += 1
+    if removed:
+        pipe.hdel(h_key, *removed)
+        commands += 1
+    if pushed:
+        pipe.rpush(l_key, *pushed)
+        pipe.ltrim(l_key, -HISTORY_LIMIT, -1)
+        commands += 2
+
+    # TTL은 같은 파이프라인에서 갱신 (해시가 비면 키가 사라지므로 EXPIRE는 무시됨)
+    pipe.expire(h_key, ttl)
+    pipe.expire(l_key, ttl)
+    commands += 2
+
+    written = sum(len(k) + len(v) for k, v in changed.items()) + sum(len(p) for p in pushed)
+    return commands, written
@@ -0,0 +1,211 @@
+# chatbot-server/app/utils/session_memory.py - 세션당 메모리 실측 샘플링 + 수용량 예측 (백그라운드)
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from app.utils.redis_client import (
+    MEMORY_LIMIT_MB, SESSION_NAMESPACES, _namespace_index_key, _session_keys,
+    get_async_client, get_capacity_recommendation, get_redis_memory_info, get_step_transition_stats,
+    get_user_capacity_info, session_near_cache, session_size_stats, session_store,
+)
+from app.utils.session_purge import tighten_idle_sessions
+from app.utils.session_ttl import session_ttl_policy
+
+SESSION_MEMORY_SAMPLE_INTERVAL = int(os.getenv("SESSION_MEMORY_SAMPLE_INTERVAL", "30"))  # 샘플링 주기(초)
+SESSION_MEMORY_SAMPLE_SIZE = int(os.getenv("SESSION_MEMORY_SAMPLE_SIZE", "20"))  # 네임스페이스별 회당 샘플 수
+SESSION_MEMORY_WINDOW = int(os.getenv("SESSION_MEMORY_WINDOW", "500"))  # 백분위 계산에 쓰는 최근 샘플 수
+SAFE_MARGIN = 0.8  # 안전 마진 (기존 수용량 계산과 동일)
+
+_MB = 1024 * 1024
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return float(ordered[index])
+
+class SessionMemorySampler:
+    """MEMORY USAGE로 네임스페이스별 세션 크기를 주기적으로 실측하고 결과를 캐시
+
+    세션 하나 = 블롭 + 필드 해시 + 히스토리 리스트 키 합계. 인덱스에서 무작위로 뽑으므로 dbsize와 달리
+    인텐트 캐시/SSE 스트림 키가 섞이지 않는다. 용량 엔드포인트는 캐시된 결과만 읽는다.
+    """
+
+    def __init__(self):
+        namespaces = sorted(set(SESSION_NAMESPACES.values()) | {"chat"})
+        self.samples: Dict[str, deque] = {ns: deque(maxlen=SESSION_MEMORY_WINDOW) for ns in namespaces}
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._previous: Optional[tuple] = None  # (시각, 전체 세션 수) - 증가 속도 계산용
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARNING] 세션 메모리 샘플링 실패: {e}")
+            await asyncio.sleep(SESSION_MEMORY_SAMPLE_INTERVAL)
+
+    async def sample(self):
+        aclient = await get_async_client()
+        if not aclient:
+            return
+        now = time.time()
+        namespaces = list(self.samples)
+
+        async with aclient.pipeline(transaction=False) as pipe:
+            pipe.info("memory")
+            for namespace in namespaces:
+                index_key = _namespace_index_key(namespace)
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.zcard(index_key)
+                pipe.zrandmember(index_key, SESSION_MEMORY_SAMPLE_SIZE)
+            results = await pipe.execute()
+        info, rows = results[0], results[1:]
+        counts = {ns: rows[i * 3 + 1] for i, ns in enumerate(namespaces)}
+        sampled = {ns: rows[i * 3 + 2] or [] for i, ns in enumerate(namespaces)}
+
+        async with aclient.pipeline(transaction=False) as pipe:
+            for namespace in namespaces:
+                for session_id in sampled[namespace]:
+                    for key in _session_keys(session_id):
+                        pipe.memory_usage(key)
+            usages = iter(await pipe.execute())
+        for namespace in namespaces:
+            for _ in sampled[namespace]:
+                parts = [next(usages) for _ in range(3)]
+                if any(part is not None for part in parts):  # 샘플링 사이에 만료된 세션 제외
+                    self.samples[namespace].append(sum(part or 0 for part in parts))
+
+        self.snapshot = self._forecast(info, counts, now)
+
+        # TTL 정책에 메모리 사용률 전달 - 압박 중이면 유휴 세션 TTL 단축
+        session_ttl_policy.update_memory_ratio(self.snapshot["used_memory_bytes"] / self.snapshot["limit_bytes"])
+        await tighten_idle_sessions()
+
+    def _forecast(self, info: Dict[str, Any], counts: Dict[str, int], now: float) -> Dict[str, Any]:
+        used = info.get("used_memory", 0)
+        rss = info.get("used_memory_rss", 0)
+        fragmentation = info.get("mem_fragmentation_ratio") or (rss / used if used else 1.0)
+        limit = MEMORY_LIMIT_MB * _MB
+
+        per_namespace = {}
+        for namespace, values in self.samples.items():
+            per_namespace[namespace] = {
+                "sessions": counts[namespace],
+                "samples": len(values),
+                "mean_bytes": round(sum(values) / len(values), 1) if values else None,
+                "p50_bytes": _percentile(values, 0.5) if values else None,
+                "p90_bytes": _percentile(values, 0.9) if values else None,
+                "p99_bytes": _percentile(values, 0.99) if values else None,
+            }
+
+        total = sum(counts.values())
+        # 새 세션 크기 = 현재 네임스페이스 비율로 가중 (샘플 없는 네임스페이스는 제외)
+        measured = [(counts[ns] or 1, stats) for ns, stats in per_namespace.items() if stats["samples"]]
+        weight = sum(w for w, _ in measured)
+        mean_bytes = sum(w * s["mean_bytes"] for w, s in measured) / weight if measured else None
+        p90_bytes = sum(w * s["p90_bytes"] for w, s in measured) / weight if measured else None
+        session_bytes = sum(counts[ns] * (s["mean_bytes"] or 0) for ns, s in per_namespace.items())
+
+        # maxmemory 축출은 used_memory 기준이지만 실제 점유(RSS)는 단편화만큼 더 크므로
+        # 안전 수용량은 두 기준 중 먼저 차는 쪽 (RSS 여유를 단편화 비율로 나눠 used_memory 단위로 환산)
+        headroom = max(0, limit - used)
+        rss_headroom = max(0, limit - rss) / max(fragmentation, 1.0)
+        additional = int(headroom / mean_bytes) if mean_bytes else None
+        additional_safe = int(min(headroom, rss_headroom) * SAFE_MARGIN / p90_bytes) if p90_bytes else None
+
+        growth_per_min = None
+        minutes_to_limit = None
+        if self._previous is not None:
+            elapsed = now - self._previous[0]
+            if elapsed > 0:
+                growth_per_min = round((total - self._previous[1]) * 60 / elapsed, 2)
+                if growth_per_min > 0 and additional_safe is not None:
+                    minutes_to_limit = round(additional_safe / growth_per_min, 1)
+        self._previous = (now, total)
+
+        return {
+            "sampled_at": now,
+            "used_memory_bytes": used,
+            "used_memory_rss_bytes": rss,
+            "fragmentation_ratio": round(fragmentation, 2),
+            "limit_bytes": limit,
+            "headroom_bytes": headroom,
+            "rss_headroom_bytes": int(rss_headroom),
+            "session_bytes_estimate": int(session_bytes),
+            "other_bytes_estimate": max(0, int(used - session_bytes)),
+            "sessions": {**counts, "total": total},
+            "per_namespace": per_namespace,
+            "mean_bytes_per_session": round(mean_bytes, 1) if mean_bytes else None,
+            "p90_bytes_per_session": round(p90_bytes, 1) if p90_bytes else None,
+            "additional_sessions": additional,
+            "additional_sessions_safe": additional_safe,
+            "session_growth_per_min": growth_per_min,
+            "minutes_to_safe_limit": minutes_to_limit,
+        }
+
+session_memory_sampler = SessionMemorySampler()
+
+# ============= 캐시된 스냅샷 기반 조회 (용량 엔드포인트) =============
+
+async def get_memory_status() -> Dict[str, Any]:
+    """/redis/status - 마지막 샘플 + 프로세스 내 통계 (샘플 전이면 기존 실시간 조회를 스레드에서)"""
+    snapshot = session_memory_sampler.snapshot
+    if snapshot is None:
+        # 동기 Redis 클라이언트라 이벤트 루프에서 부르면 응답 동안 다른 요청이 멈춘다
+        return await asyncio.to_thread(get_redis_memory_info)
+    used_mb = snapshot["used_memory_bytes"] / _MB
+    return {
+        "used_memory_mb": f"{used_mb:.1f}MB",
+        "maxmemory_human": f"{MEMORY_LIMIT_MB}MB",
+        "usage_percent": f"{(used_mb / MEMORY_LIMIT_MB) * 100:.1f}%",
+        "fragmentation_ratio": snapshot["fragmentation_ratio"],
+        "sessions": snapshot["sessions"],
+        "status": "healthy" if used_mb < MEMORY_LIMIT_MB * 0.8 else "warning",
+        "sampled_seconds_ago": round(time.time() - snapshot["sampled_at"], 1),
+        "session_sizes": session_size_stats.snapshot(),
+        "step_transitions": get_step_transition_stats(),
+        "near_cache": session_near_cache.snapshot(),
+        "session_store": session_store.stats(),
+        "ttl_policy": session_ttl_policy.get_stats(),
+    }
+
+async def get_capacity_status() -> Dict[str, Any]:
+    """/capacity/status - 실측 세션 크기 기반 수용량 (샘플 전이면 기존 추정을 스레드에서)"""
+    snapshot = session_memory_sampler.snapshot
+    if snapshot is None or snapshot["mean_bytes_per_session"] is None:
+        return await asyncio.to_thread(get_user_capacity_info)
+    current = snapshot["sessions"]["total"]
+    total_capacity = current + snapshot["additional_sessions"]
+    safe_capacity = current + snapshot["additional_sessions_safe"]
+    return {
+        "current_sessions": current,
+        "sessions_by_namespace": {k: v for k, v in snapshot["sessions"].items() if k != "total"},
+        "used_memory": f"{snapshot['used_memory_bytes'] / _MB:.1f}MB",
+        "avg_memory_per_session": f"{snapshot['mean_bytes_per_session'] / 1024:.1f}KB",
+        "p90_memory_per_session": f"{snapshot['p90_bytes_per_session'] / 1024:.1f}KB",
+        "max_additional_users": snapshot["additional_sessions"],
+        "total_theoretical_capacity": total_capacity,
+        "safe_capacity": safe_capacity,
+        "session_growth_per_min": snapshot["session_growth_per_min"],
+        "minutes_to_safe_limit": snapshot["minutes_to_safe_limit"],
+        "forecast": snapshot,
+        "recommendation": get_capacity_recommendation(current, safe_capacity),
+    }
@@ -0,0 +1,178 @@
+# chatbot-server/app/utils/session_model.py - 고정 필드 세션 객체 (__slots__)
+
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+import orjson
+
+HISTORY_LIMIT = 15      # 보존할 대화 히스토리 수
+INFO_TEXT_LIMIT = 300   # user_info 등 텍스트 값 최대 길이
+
+STEP_FIELDS = (
+    'phone_plan_flow_step', 'subscription_flow_step', 'ubti_step',
+    'plan_step', 'subscription_step',  # 기존 키 호환성
+    'step',  # UBTI용
+)
+INFO_FIELDS = ('user_info', 'plan_info', 'subscription_info', 'ubti_info')
+MULTITURN_FIELDS = ('phone_plan_flow_step', 'subscription_flow_step', 'ubti_step')
+
+class SessionHistory(list):
+    """(role, text) 쌍 목록 - 기존 {"role", "content"} dict도 받아서 변환, HISTORY_LIMIT 개까지만 보존"""
+
+    __slots__ = ("appended",)  # 마지막 저장 이후 추가된 수 (필드 단위 저장에서 RPUSH 대상)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.appended = 0
+
+    def append(self, item):
+        super().append(_history_entry(item))
+        self.appended += 1
+        if len(self) > HISTORY_LIMIT:
+            del self[0]
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+def _history_entry(item):
+    if isinstance(item, dict):
+        return (item.get("role", ""), item.get("content", ""))
+    role, text = item
+    return (role, text)
+
+def _is_blank(value) -> bool:
+    """저장할 필요 없는 빈 값 (None, 빈 문자열/컨테이너) - 0이나 False는 실제 답이라 남긴다"""
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+def _clean_info(value: dict) -> dict:
+    """빈 값 제거 + 긴 텍스트 자르기 (직렬화할 때만 적용)"""
+    return {
+        k: (v[:INFO_TEXT_LIMIT] if isinstance(v, str) and len(v) > INFO_TEXT_LIMIT else v)
+        for k, v in value.items() if not _is_blank(v)
+    }
+
+class Session(MutableMapping):
+    """세션 데이터 - 필드가 고정이라 dict 대신 __slots__ 객체로 보관
+
+    기존 코드가 session["history"], session.get(...), session.pop(...) 으로 쓰던 그대로 동작한다.
+    필드에 값을 넣을 때는 형식만 맞추고 그대로 보관하며, info 정리(빈 값 제거/자르기)는 직렬화할 때만 한다.
+    없는 필드는 None. 저장된 데이터의 알 수 없는 키는 로드할 때 제외하고 (기존 essential_keys 정책과 동일),
+    코드에서 알 수 없는 키에 값을 넣으면 KeyError.
+    """
+
+    __slots__ = STEP_FIELDS + INFO_FIELDS + ('history', 'last_recommendation_type', 'answers')
+    FIELDS = __slots__
+
+    def __init__(self, data: Optional[dict] = None):
+        for name in self.FIELDS:
+            object.__setattr__(self, name, None)
+        if data:
+            for key, value in data.items():
+                if key not in self.FIELDS:
+                    print(f"[DEBUG] 저장하지 않는 세션 키 제외: {key}")
+                    continue
+                try:
+                    self[key] = value
+                except (TypeError, ValueError) as e:
+                    print(f"[WARNING] 세션 필드 형식 오류로 제외: {key} ({e})")
+
+    # ---- 필드 검증 (값을 넣을 때 한 번) ----
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.FIELDS:
+            raise KeyError(f"알 수 없는 세션 키: {key}")
+        if value is not None:
+            if key in STEP_FIELDS:
+                value = int(value)
+            elif key in INFO_FIELDS:
+                if not isinstance(value, dict):
+                    raise TypeError(f"{key}는 dict여야 함: {type(value).__name__}")
+            elif key == 'history':
+                if not isinstance(value, SessionHistory):
+                    history = SessionHistory()
+                    history.extend(value[-HISTORY_LIMIT:] if isinstance(value, list) else ())
+                    value = history
+            elif key == 'answers':
+                value = value if isinstance(value, list) else None
+            elif key == 'last_recommendation_type':
+                value = str(value)
+        object.__setattr__(self, key, value)
+
+    # ---- Mapping 인터페이스 (기존 dict 사용처 호환) ----
+
+    def __getitem__(self, key: str):
+        value = getattr(self, key, None) if key in self.FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default=None):
+        if key not in self.FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __delitem__(self, key: str):
+        if key not in self.FIELDS or getattr(self, key) is None:
+            raise KeyError(key)
+        object.__setattr__(self, key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS and getattr(self, key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self.FIELDS if getattr(self, name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, name) is not None for name in self.FIELDS)
+
+    def setdefault(self, key: str, default=None):
+        if key not in self:
+            self[key] = default
+        return self.get(key)
+
+    def clear(self):
+        for name in self.FIELDS:
+            object.__setattr__(self, name, None)
+
+    def __repr__(self) -> str:
+        return f"Session({self.to_dict()})"
+
+    def copy(self) -> "Session":
+        """독립 복사본 (info dict/answers/히스토리도 새 객체) - 검증 없이 필드만 복사"""
+        clone = Session()
+        for name in self:
+            value = getattr(self, name)
+            if name == 'history':
+                value = SessionHistory(value)
+            elif isinstance(value, (dict, list)):
+                value = type(value)(value)
+            object.__setattr__(clone, name, value)
+        return clone
+
+    # ---- 직렬화 ----
+
+    @property
+    def is_multiturn(self) -> bool:
+        return any((getattr(self, name) or 0) > 0 for name in MULTITURN_FIELDS)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self}
+
+    def to_payload(self, history_limit: Optional[int] = None) -> dict:
+        """저장용 dict (히스토리는 [role, text] 쌍, info는 정리 후) - 코덱/필드 레이아웃이 그대로 직렬화"""
+        data = self.to_dict()
+        for name in INFO_FIELDS:
+            if name in data:
+                data[name] = _clean_info(data[name])
+        if history_limit is not None and self.history:
+            data['history'] = self.history[-history_limit:]
+        return data
+
+    def to_json(self) -> bytes:
+        """변경 감지용 지문"""
+        return orjson.dumps(self.to_dict())
@@ -0,0 +1,232 @@
+# chatbot-server/app/utils/session_purge.py - 네임스페이스/조건별 세션 정리 (FLUSHDB 대신 점진적 UNLINK)
+
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.schemas.session import SessionPurgeRequest
+from app.utils.redis_client import (
+    SESSION_FLOW_INDEX_KEY, SESSION_INDEX_KEY, SESSION_TTL, SESSION_TURN_INDEX_KEY,
+    _namespace_index_key, _queue_unindex, _session_keys, get_async_client, session_near_cache,
+)
+from app.utils.session_store import SESSION_NAMESPACES
+from app.utils.session_ttl import SESSION_TTL_IDLE_AFTER, session_ttl_policy
+
+SESSION_PURGE_BATCH = int(os.getenv("SESSION_PURGE_BATCH", "200"))  # ZSCAN 한 번에 검사할 세션 수
+SESSION_PURGE_RATE = int(os.getenv("SESSION_PURGE_RATE", "1000"))  # 초당 최대 삭제 세션 수
+_JOB_HISTORY = 10
+
+@dataclass(slots=True)
+class PurgeJob:
+    """정리 작업 하나의 조건 + 진행 상황"""
+    job_id: str
+    request: SessionPurgeRequest
+    state: str = "running"  # running / done / cancelled / failed
+    scanned: int = 0
+    matched: int = 0
+    purged: int = 0
+    kept_multiturn: int = 0
+    stale_index: int = 0  # 키는 이미 없고 인덱스에만 남아 있던 항목
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "filters": self.request.model_dump(),
+            "scanned": self.scanned,
+            "matched": self.matched,
+            "purged": self.purged,
+            "kept_multiturn": self.kept_multiturn,
+            "stale_index": self.stale_index,
+            "elapsed_seconds": round(end - self.started_at, 2),
+            "error": self.error,
+        }
+
+_jobs: Dict[str, PurgeJob] = {}
+
+def _namespaces(namespace: Optional[str] = None) -> List[str]:
+    return [namespace] if namespace else sorted(set(SESSION_NAMESPACES.values()) | {"chat"})
+
+async def _select(aclient, candidates: List[tuple], request: SessionPurgeRequest, job: PurgeJob) -> List[tuple]:
+    """후보 세션 중 조건에 맞는 것만 (세션 ID, 유휴 시간, 인덱스 점수)
+
+    세션 키는 EXISTS/MEMORY USAGE로만 확인하고 유휴 시간·흐름 상태는 인덱스(마지막 턴/진행 중)에서 읽는다.
+    값을 읽거나 OBJECT IDLETIME에 기대면 allkeys-lru에서 검사 자체가 유휴 시계를 되돌린다.
+    """
+    check_size = request.min_bytes is not None
+    async with aclient.pipeline(transaction=False) as pipe:
+        for session_id, _ in candidates:
+            pipe.exists(*_session_keys(session_id))
+            pipe.zscore(SESSION_TURN_INDEX_KEY, session_id)
+            pipe.zscore(SESSION_FLOW_INDEX_KEY, session_id)
+            if check_size:
+                for key in _session_keys(session_id):
+                    pipe.memory_usage(key)
+        results = iter(await pipe.execute(raise_on_error=False))
+
+    now = time.time()
+    selected, stale = [], []
+    for session_id, score in candidates:
+        exists, last_turn, mid_flow = next(results), next(results), next(results)
+        sizes = [next(results) for _ in range(3)] if check_size else None
+        if exists == 0:
+            # 세 키 모두 없음 (만료/축출) → 인덱스만 정리
+            stale.append(session_id)
+            continue
+        # 마지막 턴 기록이 없으면 인덱스 점수(마지막 저장 + TTL)로 보수적으로 추정
+        idle = now - last_turn if last_turn is not None else now - (score - SESSION_TTL)
+        if idle < request.min_idle_seconds:
+            continue
+        if check_size and sum(size for size in sizes if isinstance(size, int)) < request.min_bytes:
+            continue
+        # 마지막 턴 기록이 없는 세션은 흐름 상태를 알 수 없으므로 진행 중으로 보고 보존
+        if not request.include_multiturn and (mid_flow is not None or last_turn is None):
+            job.kept_multiturn += 1
+            continue
+        selected.append((session_id, idle, score))
+
+    job.stale_index += len(stale)
+    if stale and not request.dry_run:
+        async with aclient.pipeline(transaction=False) as pipe:
+            _queue_unindex(pipe, stale)
+            await pipe.execute()
+    return selected
+
+async def _unlink(aclient, session_ids: List[str]):
+    async with aclient.pipeline(transaction=False) as pipe:
+        pipe.unlink(*[key for session_id in session_ids for key in _session_keys(session_id)])
+        _queue_unindex(pipe, session_ids)
+        await pipe.execute()
+    for session_id in session_ids:
+        session_near_cache.discard(session_id)
+
+async def _run(job: PurgeJob):
+    """네임스페이스 인덱스를 ZSCAN 커서로 훑으며 배치 단위 UNLINK (초당 SESSION_PURGE_RATE개 이하)"""
+    request = job.request
+    aclient = await get_async_client()
+    if not aclient:
+        raise ConnectionError("Redis 연결 없음")
+    for namespace in _namespaces(request.namespace):
+        index_key = _namespace_index_key(namespace)
+        cursor = 0
+        while True:
+            batch_started = time.monotonic()
+            cursor, candidates = await aclient.zscan(index_key, cursor, count=SESSION_PURGE_BATCH)
+            job.scanned += len(candidates)
+            selected = [row[0] for row in await _select(aclient, candidates, request, job)] if candidates else []
+            if request.limit is not None:
+                selected = selected[:max(0, request.limit - job.matched)]
+            job.matched += len(selected)
+            if selected and not request.dry_run:
+                await _unlink(aclient, selected)
+                job.purged += len(selected)
+                # 속도 제한 - 이번 배치 삭제 수만큼의 시간을 채운 뒤 다음 배치
+                wait = len(selected) / SESSION_PURGE_RATE - (time.monotonic() - batch_started)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            else:
+                await asyncio.sleep(0)
+            if cursor == 0 or (request.limit is not None and job.matched >= request.limit):
+                break
+        if request.limit is not None and job.matched >= request.limit:
+            break
+
+async def _supervise(job: PurgeJob):
+    try:
+        await _run(job)
+        job.state = "done"
+    except asyncio.CancelledError:
+        job.state = "cancelled"
+        raise
+    except Exception as e:
+        job.state = "failed"
+        job.error = str(e)
+        print(f"[ERROR] 세션 정리 실패 ({job.job_id}): {e}")
+    finally:
+        job.finished_at = time.time()
+        print(f"[INFO] 세션 정리 {job.state}: {job.to_dict()}")
+
+class PurgeConflict(Exception):
+    """조건이 다른 정리 작업이 이미 실행 중 - 요청한 조건은 실행되지 않음"""
+
+    def __init__(self, job: PurgeJob):
+        super().__init__(f"다른 조건의 세션 정리 작업이 실행 중: {job.job_id}")
+        self.job = job
+
+def start_purge(request: SessionPurgeRequest) -> PurgeJob:
+    """정리 작업 시작 - 같은 조건의 작업이 실행 중이면 그 작업을 반환, 조건이 다르면 PurgeConflict"""
+    if request.namespace and request.namespace not in set(SESSION_NAMESPACES.values()) | {"chat"}:
+        raise ValueError(f"알 수 없는 네임스페이스: {request.namespace}")
+    for job in _jobs.values():
+        if job.state == "running":
+            if job.request.model_dump() == request.model_dump():
+                return job
+            raise PurgeConflict(job)
+    job = PurgeJob(job_id=uuid.uuid4().hex[:12], request=request)
+    job.task = asyncio.create_task(_supervise(job))
+    _jobs[job.job_id] = job
+    while len(_jobs) > _JOB_HISTORY:
+        oldest = next(iter(_jobs))
+        if _jobs[oldest].state == "running":
+            break
+        del _jobs[oldest]
+    print(f"[INFO] 세션 정리 시작 ({job.job_id}): {request.model_dump()}")
+    return job
+
+def get_purge_job(job_id: str) -> Optional[PurgeJob]:
+    return _jobs.get(job_id)
+
+def cancel_purge(job_id: str) -> Optional[PurgeJob]:
+    job = _jobs.get(job_id)
+    if job is not None and job.task is not None and job.state == "running":
+        job.task.cancel()
+    return job
+
+# ============= 메모리 압박 시 유휴 세션 TTL 단축 =============
+
+async def tighten_idle_sessions() -> int:
+    """유휴 세션의 남은 TTL을 정책 값으로 낮춤 (멀티턴 진행 중인 세션 제외) - 세션 메모리 샘플러가 호출
+
+    EXPIRE LT / ZADD XX LT라 이미 더 짧은 TTL은 늘리지 않고, 그 사이 새로 저장된 세션도 되살리지 않는다.
+    """
+    if session_ttl_policy.pressure <= 0:
+        return 0
+    aclient = await get_async_client()
+    if not aclient:
+        return 0
+    request = SessionPurgeRequest(min_idle_seconds=SESSION_TTL_IDLE_AFTER)
+    job = PurgeJob(job_id="ttl", request=request)  # 선별 통계용 (작업 목록에는 남기지 않음)
+    tightened = 0
+    for namespace in _namespaces():
+        index_key = _namespace_index_key(namespace)
+        cursor = 0
+        while True:
+            cursor, candidates = await aclient.zscan(index_key, cursor, count=SESSION_PURGE_BATCH)
+            selected = await _select(aclient, candidates, request, job) if candidates else []
+            now = time.time()
+            async with aclient.pipeline(transaction=False) as pipe:
+                for session_id, idle, score in selected:
+                    remaining = session_ttl_policy.idle_remaining(idle)
+                    if remaining is None or score - now <= remaining:
+                        continue
+                    for key in _session_keys(session_id):
+                        pipe.expire(key, remaining, lt=True)
+                    pipe.zadd(SESSION_INDEX_KEY, {session_id: now + remaining}, xx=True, lt=True)
+                    pipe.zadd(index_key, {session_id: now + remaining}, xx=True, lt=True)
+                    session_ttl_policy.record_tightened(remaining)
+                    tightened += 1
+                await pipe.execute()
+            await asyncio.sleep(0)
+            if cursor == 0:
+                break
+    if tightened:
+        print(f"[INFO] 메모리 압박 {session_ttl_policy.pressure:.2f} - 유휴 세션 {tightened}개 TTL 단축")
+    return tightened
@@ -0,0 +1,317 @@
+# chatbot-server/app/utils/session_store.py - 세션 저장소 인터페이스 + 프로세스 내 메모리 저장소
+
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+import orjson
+
+from app.utils.session_model import Session
+
+SESSION_NAMESPACES = {"ubti_session:": "ubti"}  # 키 접두사 → 네임스페이스 (나머지는 chat)
+
+# 메모리 저장소 스냅샷 (경로가 비어 있으면 끔) - 재시작해도 진행 중인 멀티턴을 이어가기 위한 용도
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "")
+SESSION_SNAPSHOT_INTERVAL = int(os.getenv("SESSION_SNAPSHOT_INTERVAL", "60"))
+# 대체 저장소로 넘어간 뒤 주 저장소 복구를 다시 확인하는 간격 (초)
+SESSION_FAILOVER_RETRY = float(os.getenv("SESSION_FAILOVER_RETRY", "30"))
+
+def session_namespace(session_id: str) -> str:
+    for prefix, namespace in SESSION_NAMESPACES.items():
+        if session_id.startswith(prefix):
+            return namespace
+    return "chat"
+
+class SessionStore(ABC):
+    """세션 저장소 인터페이스 - redis_client의 공개 함수(get/save/delete_session 등)가 여기로 위임
+
+    aload는 (세션, 필드 레이아웃에서 읽었는지), asave의 baseline은 필드 레이아웃 증분 저장 기준.
+    필드 레이아웃이 없는 저장소는 baseline을 무시하고 항상 False를 돌려준다.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def load(self, session_id: str) -> Session:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, data):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def aload(self, session_id: str):
+        ...
+
+    @abstractmethod
+    async def asave(self, session_id: str, data, baseline=None) -> bool:
+        ...
+
+    @abstractmethod
+    async def adelete(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """네임스페이스별 세션 수 + total"""
+
+    @abstractmethod
+    def cleanup(self) -> int:
+        """만료/초과 세션 정리 → 정리한 수"""
+
+    @abstractmethod
+    def clear(self) -> bool:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    async def aclose(self):
+        pass
+
+class MemorySessionStore(SessionStore):
+    """프로세스 내 세션 저장소 - LRU + 세션별 TTL, 최대 개수 제한, 선택적으로 디스크 스냅샷
+
+    Redis 없이 단일 노드/로컬 테스트를 돌리거나 Redis 연결 실패 시 대체 저장소로 쓴다.
+    워커 간에 공유되지 않으므로 여러 워커로 띄우면 세션이 워커별로 나뉜다.
+    저장/조회 모두 복사본을 주고받아 Redis와 같이 호출자가 바꾼 내용은 저장해야 반영된다.
+    """
+
+    name = "memory"
+
+    def __init__(self, ttl_for: Callable[[Session], int], max_entries: int,
+                 snapshot_path: str = SESSION_SNAPSHOT_PATH):
+        self.ttl_for = ttl_for
+        self.max_entries = max_entries
+        self.snapshot_path = snapshot_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # 세션 ID → (세션, 만료 시각)
+        self._next_snapshot = time.monotonic() + SESSION_SNAPSHOT_INTERVAL
+        self._stats = {"evicted": 0, "expired": 0, "snapshots": 0}
+        if snapshot_path:
+            self._restore()
+
+    # ---- 조회/저장 ----
+
+    def load(self, session_id: str) -> Session:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return Session()
+        session, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[session_id]
+            self._stats["expired"] += 1
+            return Session()
+        self._entries.move_to_end(session_id)
+        return session.copy()
+
+    def save(self, session_id: str, data):
+        session = data if isinstance(data, Session) else Session(data)
+        self._entries[session_id] = (session.copy(), time.time() + self.ttl_for(session))
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def delete(self, session_id: str):
+        self._entries.pop(session_id, None)
+
+    async def aload(self, session_id: str):
+        return self.load(session_id), False
+
+    async def asave(self, session_id: str, data, baseline=None) -> bool:
+        self.save(session_id, data)
+        if self.snapshot_path and time.monotonic() >= self._next_snapshot:
+            await self.asnapshot()
+        return True
+
+    async def adelete(self, session_id: str):
+        self.delete(session_id)
+
+    # ---- 관리 ----
+
+    def _prune(self) -> int:
+        now = time.time()
+        expired = [sid for sid, (_, expires_at) in self._entries.items() if expires_at <= now]
+        for session_id in expired:
+            del self._entries[session_id]
+        self._stats["expired"] += len(expired)
+        return len(expired)
+
+    def counts(self) -> Dict[str, int]:
+        self._prune()
+        counts = {"chat": 0, **{namespace: 0 for namespace in SESSION_NAMESPACES.values()}}
+        for session_id in self._entries:
+            counts[session_namespace(session_id)] += 1
+        counts["total"] = len(self._entries)
+        return counts
+
+    def cleanup(self) -> int:
+        return self._prune()
+
+    def clear(self) -> bool:
+        self._entries.clear()
+        print("[EMERGENCY] 메모리 세션 저장소 비움")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "snapshot_path": self.snapshot_path or None,
+            **self._stats,
+        }
+
+    async def aclose(self):
+        if self.snapshot_path:
+            await self.asnapshot()
+
+    # ---- 디스크 스냅샷 ----
+
+    async def asnapshot(self):
+        """직렬화는 이벤트 루프에서 (세션 객체가 바뀌지 않도록), 파일 쓰기는 스레드에서"""
+        self._next_snapshot = time.monotonic() + SESSION_SNAPSHOT_INTERVAL
+        body = orjson.dumps([
+            [session_id, expires_at, session.to_payload()]
+            for session_id, (session, expires_at) in self._entries.items()
+        ])
+        try:
+            await asyncio.to_thread(self._write_snapshot, body)
+            self._stats["snapshots"] += 1
+        except OSError as e:
+            print(f"[WARNING] 세션 스냅샷 저장 실패: {e}")
+
+    def _write_snapshot(self, body: bytes):
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _restore(self):
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                rows = orjson.loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] 세션 스냅샷 읽기 실패 - 빈 저장소로 시작: {e}")
+            return
+        now = time.time()
+        for session_id, expires_at, payload in rows[-self.max_entries:]:
+            if expires_at > now:
+                self._entries[session_id] = (Session(payload), expires_at)
+        print(f"[INFO] 세션 스냅샷 복원: {len(self._entries)}개 ({self.snapshot_path})")
+
+class FailoverSessionStore(SessionStore):
+    """주 저장소(Redis) 앞에서 연결 오류가 나면 대체 저장소(메모리)로 넘기는 래퍼
+
+    연결 오류(errors)가 난 호출은 바로 대체 저장소로 다시 처리하고, 이후 호출도 대체 저장소를 쓴다.
+    SESSION_FAILOVER_RETRY 초가 지나면 비동기 조회 때 probe로 주 저장소를 확인해서 돌아간다.
+    장애 동안 대체 저장소에 쌓인 세션은 옮기지 않는다 (워커 간 공유되는 주 저장소가 기준).
+    name은 지금 쓰는 저장소 이름이라 `session_store.name == "redis"` 분기도 같이 전환된다.
+    """
+
+    def __init__(self, primary: SessionStore, fallback: SessionStore,
+                 errors: Tuple[Type[BaseException], ...],
+                 probe: Optional[Callable[[], Awaitable[bool]]] = None,
+                 retry_after: float = SESSION_FAILOVER_RETRY):
+        self.primary = primary
+        self.fallback = fallback
+        self.errors = errors
+        self.probe = probe
+        self.retry_after = retry_after
+        self._failed_at: Optional[float] = None
+        self._stats = {"failovers": 0, "recoveries": 0}
+
+    @property
+    def name(self) -> str:
+        return self.active.name
+
+    @property
+    def active(self) -> SessionStore:
+        return self.fallback if self._failed_at is not None else self.primary
+
+    def _fail_over(self, error: BaseException):
+        if self._failed_at is None:
+            self._stats["failovers"] += 1
+            print(f"[WARNING] {self.primary.name} 세션 저장소 연결 오류 - {self.fallback.name} 저장소로 전환: {error}")
+        self._failed_at = time.monotonic()
+
+    async def _maybe_recover(self):
+        if self._failed_at is None or self.probe is None:
+            return
+        if time.monotonic() - self._failed_at < self.retry_after:
+            return
+        try:
+            healthy = await self.probe()
+        except Exception:
+            healthy = False
+        if healthy:
+            self._failed_at = None
+            self._stats["recoveries"] += 1
+            print(f"[INFO] {self.primary.name} 세션 저장소 복구 - 다시 사용")
+        else:
+            self._failed_at = time.monotonic()
+
+    def _call(self, method: str, *args):
+        if self._failed_at is None:
+            try:
+                return getattr(self.primary, method)(*args)
+            except self.errors as e:
+                self._fail_over(e)
+        return getattr(self.fallback, method)(*args)
+
+    async def _acall(self, method: str, *args):
+        await self._maybe_recover()
+        if self._failed_at is None:
+            try:
+                return await getattr(self.primary, method)(*args)
+            except self.errors as e:
+                self._fail_over(e)
+        return await getattr(self.fallback, method)(*args)
+
+    def load(self, session_id: str) -> Session:
+        return self._call("load", session_id)
+
+    def save(self, session_id: str, data):
+        self._call("save", session_id, data)
+
+    def delete(self, session_id: str):
+        self._call("delete", session_id)
+
+    async def aload(self, session_id: str):
+        return await self._acall("aload", session_id)
+
+    async def asave(self, session_id: str, data, baseline=None) -> bool:
+        return await self._acall("asave", session_id, data, baseline)
+
+    async def adelete(self, session_id: str):
+        await self._acall("adelete", session_id)
+
+    def counts(self) -> Dict[str, int]:
+        return self._call("counts")
+
+    def cleanup(self) -> int:
+        return self._call("cleanup")
+
+    def clear(self) -> bool:
+        return self._call("clear")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.active.stats(),
+            "primary": self.primary.name,
+            "failed_over": self._failed_at is not None,
+            **self._stats,
+        }
+
+    async def aclose(self):
+        await self.primary.aclose()
+        await self.fallback.aclose()
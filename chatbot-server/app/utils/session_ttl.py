@@ -0,0 +1,89 @@
+# chatbot-server/app/utils/session_ttl.py - 세션 TTL 정책 (흐름 단계 + 유휴 시간 + 크기 + 메모리 압박)
+
+import os
+from typing import Any, Dict, Optional
+
+from app.utils.session_model import Session
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))  # 300초 → 1800초 (30분)
+SESSION_TTL_MIN = int(os.getenv("SESSION_TTL_MIN", "300"))  # 압박이 최대일 때 끝난 세션 TTL
+SESSION_TTL_MIN_REMAINING = int(os.getenv("SESSION_TTL_MIN_REMAINING", "60"))  # 유휴 세션 단축 시 남길 최소 시간
+SESSION_TTL_IDLE_AFTER = int(os.getenv("SESSION_TTL_IDLE_AFTER", "300"))  # 마지막 턴 후 이 시간이 지나면 유휴
+SESSION_TTL_PRESSURE_LOW = float(os.getenv("SESSION_TTL_PRESSURE_LOW", "0.6"))  # 이 메모리 사용률부터 단축 시작
+SESSION_TTL_PRESSURE_HIGH = float(os.getenv("SESSION_TTL_PRESSURE_HIGH", "0.9"))  # 이 사용률에서 최소 TTL
+SESSION_TTL_LARGE_BYTES = int(os.getenv("SESSION_TTL_LARGE_BYTES", "8192"))  # 큰 세션은 압박 시 더 빨리 단축
+
+# 분류별 단축 비율 (압박 1.0일 때 base → MIN 까지 줄이는 정도)
+_SHRINK = {"active": 0.5, "finished": 1.0, "idle": 1.0}
+
+class SessionTtlPolicy:
+    """세션을 저장할 때마다 TTL 결정 - 멀티턴 진행 중이면 보호(2배), 나머지는 메모리 압박에 따라 단축
+
+    분류: mid_flow(멀티턴 진행 중) / finished(추천까지 받은 대화) / active(그 외 대화) / idle(단축 패스에서
+    마지막 턴 후 SESSION_TTL_IDLE_AFTER 이상 지난 세션). 메모리 사용률은 세션 메모리 샘플러가 갱신한다.
+    """
+
+    def __init__(self, base_ttl: int = SESSION_TTL):
+        self.base_ttl = base_ttl
+        self.memory_ratio = 0.0
+        self._decisions: Dict[str, list] = {}  # 분류 → [횟수, TTL 합]
+        self.tightened = 0
+
+    def update_memory_ratio(self, ratio: float):
+        self.memory_ratio = ratio
+
+    @property
+    def pressure(self) -> float:
+        """0(여유) ~ 1(한도 근접)"""
+        span = SESSION_TTL_PRESSURE_HIGH - SESSION_TTL_PRESSURE_LOW
+        return min(1.0, max(0.0, (self.memory_ratio - SESSION_TTL_PRESSURE_LOW) / span)) if span > 0 else 0.0
+
+    def classify(self, session: Session) -> str:
+        if session.is_multiturn:
+            return "mid_flow"
+        return "finished" if session.get("last_recommendation_type") else "active"
+
+    def ttl_for(self, category: str, size_bytes: Optional[int] = None) -> int:
+        if category == "mid_flow":
+            return self.base_ttl * 2
+        pressure = self.pressure
+        if size_bytes is not None and size_bytes >= SESSION_TTL_LARGE_BYTES:
+            pressure = min(1.0, pressure * 1.5)
+        floor = min(SESSION_TTL_MIN, self.base_ttl)
+        return int(self.base_ttl - (self.base_ttl - floor) * pressure * _SHRINK[category])
+
+    def decide(self, session: Session, size_bytes: Optional[int] = None) -> int:
+        """저장 시 TTL (결정 내역은 통계에 기록)"""
+        category = self.classify(session)
+        ttl = self.ttl_for(category, size_bytes)
+        self._record(category, ttl)
+        return ttl
+
+    def idle_remaining(self, idle_seconds: float) -> Optional[int]:
+        """유휴 세션에 남길 시간 - 압박이 없거나 아직 유휴가 아니면 None (단축 안 함)"""
+        if self.pressure <= 0 or idle_seconds < SESSION_TTL_IDLE_AFTER:
+            return None
+        return max(SESSION_TTL_MIN_REMAINING, int(self.ttl_for("idle") - idle_seconds))
+
+    def record_tightened(self, remaining: int):
+        self.tightened += 1
+        self._record("idle", remaining)
+
+    def _record(self, category: str, ttl: int):
+        stats = self._decisions.setdefault(category, [0, 0])
+        stats[0] += 1
+        stats[1] += ttl
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "memory_ratio": round(self.memory_ratio, 3),
+            "pressure": round(self.pressure, 3),
+            "current_ttl": {category: self.ttl_for(category) for category in ("mid_flow", "active", "finished", "idle")},
+            "decisions": {
+                category: {"count": count, "avg_ttl": round(total / count, 1)}
+                for category, (count, total) in self._decisions.items()
+            },
+            "tightened": self.tightened,
+        }
+
+session_ttl_policy = SessionTtlPolicy()
@@ -0,0 +1,106 @@
+# chatbot-server/app/utils/sse.py - 공용 SSE 인코더 (orjson + 청크 병합)
+
+import asyncio
+import contextlib
+import os
+import time
+from typing import Any, AsyncIterator, Dict
+
+import orjson
+
+# 연속된 message_chunk를 이 시간/크기 안에서 한 프레임으로 병합 (0이면 병합 안 함)
+SSE_COALESCE_MS = float(os.getenv("SSE_COALESCE_MS", "20"))
+SSE_COALESCE_BYTES = int(os.getenv("SSE_COALESCE_BYTES", "2048"))
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def encode_event(data: Dict[str, Any]) -> bytes:
+    """dict → `data: {...}\\n\\n` (orjson은 한글을 이스케이프하지 않음 = ensure_ascii=False)"""
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+def message_chunk(content: str) -> bytes:
+    return encode_event({"type": "message_chunk", "content": content})
+
+def frame_to_ws(frame: bytes, turn_id: str) -> str:
+    """SSE 프레임 → WebSocket 메시지 (같은 이벤트 JSON에 turn_id만 앞에 추가, 재직렬화 없음)"""
+    body = frame[6:-2] if frame.startswith(b"data: ") else frame.strip()
+    tag = b'{"turn_id":' + orjson.dumps(turn_id)
+    return (tag + (b"," + body[1:] if body != b"{}" else b"}")).decode("utf-8")
+
+# 고정 프레임은 한 번만 인코딩
+MESSAGE_START = encode_event({"type": "message_start"})
+MESSAGE_END = encode_event({"type": "message_end"})
+QUESTION_START = encode_event({"type": "question_start"})
+QUESTION_END = encode_event({"type": "question_end"})
+QUESTIONS_COMPLETE = encode_event({"type": "questions_complete"})
+
+async def coalesce(source: AsyncIterator[str], window_ms: float = SSE_COALESCE_MS,
+                   max_bytes: int = SSE_COALESCE_BYTES) -> AsyncIterator[str]:
+    """연속 청크를 시간/바이트 창 안에서 합쳐서 전달 - 업스트림이 멈추면 창이 끝날 때 바로 내보냄"""
+    if window_ms <= 0:
+        async for text in source:
+            if text:
+                yield text
+        return
+
+    window = window_ms / 1000
+    iterator = source.__aiter__()
+    buffer = []
+    size = 0
+    started = 0.0
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            # 버퍼가 비어 있으면 다음 청크까지 대기, 차 있으면 창이 끝날 때까지만 대기
+            if buffer:
+                remaining = window - (time.monotonic() - started)
+                if remaining > 0:
+                    await asyncio.wait({pending}, timeout=remaining)
+                if not pending.done():
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                    continue
+            else:
+                await asyncio.wait({pending})
+
+            task, pending = pending, None
+            try:
+                text = task.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                if buffer:
+                    yield "".join(buffer)
+                raise
+
+            if not text:
+                continue
+            if not buffer:
+                started = time.monotonic()
+            buffer.append(text)
+            size += len(text.encode("utf-8"))
+
+            if size >= max_bytes or time.monotonic() - started >= window:
+                yield "".join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # 취소된 __anext__가 실제로 끝나야 업스트림을 바로 닫을 수 있다 (대기 안 하면 태스크가 떠돈다)
+            with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration, Exception):
+                await pending
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+async def encode_chunks(source: AsyncIterator[str], **window) -> AsyncIterator[bytes]:
+    """텍스트 청크 스트림 → 병합된 message_chunk 프레임"""
+    async for text in coalesce(source, **window):
+        yield message_chunk(text)
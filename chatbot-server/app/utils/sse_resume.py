@@ -0,0 +1,203 @@
+# chatbot-server/app/utils/sse_resume.py - 재연결 가능한 SSE (Redis Streams + Last-Event-ID)
+
+import asyncio
+import contextlib
+import os
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from app.utils.redis_client import get_async_client, get_async_stream_client
+from app.utils.sse import encode_event
+from app.utils.stream_guard import GuardedStreamingResponse
+
+# 켜져 있어도 요청이 재연결을 원할 때(Last-Event-ID 또는 X-Stream-Resumable 헤더)만 Redis Stream 경유
+SSE_RESUME_ENABLED = os.getenv("SSE_RESUME_ENABLED", "false").lower() == "true"
+SSE_RESUME_TTL = int(os.getenv("SSE_RESUME_TTL", "120"))        # 생성 종료 후 재생 가능 시간(초)
+SSE_RESUME_GRACE = int(os.getenv("SSE_RESUME_GRACE", "15"))     # 구독 임대 TTL (구독 프로세스가 죽은 경우 대비)
+SSE_RESUME_MAXLEN = int(os.getenv("SSE_RESUME_MAXLEN", "5000"))  # 스트림당 최대 프레임 수
+SSE_RESUME_PREFIX = "sse"
+
+_READ_BLOCK_MS = 1000
+_LEASE_CHECK_INTERVAL = 1.0
+
+# 이벤트 ID = "<스트림 ID>:<Redis 엔트리 ID>"
+_EVENT_ID_PATTERN = re.compile(r"^([0-9a-f]{32}):(\d+-\d+)$")
+
+_ERROR_FRAME = encode_event({"type": "error", "message": "응답 생성 중 문제가 발생했어요."})
+_ABORTED_FRAME = encode_event({"type": "error", "message": "응답 생성이 중단됐어요. 다시 시도해 주세요."})
+
+_producers = set()  # 실행 중인 생성/임대 감시 태스크 (GC 방지)
+_resume_stats = {"started": 0, "resumed": 0, "resume_misses": 0, "orphaned": 0, "failed": 0, "redis_fallbacks": 0}
+
+def get_resume_stats() -> Dict[str, Any]:
+    return {**_resume_stats, "live_producers": len(_producers)}
+
+def _stream_key(label: str, session_id: str, stream_id: str) -> str:
+    """엔드포인트별로 분리 - 다른 엔드포인트의 이벤트 ID로는 재생되지 않음"""
+    return f"{SSE_RESUME_PREFIX}:{label}:{session_id}:{stream_id}"
+
+def _lease_key(stream_key: str) -> str:
+    return f"{stream_key}:lease"
+
+def wants_resume(last_event_id: Optional[str], resumable: Optional[str]) -> bool:
+    """요청별 선택 - 재연결 요청이거나 클라이언트가 X-Stream-Resumable: true 를 보낸 경우만"""
+    if not SSE_RESUME_ENABLED:
+        return False
+    return bool(last_event_id) or (resumable or "").strip().lower() in ("1", "true", "yes")
+
+def parse_event_id(last_event_id: Optional[str]):
+    """Last-Event-ID → (스트림 ID, 엔트리 ID) - 형식이 다르면 None"""
+    if not last_event_id:
+        return None
+    match = _EVENT_ID_PATTERN.match(last_event_id.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+async def _produce(client, stream_key: str, frames: AsyncIterator[bytes]):
+    """원본 생성기 실행 → 프레임을 Redis Stream에 기록
+
+    임대 감시 태스크가 취소하면 생성기를 바로 닫는다 (업스트림 LLM도 닫힘, 세션 커밋 없음).
+    실패하면 error 프레임을 남기고, 중단된 스트림은 종료 표시에 aborted를 붙인다.
+    """
+    aborted = failed = False
+    try:
+        async for frame in frames:
+            await client.xadd(stream_key, {"d": frame}, maxlen=SSE_RESUME_MAXLEN, approximate=True)
+    except asyncio.CancelledError:
+        aborted = True
+    except Exception as e:
+        failed = True
+        _resume_stats["failed"] += 1
+        print(f"[ERROR] 재연결 스트림 생성 실패 ({stream_key}): {e}")
+    finally:
+        await frames.aclose()
+        try:
+            if failed:
+                await client.xadd(stream_key, {"d": _ERROR_FRAME}, maxlen=SSE_RESUME_MAXLEN, approximate=True)
+            end = {"end": "1", "aborted": "1"} if aborted else {"end": "1"}
+            await client.xadd(stream_key, end, maxlen=SSE_RESUME_MAXLEN, approximate=True)
+            await client.expire(stream_key, SSE_RESUME_TTL)
+        except Exception as e:
+            print(f"[WARNING] 재연결 스트림 종료 기록 실패 ({stream_key}): {e}")
+
+async def _watch_lease(client, stream_key: str, producer: asyncio.Task):
+    """구독 임대가 사라지면(구독자가 끊기면 바로 삭제됨) 생성 태스크 취소"""
+    lease_key = _lease_key(stream_key)
+    while not producer.done():
+        await asyncio.sleep(_LEASE_CHECK_INTERVAL)
+        if producer.done():
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.exists(lease_key)
+                pipe.expire(stream_key, SSE_RESUME_TTL + SSE_RESUME_GRACE)
+                leased, _ = await pipe.execute()
+        except Exception as e:
+            print(f"[WARNING] 재연결 스트림 임대 확인 실패 ({stream_key}): {e}")
+            continue
+        if not leased:
+            _resume_stats["orphaned"] += 1
+            print(f"[INFO] 구독자 없음 - 스트림 생성 중단: {stream_key}")
+            producer.cancel()
+            return
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _producers.add(task)
+    task.add_done_callback(_producers.discard)
+    return task
+
+async def _tail(client, stream_key: str, stream_id: str, after: str) -> AsyncIterator[bytes]:
+    """Redis Stream을 after 이후부터 읽어 `id:` 가 붙은 SSE 프레임으로 전달
+
+    종료 표시 전에 끝나면(클라이언트 연결 종료) 임대를 바로 지워 생성도 멈추게 한다.
+    """
+    lease_key = _lease_key(stream_key)
+    last_id = after
+    lease_renewed = 0.0
+    finished = False
+    try:
+        while True:
+            if time.monotonic() - lease_renewed >= _LEASE_CHECK_INTERVAL:
+                await client.set(lease_key, 1, ex=SSE_RESUME_GRACE)
+                lease_renewed = time.monotonic()
+
+            response = await client.xread({stream_key: last_id}, count=100, block=_READ_BLOCK_MS)
+            if not response:
+                if not await client.exists(stream_key):
+                    finished = True
+                    return  # 만료됨
+                continue
+
+            for _, entries in response:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    if "end" in fields:
+                        finished = True
+                        if fields.get("aborted"):
+                            yield f"id: {stream_id}:{entry_id}\n".encode("utf-8") + _ABORTED_FRAME
+                        return
+                    frame = fields.get("d")
+                    if frame is None:
+                        continue
+                    if isinstance(frame, str):
+                        frame = frame.encode("utf-8")
+                    yield f"id: {stream_id}:{entry_id}\n".encode("utf-8") + frame
+    finally:
+        if not finished:
+            with contextlib.suppress(Exception):
+                await client.delete(lease_key)
+
+async def _replayable(client, stream_key: str) -> bool:
+    """재생할 수 있는 스트림인지 - 없거나 생성이 중단된(aborted) 스트림은 새로 생성"""
+    if not await client.exists(stream_key):
+        return False
+    last = await client.xrevrange(stream_key, count=1)
+    return not (last and last[0][1].get("aborted"))
+
+async def resumable_response(session_id: str, make_frames: Callable[[], AsyncIterator[bytes]],
+                             label: str, last_event_id: Optional[str] = None, resumable: Optional[str] = None):
+    """SSE 응답 생성 - Last-Event-ID가 살아있는 스트림을 가리키면 재생성 없이 이어서 재생
+
+    make_frames는 재연결 시에는 호출하지 않는다 (인텐트 분류/LLM/세션 단계 진행 없음).
+    기록(XADD)은 기본 클라이언트, 구독(XREAD BLOCK)은 전용 풀 클라이언트로 나눠 쓴다.
+    """
+    if not wants_resume(last_event_id, resumable):
+        return GuardedStreamingResponse(make_frames(), label=label)
+    client = await get_async_client()
+    tail_client = await get_async_stream_client() if client is not None else None
+    if client is None or tail_client is None:
+        _resume_stats["redis_fallbacks"] += 1
+        return GuardedStreamingResponse(make_frames(), label=label)
+
+    parsed = parse_event_id(last_event_id)
+    if parsed:
+        stream_id, entry_id = parsed
+        stream_key = _stream_key(label, session_id, stream_id)
+        try:
+            if await _replayable(client, stream_key):
+                _resume_stats["resumed"] += 1
+                print(f"[INFO] SSE 재연결 - {stream_key} {entry_id} 이후부터 재생")
+                return GuardedStreamingResponse(_tail(tail_client, stream_key, stream_id, entry_id), label=f"{label}_resume")
+        except Exception as e:
+            print(f"[WARNING] 재연결 스트림 조회 실패: {e}")
+        _resume_stats["resume_misses"] += 1
+        print(f"[INFO] 재연결 대상 스트림 없음 - 새로 생성: {last_event_id}")
+
+    stream_id = uuid.uuid4().hex
+    stream_key = _stream_key(label, session_id, stream_id)
+    try:
+        # 첫 프레임 전에도 키가 존재하도록 시작 표시 + 구독 임대
+        await client.xadd(stream_key, {"start": "1"}, maxlen=SSE_RESUME_MAXLEN, approximate=True)
+        await client.expire(stream_key, SSE_RESUME_TTL + SSE_RESUME_GRACE)
+        await client.set(_lease_key(stream_key), 1, ex=SSE_RESUME_GRACE)
+    except Exception as e:
+        print(f"[WARNING] 재연결 스트림 생성 실패 - 일반 스트리밍으로 전환: {e}")
+        _resume_stats["redis_fallbacks"] += 1
+        return GuardedStreamingResponse(make_frames(), label=label)
+
+    producer = _spawn(_produce(client, stream_key, make_frames()))
+    _spawn(_watch_lease(client, stream_key, producer))
+    _resume_stats["started"] += 1
+    return GuardedStreamingResponse(_tail(tail_client, stream_key, stream_id, "0"), label=label)
@@ -0,0 +1,132 @@
+# chatbot-server/app/utils/stream_guard.py - 클라이언트 연결 종료 시 스트림/LLM 생성 중단
+
+import sys
+from typing import Any, AsyncIterator, Dict
+
+import anyio
+from starlette.responses import StreamingResponse
+
+if sys.version_info < (3, 11):
+    from exceptiongroup import BaseExceptionGroup
+
+from app.utils.sse import SSE_MEDIA_TYPE
+
+# 엔드포인트별 완료/중단 횟수 + 중단된 LLM 스트림에서 아낀 토큰 추정
+_stream_stats: Dict[str, Any] = {
+    "completed": 0,
+    "aborted": 0,
+    "by_endpoint": {},
+    "llm_completed": 0,
+    "llm_aborted": 0,
+    "llm_tokens_completed": 0,           # 끝까지 받은 스트림의 토큰 합 (평균 계산용)
+    "llm_tokens_before_abort": 0,        # 중단 전까지 받은 토큰
+    "llm_tokens_saved_estimate": 0,      # 평균 응답 길이 - 중단 시점 토큰
+}
+
+def _endpoint_stats(label: str) -> Dict[str, int]:
+    return _stream_stats["by_endpoint"].setdefault(label, {"completed": 0, "aborted": 0})
+
+def record_stream(label: str, completed: bool):
+    """스트림 하나의 결과 기록 (SSE 응답/WebSocket 턴 공용)"""
+    key = "completed" if completed else "aborted"
+    _stream_stats[key] += 1
+    _endpoint_stats(label)[key] += 1
+
+def _average_completion_tokens() -> float:
+    if not _stream_stats["llm_completed"]:
+        return 0.0
+    return _stream_stats["llm_tokens_completed"] / _stream_stats["llm_completed"]
+
+def get_stream_stats() -> Dict[str, Any]:
+    total = _stream_stats["completed"] + _stream_stats["aborted"]
+    return {
+        **_stream_stats,
+        "by_endpoint": {label: dict(counts) for label, counts in _stream_stats["by_endpoint"].items()},
+        "abort_ratio": round(_stream_stats["aborted"] / total, 3) if total else 0.0,
+        "llm_avg_completion_tokens": round(_average_completion_tokens(), 1),
+    }
+
+async def _close_quietly(iterator):
+    """중단된 제너레이터 정리 - 취소 중에도 끝까지 닫히도록 보호"""
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is None:
+        return
+    with anyio.CancelScope(shield=True):
+        try:
+            await aclose()
+        except Exception as e:
+            print(f"[WARNING] 스트림 정리 실패: {e}")
+
+async def relay_llm(model, prompt, label: str = "llm") -> AsyncIterator[str]:
+    """model.astream 중계 - 소비자가 중간에 멈추면 업스트림을 바로 닫고 토큰 수 기록"""
+    upstream = model.astream(prompt)
+    tokens = 0
+    completed = False
+    try:
+        async for chunk in upstream:
+            if chunk and hasattr(chunk, 'content') and chunk.content:
+                tokens += 1  # 스트리밍 청크 ≈ 토큰 1개
+                yield chunk.content
+        completed = True
+    finally:
+        if completed:
+            _stream_stats["llm_completed"] += 1
+            _stream_stats["llm_tokens_completed"] += tokens
+        else:
+            saved = max(int(_average_completion_tokens()) - tokens, 0)
+            _stream_stats["llm_aborted"] += 1
+            _stream_stats["llm_tokens_before_abort"] += tokens
+            _stream_stats["llm_tokens_saved_estimate"] += saved
+            print(f"[INFO] LLM 스트림 중단({label}): 받은 토큰={tokens}, 아낀 토큰(추정)={saved}")
+            await _close_quietly(upstream)
+
+class GuardedStreamingResponse(StreamingResponse):
+    """SSE 응답 - 클라이언트가 끊으면 본문 제너레이터를 즉시 닫음
+
+    Starlette 기본 동작은 전송 태스크만 취소하고 제너레이터는 GC에 맡기므로,
+    그 사이 LLM 토큰 수신/대기/세션 저장이 계속될 수 있다.
+    """
+
+    def __init__(self, content, label: str = "stream", media_type: str = SSE_MEDIA_TYPE, **kwargs):
+        super().__init__(content, media_type=media_type, **kwargs)
+        self.label = label
+
+    async def __call__(self, scope, receive, send):
+        disconnected = False
+        completed = False
+
+        try:
+            async with anyio.create_task_group() as task_group:
+
+                async def stream():
+                    nonlocal disconnected, completed
+                    try:
+                        await self.stream_response(send)
+                        completed = True
+                    except OSError:
+                        # ASGI 2.4 서버는 끊긴 연결에 send 하면 OSError
+                        disconnected = True
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream)
+                await self.listen_for_disconnect(receive)
+                if not completed:
+                    disconnected = True
+                task_group.cancel_scope.cancel()
+        except BaseExceptionGroup as group:
+            # 태스크 그룹이 감싼 단일 예외는 풀어서 그대로 전달
+            exc = group
+            while isinstance(exc, BaseExceptionGroup) and len(exc.exceptions) == 1:
+                exc = exc.exceptions[0]
+            raise exc
+
+        if disconnected and not completed:
+            # 본문 제너레이터 종료 → 내부 LLM 스트림 닫힘, 세션 스코프는 커밋 없이 종료
+            await _close_quietly(self.body_iterator)
+            record_stream(self.label, completed=False)
+            print(f"[INFO] 클라이언트 연결 종료로 스트림 중단: {self.label}")
+            return
+
+        record_stream(self.label, completed=True)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,32 @@
+# chatbot-server/tests/conftest.py - fakeredis 기반 테스트 공용 설정
+
+from unittest import mock
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+import redis
+
+FAKE_SERVER = fakeredis.FakeServer()
+
+# redis_client는 import 시점에 동기 클라이언트로 연결하므로 그 동안만 fakeredis로 바꿔서 로드
+with mock.patch.object(redis, "Redis", lambda *args, **kwargs: fakeredis.FakeRedis(server=FAKE_SERVER, decode_responses=True)):
+    from app.utils import redis_client
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """테스트마다 비운 fakeredis - 비동기/스트림 클라이언트와 Redis 세션 저장소를 연결"""
+    FAKE_SERVER.connected = True
+    sync_client = fakeredis.FakeRedis(server=FAKE_SERVER, decode_responses=True)
+    sync_client.flushall()
+    async_client = fakeredis.aioredis.FakeRedis(server=FAKE_SERVER, decode_responses=True)
+    monkeypatch.setattr(redis_client, "client", sync_client)
+    monkeypatch.setattr(redis_client, "_async_client", async_client)
+    monkeypatch.setattr(redis_client, "_stream_client", fakeredis.aioredis.FakeRedis(server=FAKE_SERVER, decode_responses=True))
+    monkeypatch.setattr(redis_client, "_advance_step_script", None)
+    monkeypatch.setattr(redis_client, "session_store", redis_client.RedisSessionStore())
+    return async_client
@@ -0,0 +1,47 @@
+# chatbot-server/tests/test_memory_store.py - 메모리 세션 저장소 TTL/LRU
+
+from app.utils import session_store
+from app.utils.session_model import Session
+from app.utils.session_store import MemorySessionStore
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self):
+        return self.now
+
+def _store(monkeypatch, max_entries=10, ttl=60) -> tuple:
+    clock = _Clock()
+    monkeypatch.setattr(session_store.time, "time", clock.time)
+    return MemorySessionStore(lambda session: ttl, max_entries, snapshot_path=""), clock
+
+def test_entry_expires_after_ttl(monkeypatch):
+    store, clock = _store(monkeypatch, ttl=60)
+    store.save("a", {"phone_plan_flow_step": 1})
+
+    clock.now += 59
+    assert store.load("a")["phone_plan_flow_step"] == 1
+    clock.now += 1
+    assert not store.load("a")
+    assert store.stats()["expired"] == 1
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    store, _ = _store(monkeypatch, max_entries=2)
+    store.save("a", {"phone_plan_flow_step": 1})
+    store.save("b", {"phone_plan_flow_step": 1})
+    store.load("a")  # a가 최근 사용
+    store.save("c", {"phone_plan_flow_step": 1})
+
+    assert store.load("a") and store.load("c")
+    assert not store.load("b")
+    assert store.stats()["evicted"] == 1
+    assert store.counts() == {"chat": 2, "ubti": 0, "total": 2}
+
+def test_load_returns_a_copy(monkeypatch):
+    store, _ = _store(monkeypatch)
+    store.save("a", Session({"user_info": {"budget": 0}}))
+
+    loaded = store.load("a")
+    loaded["user_info"]["budget"] = 5
+    assert store.load("a")["user_info"] == {"budget": 0}
@@ -0,0 +1,58 @@
+# chatbot-server/tests/test_session_model.py - Session 필드 보관 + 코덱/레이아웃 왕복
+
+import pytest
+
+from app.utils import redis_client
+from app.utils.session_codec import CODECS
+from app.utils.session_model import INFO_TEXT_LIMIT, Session
+
+def _sample() -> Session:
+    return Session({
+        "phone_plan_flow_step": "2",
+        "user_info": {"budget": 0, "roaming": False, "memo": "", "usage": "x" * (INFO_TEXT_LIMIT + 50)},
+        "history": [{"role": "user", "content": "요금제 추천"}, ("assistant", "데이터는 얼마나 쓰세요?")],
+        "answers": ["0원", ""],
+        "last_recommendation_type": "plan",
+        "unknown_key": "버려짐",
+    })
+
+def test_assignment_keeps_values_as_is():
+    session = _sample()
+    assert session["phone_plan_flow_step"] == 2
+    assert session["user_info"]["budget"] == 0
+    assert session["user_info"]["memo"] == ""
+    assert len(session["user_info"]["usage"]) == INFO_TEXT_LIMIT + 50
+    assert "unknown_key" not in session
+
+def test_unknown_key_assignment_raises():
+    session = Session()
+    with pytest.raises(KeyError):
+        session["unknown_key"] = 1
+
+def test_payload_cleans_info_only_on_serialization():
+    session = _sample()
+    info = session.to_payload()["user_info"]
+    assert info["budget"] == 0
+    assert info["roaming"] is False
+    assert "memo" not in info
+    assert len(info["usage"]) == INFO_TEXT_LIMIT
+    assert "memo" in session["user_info"]
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("layout", ["blob", "fields"])
+@pytest.mark.parametrize("codec", ["json", "msgpack", "msgpack_zlib"])
+async def test_round_trip_through_store(fake_redis, monkeypatch, layout, codec):
+    monkeypatch.setattr(redis_client, "SESSION_LAYOUT", layout)
+    monkeypatch.setattr(redis_client, "get_codec", lambda name=None: CODECS[codec])
+    original = _sample()
+
+    assert await redis_client._awrite_session("sess_round_trip", original)
+    loaded, from_fields = await redis_client._aload_session("sess_round_trip")
+
+    assert from_fields == (layout == "fields")
+    assert loaded.to_dict() == Session(original.to_payload()).to_dict()
+    assert loaded["user_info"]["budget"] == 0
+    assert loaded["user_info"]["roaming"] is False
+    assert "memo" not in loaded["user_info"]
+    assert loaded["answers"] == ["0원", ""]
+    assert list(loaded["history"]) == [("user", "요금제 추천"), ("assistant", "데이터는 얼마나 쓰세요?")]
@@ -0,0 +1,50 @@
+# chatbot-server/tests/test_session_step.py - 멀티턴 단계 비교-전진 (동시 요청)
+
+import asyncio
+
+import pytest
+
+from app.utils import redis_client
+from app.utils.session_fields import list_key
+
+pytestmark = pytest.mark.anyio
+
+SESSION_ID = "sess_step"
+STEP_KEY = "phone_plan_flow_step"
+
+async def _advance(answer: str, gate: asyncio.Event):
+    async with redis_client.session_scope(SESSION_ID) as session:
+        await gate.wait()  # 두 요청 모두 같은 단계를 읽은 뒤 전진 시도
+        return await redis_client.aadvance_session_step(
+            SESSION_ID, session, STEP_KEY, 1, 2, "user_info", "budget", answer)
+
+@pytest.mark.parametrize("layout", ["blob", "fields"])
+async def test_concurrent_advance_only_one_wins(fake_redis, monkeypatch, layout):
+    monkeypatch.setattr(redis_client, "SESSION_LAYOUT", layout)
+    async with redis_client.session_scope(SESSION_ID) as session:
+        assert await redis_client.aadvance_session_step(SESSION_ID, session, STEP_KEY, 0, 1) == (True, 1)
+        session["history"] = [("user", "요금제 추천해줘")]
+
+    gate = asyncio.Event()
+    tasks = [asyncio.create_task(_advance(answer, gate)) for answer in ("3만원", "5만원")]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert sorted(results) == [(False, 2), (True, 2)]
+    winner = ("3만원", "5만원")[results.index((True, 2))]
+    stored, _ = await redis_client._aload_session(SESSION_ID)
+    assert stored[STEP_KEY] == 2
+    assert stored["user_info"] == {"budget": winner}
+    assert list(stored["history"]) == [("user", "요금제 추천해줘")]
+
+async def test_fields_advance_refreshes_history_ttl(fake_redis, monkeypatch):
+    monkeypatch.setattr(redis_client, "SESSION_LAYOUT", "fields")
+    async with redis_client.session_scope(SESSION_ID) as session:
+        session["history"] = [("user", "안녕")]
+        session[STEP_KEY] = 1
+    await fake_redis.expire(list_key(SESSION_ID), 5)
+
+    async with redis_client.session_scope(SESSION_ID) as session:
+        assert await redis_client.aadvance_session_step(SESSION_ID, session, STEP_KEY, 1, 2) == (True, 2)
+        assert await fake_redis.ttl(list_key(SESSION_ID)) > 5
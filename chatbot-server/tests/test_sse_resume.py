@@ -0,0 +1,60 @@
+# chatbot-server/tests/test_sse_resume.py - Last-Event-ID로 이어받기
+
+import asyncio
+
+import pytest
+
+from app.utils import sse_resume
+from app.utils.sse import encode_event
+
+pytestmark = pytest.mark.anyio
+
+def _frames(calls: list, count: int = 5):
+    async def generate():
+        calls.append(1)
+        for index in range(count):
+            yield encode_event({"type": "message_chunk", "content": str(index)})
+    return generate
+
+async def _read(response) -> list:
+    return [frame.decode("utf-8") async for frame in response.body_iterator]
+
+def _event_id(frame: str) -> str:
+    first = frame.split("\n", 1)[0]
+    assert first.startswith("id: ")
+    return first[len("id: "):]
+
+@pytest.fixture
+def resume_enabled(fake_redis, monkeypatch):
+    monkeypatch.setattr(sse_resume, "SSE_RESUME_ENABLED", True)
+    yield
+    for task in list(sse_resume._producers):
+        task.cancel()
+
+async def test_resume_replays_frames_after_last_event_id(resume_enabled):
+    calls = []
+    first = await _read(await sse_resume.resumable_response("sess", _frames(calls), "chat", resumable="true"))
+    assert len(first) == 5
+    assert all(frame.startswith("id: ") for frame in first)
+
+    resumed = await _read(await sse_resume.resumable_response("sess", _frames(calls), "chat", _event_id(first[1])))
+
+    assert resumed == first[2:]
+    assert len(calls) == 1  # 재연결 시 원본 생성기를 다시 돌리지 않음
+    assert sse_resume.get_resume_stats()["resumed"] >= 1
+
+async def test_unknown_event_id_starts_a_new_stream(resume_enabled):
+    calls = []
+    frames = await _read(await sse_resume.resumable_response(
+        "sess", _frames(calls, count=2), "chat", f"{'0' * 32}:1-0"))
+
+    assert len(frames) == 2
+    assert len(calls) == 1
+
+async def test_without_opt_in_frames_are_not_recorded(resume_enabled, fake_redis):
+    calls = []
+    frames = await _read(await sse_resume.resumable_response("sess", _frames(calls, count=2), "chat"))
+
+    assert [frame.startswith("data: ") for frame in frames] == [True, True]
+    await asyncio.sleep(0)
+    assert await fake_redis.keys("sse:*") == []